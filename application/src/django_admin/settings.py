@@ -361,6 +361,9 @@ IR_MEASURES_COMMAND = custom_settings.get(
 )
 
 GITHUB_TOKEN = custom_settings["github_token"]
+# The secret that webhooks of the git hoster send to trigger a refresh of the cached pipelines of a repository.
+# Webhooks are rejected if no secret is configured.
+GIT_CI_WEBHOOK_TOKEN = custom_settings.get("git_ci_webhook_token")
 
 # Caching
 CACHES = {
@@ -458,5 +461,11 @@ WELL_KNOWN = {
 
 S3_BUCKET = custom_settings.get("tira_s3_config", {}).get("s3_bucket", "tira-mirrored-resources")
 S3_CONFIG = custom_settings.get("tira_s3_config", {}).get("s3_config_file", "~/.s3cfg")
+# How mirrored resources are handed out: "stream" (through django), "presigned" (redirect to s3), or "x-accel-redirect".
+S3_DOWNLOAD_MODE = custom_settings.get("tira_s3_config", {}).get("download_mode", "stream")
+S3_PRESIGNED_URL_EXPIRY = int(custom_settings.get("tira_s3_config", {}).get("presigned_url_expiry", 300))
+S3_X_ACCEL_REDIRECT_LOCATION = custom_settings.get("tira_s3_config", {}).get(
+    "x_accel_redirect_location", "/s3-mirrored-resources/"
+)
 CODE_SUBMISSION_REPOSITORY_NAMESPACE = "tira-io"
 CSRF_TRUSTED_ORIGINS = ["https://127.0.0.1:8082", "https://127.0.0.1:8080", "https://127.0.0.1:8081"]
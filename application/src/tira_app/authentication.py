@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import time
 from functools import wraps
 from typing import TYPE_CHECKING
 
@@ -16,6 +17,53 @@ logger = logging.getLogger(__name__)
 
 # TODO: this file can be reduced significantly when the differen deployment configurations are removed
 
+# Seconds for which a vm that was ensured to exist is not looked up in the database again.
+VM_EXISTS_TTL = 60
+_vms_that_exist: "dict[str, float]" = {}
+
+
+def ensure_vm_exists(vm_id: str) -> None:
+    """Create the vm if it does not exist, remembering recent checks so that each request does not hit the database."""
+    if time.monotonic() - _vms_that_exist.get(vm_id, float("-inf")) < VM_EXISTS_TTL:
+        return
+
+    _ = model.get_vm(vm_id, create_if_none=True)
+    _vms_that_exist[vm_id] = time.monotonic()
+
+
+def vm_exists(vm_id: str) -> bool:
+    """Check if the vm exists, positive answers are remembered for VM_EXISTS_TTL seconds."""
+    if time.monotonic() - _vms_that_exist.get(vm_id, float("-inf")) < VM_EXISTS_TTL:
+        return True
+
+    if not model.vm_exists(vm_id):
+        return False
+
+    _vms_that_exist[vm_id] = time.monotonic()
+    return True
+
+
+def clear_vm_exists_cache() -> None:
+    _vms_that_exist.clear()
+
+
+class AuthorizationContext:
+    """The identity of the user behind a request, computed once per request from the disraptor headers."""
+
+    def __init__(
+        self,
+        user_id: "Optional[str]",
+        groups: "list[str]",
+        vm_ids: "list[str]",
+        organizer_ids: "list[str]",
+    ) -> None:
+        self.user_id = user_id
+        self.groups = groups
+        self.vm_ids = vm_ids
+        self.organizer_ids = organizer_ids
+        self.is_admin = "admins" in groups or "tira_reviewer" in groups
+        self.is_admin_for_task: "Optional[bool]" = None
+
 
 class Authentication(object):
     """Base class for Authentication and Role Management"""
@@ -106,6 +154,17 @@ class Authentication(object):
         Returns true if the user is an admin for the task specified in the request (false if the request url does not
         point to a task or if the user is only admin for some other task).
         """
+        context = getattr(request, "_tira_auth_context", None)
+        if context is not None and context.is_admin_for_task is not None:
+            return context.is_admin_for_task
+
+        ret = self._is_admin_for_task(request)
+        if context is not None:
+            context.is_admin_for_task = ret
+
+        return ret
+
+    def _is_admin_for_task(self, request: "HttpRequest") -> bool:
         organizer_ids = auth.get_organizer_ids(request)
 
         if not organizer_ids or not isinstance(organizer_ids, list) or len(organizer_ids) < 1:
@@ -155,17 +214,37 @@ class DisraptorAuthentication(Authentication):
         super(DisraptorAuthentication, self).__init__(**kwargs)
         self.discourse_client = model.discourse_api_client()
 
-    def _get_user_id(self, request: "HttpRequest") -> "Optional[str]":
-        """Return the content of the X-Disraptor-User header set in the http request"""
+    def _auth_context(self, request: "HttpRequest") -> AuthorizationContext:
+        """Parse the disraptor headers of the request once and attach the result to the request."""
+        ret = getattr(request, "_tira_auth_context", None)
+        if ret is not None:
+            return ret
+
+        all_groups = request.headers.get("X-Disraptor-Groups", "None").split(",")
         user_id = request.headers.get("X-Disraptor-User", None)
+        vm_ids = [group["value"] for group in self._parse_tira_groups(all_groups) if group["key"] == "vm"]
+        organizer_ids = [group["value"] for group in self._parse_tira_groups(all_groups) if group["key"] == "org"]
+
+        # Some discourse vm groups are created manually, so we have to ensure that they also have a vm
+        for vm_id in vm_ids:
+            assert vm_id is not None
+            ensure_vm_exists(vm_id)
+
         if user_id is not None:
-            vm_id = Authentication.get_default_vm_id(user_id)
-            _ = model.get_vm(vm_id, create_if_none=True)
-        return user_id
+            ensure_vm_exists(Authentication.get_default_vm_id(user_id))
+
+        ret = AuthorizationContext(user_id, all_groups, vm_ids + [f"{user_id}-default"], organizer_ids)
+        request._tira_auth_context = ret  # type: ignore [attr-defined]
+
+        return ret
+
+    def _get_user_id(self, request: "HttpRequest") -> "Optional[str]":
+        """Return the content of the X-Disraptor-User header set in the http request"""
+        return self._auth_context(request).user_id
 
     def _is_in_group(self, request: "HttpRequest", group_name: str = "tira_reviewer") -> bool:
         """return True if the user is in the given disraptor group"""
-        return group_name in request.headers.get("X-Disraptor-Groups", "").split(",")
+        return group_name in self._auth_context(request).groups
 
     def _parse_tira_groups(self, groups: list[str]) -> "Iterable[dict[str, Optional[str]]]":
         """find all groups with 'tira_' prefix and return key and value of the group.
@@ -188,20 +267,10 @@ class DisraptorAuthentication(Authentication):
         """read groups from the disraptor groups header.
         @param group_type: {"vm", "org"}, indicate the class of groups.
         """
-        all_groups = request.headers.get("X-Disraptor-Groups", "None").split(",")
-        user_id = f"{request.headers.get('X-Disraptor-User', None)}-default"
-
         if group_type == "vm":  # if we check for groups of a virtual machine
-            ret = [group["value"] for group in self._parse_tira_groups(all_groups) if group["key"] == "vm"]
-
-            # Some discourse vm groups are created manually, so we have to ensure that they also have a vm
-            for vm_id in ret:
-                assert vm_id is not None
-                _ = model.get_vm(vm_id, create_if_none=True)
-
-            return ret + [user_id]
+            return list(self._auth_context(request).vm_ids)
         if group_type == "org":  # if we check for organizer groups of a user
-            return [group["value"] for group in self._parse_tira_groups(all_groups) if group["key"] == "org"]
+            return list(self._auth_context(request).organizer_ids)
 
         raise ValueError(f"Can't handle group type {group_type}")
 
@@ -221,11 +290,7 @@ class DisraptorAuthentication(Authentication):
         Currently only checks: (1) is user admin, (2) otherwise, is user owner of the vm (ROLE_PARTICIPANT)
         """
 
-        if (
-            self._is_in_group(request, "admins")
-            or self._is_in_group(request, "tira_reviewer")
-            or self.is_admin_for_task(request)
-        ):
+        if self._auth_context(request).is_admin or self.is_admin_for_task(request):
             return self.ROLE_ADMIN
 
         user_groups = self._get_user_groups(request, group_type="vm")
@@ -337,7 +402,7 @@ Best regards"""
         Please do not hesitate to design your team's page accorging to your needs."""
 
         group_id = self.discourse_client.create_group(f"tira_vm_{slugify(team_name)}", group_bio, 0)
-        model.get_vm(team_name, create_if_none=True)
+        ensure_vm_exists(team_name)
         self.discourse_client.add_user_as_owner_to_group(group_id, user_name)
         invite_link = self.discourse_client.create_invite_link(group_id)
         return {
@@ -458,6 +523,11 @@ Best regards"""
                 and organizer_id_from_dataset_id in organizer_ids
                 and path == f"/tira-admin/delete-dataset/{dataset_id_from_params}"
             )
+            or (
+                organizer_id_from_dataset_id is not None
+                and organizer_id_from_dataset_id in organizer_ids
+                and path == f"/tira-admin/evaluate-runs/{dataset_id_from_params}"
+            )
             or (
                 organizer_id_from_dataset_id is not None
                 and organizer_id_from_dataset_id in organizer_ids
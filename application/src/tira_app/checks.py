@@ -8,7 +8,7 @@ from django.shortcuts import redirect
 from django.urls import resolve
 
 from . import tira_model as model
-from .authentication import auth
+from .authentication import auth, vm_exists
 
 if TYPE_CHECKING:
     from typing import Optional
@@ -145,7 +145,7 @@ def check_permissions(func):
             return func(request, *args, **kwargs)
 
         if vm_id is not None:
-            if not model.vm_exists(vm_id):  # If the resource does not exist
+            if not vm_exists(vm_id):  # If the resource does not exist
                 return _redirect_to_login()
             role = auth.get_role(request, user_id=auth.get_user_id(request), vm_id=vm_id)
             if run_id and dataset_id:  # this prevents participants from viewing hidden runs
@@ -238,7 +238,7 @@ def check_conditional_permissions(
                 return HttpResponseNotAllowed("Access restricted.")
 
             if vm_id:  # First we determine the role of the user on the resource he requests
-                if not model.vm_exists(vm_id):
+                if not vm_exists(vm_id):
                     return _redirect_to_login()
                 role_on_vm = auth.get_role(request, user_id=auth.get_user_id(request), vm_id=vm_id)
                 if run_id and dataset_id:
@@ -341,7 +341,7 @@ def check_resources_exist(reply_as: str = "json"):
                 return Http404(message)
 
             if "vm_id" in kwargs:
-                if not model.vm_exists(kwargs["vm_id"]):
+                if not vm_exists(kwargs["vm_id"]):
                     logger.error(f"{resolve(request.path_info).url_name}: vm_id does not exist")
                     if "task_id" in kwargs:
                         return return_fail(
@@ -0,0 +1,194 @@
+"""Uploads that are sent in parts, so that clients can resume an upload after a failure instead of starting over.
+
+Each part is stored together with its md5 checksum below ``TIRA_ROOT/data/chunked-uploads/<namespace>/<upload_id>``.
+Once all parts are received, they are assembled into a single file that is passed on to the regular upload logic.
+Anonymous uploads (in namespaces that start with ``ANONYMOUS_NAMESPACE_PREFIX``) need no account, so the number and the
+total size of the pending anonymous uploads are limited.
+"""
+
+import hashlib
+import logging
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional
+
+    from django.core.files.uploadedfile import UploadedFile
+
+logger = logging.getLogger("tira")
+
+MAX_PART_SIZE = 64 * 1024 * 1024
+MAX_PARTS = 10_000
+# The maximum size of all parts of an upload together.
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024 * 1024
+# Parts of uploads that were not completed within this many seconds are removed.
+UPLOAD_EXPIRY = 24 * 60 * 60
+ANONYMOUS_NAMESPACE_PREFIX = "anonymous-"
+MAX_PENDING_ANONYMOUS_UPLOADS = 100
+# The maximum size of all parts of all pending anonymous uploads together.
+MAX_PENDING_ANONYMOUS_SIZE = 64 * 1024 * 1024 * 1024
+
+_VALID_NAME = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_.-]{0,127}$")
+
+
+def _md5_of_file(path: Path) -> str:
+    ret = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            ret.update(chunk)
+    return ret.hexdigest()
+
+
+def chunked_upload_dir(namespace: str, upload_id: str) -> Path:
+    for name in (namespace, upload_id):
+        if not name or not _VALID_NAME.match(name) or ".." in name:
+            raise ValueError(f"The upload id {name} is invalid.")
+
+    return Path(settings.TIRA_ROOT) / "data" / "chunked-uploads" / namespace / upload_id
+
+
+def received_parts(upload_dir: Path) -> "dict[int, str]":
+    """The md5 checksums of the parts that were already received, used by clients to resume an upload."""
+    ret = {}
+    if not upload_dir.is_dir():
+        return ret
+
+    for md5_file in upload_dir.glob("*.md5"):
+        if (upload_dir / f"{md5_file.stem}.part").is_file():
+            ret[int(md5_file.stem)] = md5_file.read_text().strip()
+
+    return ret
+
+
+def _size_of_other_parts(upload_dir: Path, part: int) -> int:
+    return sum(i.stat().st_size for i in upload_dir.glob("*.part") if i.name != f"{part:06d}.part")
+
+
+def _size_of_parts(upload_dir: Path) -> int:
+    ret = 0
+    for i in [*upload_dir.glob("*.part"), *upload_dir.glob("*.tmp")]:
+        try:
+            ret += i.stat().st_size
+        except OSError:
+            # Parts that are written concurrently are renamed or removed in between
+            pass
+    return ret
+
+
+def _max_size_of_anonymous_part(upload_dir: Path, part: int) -> int:
+    """The maximum size of the part so that the pending anonymous uploads stay within their limits.
+
+    Parts that are written concurrently (.tmp files) count towards the limits with the bytes received so far, so
+    parallel requests can exceed the total size by at most one part each.
+    """
+    pending = [i for i in upload_dir.parent.parent.glob(f"{ANONYMOUS_NAMESPACE_PREFIX}*/*") if i.is_dir()]
+    if upload_dir not in pending and len(pending) >= MAX_PENDING_ANONYMOUS_UPLOADS:
+        raise ValueError(
+            f"There are already {len(pending)} pending anonymous uploads, please try again later or upload with an "
+            "account."
+        )
+
+    pending_size = sum(_size_of_parts(i) for i in pending if i != upload_dir)
+    ret = MAX_PENDING_ANONYMOUS_SIZE - pending_size - _size_of_other_parts(upload_dir, part)
+    if ret <= 0:
+        raise ValueError(
+            f"The pending anonymous uploads exceed the maximum of {MAX_PENDING_ANONYMOUS_SIZE} bytes, please try "
+            "again later or upload with an account."
+        )
+
+    return ret
+
+
+def store_part(upload_dir: Path, part: int, uploaded_file: "UploadedFile", expected_md5: "Optional[str]") -> str:
+    """Persist the part and return its md5 checksum, parts with an unexpected checksum are rejected."""
+    if part < 0 or part >= MAX_PARTS:
+        raise ValueError(f"The part {part} is out of range, expected a part between 0 and {MAX_PARTS - 1}.")
+
+    remove_expired_uploads(upload_dir.parent.parent)
+    max_size = min(MAX_PART_SIZE, MAX_UPLOAD_SIZE - _size_of_other_parts(upload_dir, part))
+    if upload_dir.parent.name.startswith(ANONYMOUS_NAMESPACE_PREFIX):
+        max_size = min(max_size, _max_size_of_anonymous_part(upload_dir, part))
+
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    tmp_file = upload_dir / f"{part:06d}.{uuid.uuid4().hex}.tmp"
+    md5, size = hashlib.md5(), 0
+
+    try:
+        with open(tmp_file, "wb") as f:
+            for chunk in uploaded_file.chunks():
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(
+                        f"The part {part} is larger than the maximum of {MAX_PART_SIZE} bytes or the upload is "
+                        f"larger than the maximum of {MAX_UPLOAD_SIZE} bytes (or the pending anonymous uploads are "
+                        f"larger than the maximum of {MAX_PENDING_ANONYMOUS_SIZE} bytes)."
+                    )
+                md5.update(chunk)
+                f.write(chunk)
+
+        if expected_md5 and expected_md5 != md5.hexdigest():
+            raise ValueError(f"The checksum of part {part} does not match, expected {expected_md5}.")
+
+        (upload_dir / f"{part:06d}.md5").write_text(md5.hexdigest())
+        tmp_file.replace(upload_dir / f"{part:06d}.part")
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+    return md5.hexdigest()
+
+
+def assemble(upload_dir: Path, parts: int, expected_md5: "Optional[str]", name: str = "upload.zip") -> Path:
+    """Concatenate the parts 0 to parts-1 into a single file and verify its md5 checksum."""
+    missing = [i for i in range(parts) if not (upload_dir / f"{i:06d}.part").is_file()]
+    if parts < 1 or missing:
+        raise ValueError(f"The upload is incomplete, the parts {missing[:10]} are missing.")
+
+    ret = upload_dir / "assembled" / name
+    ret.parent.mkdir(parents=True, exist_ok=True)
+    with open(ret, "wb") as target:
+        for i in range(parts):
+            with open(upload_dir / f"{i:06d}.part", "rb") as part:
+                shutil.copyfileobj(part, target, 1024 * 1024)
+
+    if expected_md5 and expected_md5 != _md5_of_file(ret):
+        ret.unlink()
+        raise ValueError(f"The checksum of the assembled upload does not match, expected {expected_md5}.")
+
+    return ret
+
+
+def remove_upload(upload_dir: Path) -> None:
+    shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+def remove_expired_uploads(base_dir: Path) -> None:
+    if not base_dir.is_dir():
+        return
+
+    for upload_dir in base_dir.glob("*/*"):
+        try:
+            if time.time() - upload_dir.stat().st_mtime > UPLOAD_EXPIRY:
+                logger.info(f"Remove the expired chunked upload {upload_dir}.")
+                remove_upload(upload_dir)
+        except OSError:
+            pass
+
+
+class AssembledFile:
+    """Exposes an assembled upload with the interface of the uploaded files from django that the upload logic uses."""
+
+    def __init__(self, path: Path, name: "Optional[str]" = None) -> None:
+        self.path = path
+        self.name = name if name else path.name
+
+    def chunks(self, chunk_size: int = 1024 * 1024) -> "Iterable[bytes]":
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
@@ -361,6 +361,17 @@ class HybridDatabase(object):
         except modeldb.Dataset.DoesNotExist:
             return {}
 
+    def get_meta_datasets_of(self, dataset_id: str) -> "list[str]":
+        """Return the ids of all meta datasets that aggregate the given dataset via meta_dataset_of."""
+        ret = []
+        for dataset in modeldb.Dataset.objects.filter(meta_dataset_of__contains=dataset_id).only(
+            "dataset_id", "meta_dataset_of"
+        ):
+            if dataset_id in [j.strip() for j in dataset.meta_dataset_of.split(",")]:
+                ret += [dataset.dataset_id]
+
+        return ret
+
     def get_datasets(self) -> "dict[str, dict[str, Any]]":
         """Get a dict of dataset_id: dataset_json_descriptor"""
         return {
@@ -402,6 +413,12 @@ class HybridDatabase(object):
         except modeldb.Dataset.DoesNotExist:
             return {}
 
+    def get_docker_software_summaries(self, docker_software_ids: "Iterable[int]") -> "dict[int, dict[str, Any]]":
+        ret = modeldb.DockerSoftware.objects.filter(docker_software_id__in=set(docker_software_ids)).values(
+            "docker_software_id", "display_name", "user_image_name", "command"
+        )
+        return {i["docker_software_id"]: i for i in ret}
+
     def get_docker_software_by_name(self, name: str, vm_id: str, task_id: str) -> "dict[str, Any]":
         try:
             ret = modeldb.DockerSoftware.objects.filter(
@@ -1,19 +1,43 @@
 import configparser
+import logging
 import os
-from typing import Optional, Tuple
+import re
+import threading
+import uuid
+from hashlib import md5
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import BaseClient
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from botocore.response import StreamingBody
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 
 from tira_app import model as modeldb
 
-_aws_access_key_id: "Optional[str]" = None
-_aws_secret_access_key: "Optional[str]" = None
-_use_https: bool = True
-_endpoint_url: "Optional[str]" = None
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+logger = logging.getLogger("tira")
+
+# The s3 client is shared by all threads of a process, boto3 clients are thread-safe and pool their connections.
+_client: "Optional[BaseClient]" = None
+_client_pid: "Optional[int]" = None
+_client_lock = threading.Lock()
+MAX_POOL_CONNECTIONS = 32
+CHUNK_SIZE = 1024 * 1024
+
+# Large resources are uploaded in parts that are transferred concurrently.
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024, multipart_chunksize=64 * 1024 * 1024, max_concurrency=16
+)
+
+# Only single ranges are supported, other range requests are answered with the complete file.
+_SINGLE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
 
 DO_NOT_USE_S3 = str(settings.S3_BUCKET).lower() == "none"
 
@@ -22,6 +46,71 @@ if not os.path.exists(_s3_config_file):
     raise ValueError(f"Config file does not exist: {_s3_config_file}")
 
 
+class MultipartUpload:
+    """Uploads the written bytes to s3 in parts while they are written, so that resources are never staged on disk.
+
+    The md5 sum that is the key of the resource is only known after all bytes are written, so the parts are uploaded
+    to a staging key and the completed object is copied to its md5 sum on the server side.
+    """
+
+    def __init__(self, client: BaseClient) -> None:
+        self.__client = client
+        self.__key = f"staging/{uuid.uuid4().hex}"
+        self.__upload_id = client.create_multipart_upload(Bucket=settings.S3_BUCKET, Key=self.__key)["UploadId"]
+        self.__parts: "List[dict]" = []
+        self.__buffer = bytearray()
+        self.__md5_sum = md5()
+        self.__first_kilobyte = b""
+        self.__size = 0
+
+    def write(self, data: bytes) -> None:
+        self.__md5_sum.update(data)
+        if len(self.__first_kilobyte) < 1024:
+            self.__first_kilobyte += data[: 1024 - len(self.__first_kilobyte)]
+        self.__size += len(data)
+        self.__buffer += data
+        if len(self.__buffer) >= _TRANSFER_CONFIG.multipart_chunksize:
+            self.__upload_part()
+
+    def __upload_part(self) -> None:
+        part_number = len(self.__parts) + 1
+        response = self.__client.upload_part(
+            Bucket=settings.S3_BUCKET,
+            Key=self.__key,
+            UploadId=self.__upload_id,
+            PartNumber=part_number,
+            Body=bytes(self.__buffer),
+        )
+        self.__parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self.__buffer = bytearray()
+
+    def complete(self) -> "Tuple[str, str, int]":
+        """Complete the upload and return the md5 sum, the md5 sum of the first kilobyte, and the size."""
+        if self.__size == 0:
+            raise ValueError("Empty resources are not uploaded.")
+        if self.__buffer or not self.__parts:
+            self.__upload_part()
+
+        self.__client.complete_multipart_upload(
+            Bucket=settings.S3_BUCKET,
+            Key=self.__key,
+            UploadId=self.__upload_id,
+            MultipartUpload={"Parts": self.__parts},
+        )
+        md5_sum = self.__md5_sum.hexdigest()
+        source = {"Bucket": settings.S3_BUCKET, "Key": self.__key}
+        self.__client.copy(source, settings.S3_BUCKET, md5_sum, Config=_TRANSFER_CONFIG)
+        self.__client.delete_object(Bucket=settings.S3_BUCKET, Key=self.__key)
+
+        return md5_sum, md5(self.__first_kilobyte).hexdigest(), self.__size
+
+    def abort(self) -> None:
+        try:
+            self.__client.abort_multipart_upload(Bucket=settings.S3_BUCKET, Key=self.__key, UploadId=self.__upload_id)
+        except Exception as e:
+            logger.warning(f"Could not abort the multipart upload of {self.__key}: {e}")
+
+
 class S3Database:
     def read_credentials(self) -> Tuple:
         if DO_NOT_USE_S3:
@@ -40,30 +129,100 @@ class S3Database:
         return aws_access_key_id, aws_secret_access_key, use_https, endpoint_url
 
     def s3_client(self) -> BaseClient:
-        global _aws_access_key_id
-        global _aws_secret_access_key
-        global _use_https
-        global _endpoint_url
-
-        if not _aws_access_key_id:
-            _aws_access_key_id, _aws_secret_access_key, _use_https, _endpoint_url = self.read_credentials()
-
-        return boto3.client(
-            "s3",
-            aws_access_key_id=_aws_access_key_id,
-            aws_secret_access_key=_aws_secret_access_key,
-            endpoint_url=_endpoint_url,
-            use_ssl=_use_https,
-        )
+        global _client
+        global _client_pid
+
+        if _client is None or _client_pid != os.getpid():
+            # Creating clients is not thread-safe and forked processes must not reuse the connections of their parent.
+            with _client_lock:
+                if _client is None or _client_pid != os.getpid():
+                    aws_access_key_id, aws_secret_access_key, use_https, endpoint_url = self.read_credentials()
+                    _client = boto3.client(
+                        "s3",
+                        aws_access_key_id=aws_access_key_id,
+                        aws_secret_access_key=aws_secret_access_key,
+                        endpoint_url=endpoint_url,
+                        use_ssl=use_https,
+                        config=Config(max_pool_connections=MAX_POOL_CONNECTIONS),
+                    )
+                    _client_pid = os.getpid()
+
+        return _client
 
     def upload_mirrored_resource(self, mirrored_resource: modeldb.MirroredResource) -> None:
         self.s3_client().upload_file(
-            mirrored_resource.get_path_in_file_system(), settings.S3_BUCKET, mirrored_resource.md5_sum
+            str(mirrored_resource.get_path_in_file_system()),
+            settings.S3_BUCKET,
+            mirrored_resource.md5_sum,
+            Config=_TRANSFER_CONFIG,
         )
 
-    def read_mirrored_resource(self, mirrored_resource: modeldb.MirroredResource) -> StreamingBody:
-        response = self.s3_client().get_object(Bucket=settings.S3_BUCKET, Key=mirrored_resource.md5_sum)
-        return response["Body"]
+    def multipart_upload(self) -> MultipartUpload:
+        return MultipartUpload(self.s3_client())
+
+    def read_mirrored_resource(
+        self, mirrored_resource: modeldb.MirroredResource, byte_range: "Optional[str]" = None
+    ) -> StreamingBody:
+        return self.get_mirrored_resource(mirrored_resource, byte_range)["Body"]
+
+    def get_mirrored_resource(self, mirrored_resource: modeldb.MirroredResource, byte_range: "Optional[str]" = None):
+        """The response of s3 for the resource, restricted to the byte range (e.g., bytes=0-1023) if one is passed."""
+        kwargs = {"Range": byte_range} if byte_range else {}
+        return self.s3_client().get_object(Bucket=settings.S3_BUCKET, Key=mirrored_resource.md5_sum, **kwargs)
+
+    def presigned_url(self, mirrored_resource: modeldb.MirroredResource, filename: str) -> str:
+        """A short-lived url that allows to download the resource directly from s3 without credentials."""
+        return self.s3_client().generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": settings.S3_BUCKET,
+                "Key": mirrored_resource.md5_sum,
+                "ResponseContentDisposition": f'attachment; filename="{filename}"',
+            },
+            ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRY,
+        )
+
+    def download_response(
+        self, request: "HttpRequest", mirrored_resource: modeldb.MirroredResource, filename: str
+    ) -> HttpResponse:
+        """The response that hands out the resource for download according to the configured S3_DOWNLOAD_MODE.
+
+        - "stream": the django worker streams the object from s3, single byte ranges are supported.
+        - "presigned": redirect the client to a presigned url so that it downloads the object directly from s3.
+        - "x-accel-redirect": nginx downloads the object from the presigned url, e.g., with an internal location like
+          ``location ~ ^/s3-mirrored-resources/(https?)/([^/]+)/(.*)$ {``
+          ``internal; proxy_pass $1://$2/$3$is_args$args; }``
+        """
+        if settings.S3_DOWNLOAD_MODE == "presigned":
+            return HttpResponseRedirect(self.presigned_url(mirrored_resource, filename))
+
+        if settings.S3_DOWNLOAD_MODE == "x-accel-redirect":
+            url = urlsplit(self.presigned_url(mirrored_resource, filename))
+            location = settings.S3_X_ACCEL_REDIRECT_LOCATION.rstrip("/")
+            ret = HttpResponse(content_type="application/zip")
+            ret["X-Accel-Redirect"] = f"{location}/{url.scheme}/{url.netloc}{url.path}?{url.query}"
+            ret["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return ret
+
+        byte_range = request.headers.get("Range", "").replace(" ", "")
+        byte_range = byte_range if _SINGLE_RANGE.match(byte_range) else None
+        try:
+            response = self.get_mirrored_resource(mirrored_resource, byte_range)
+        except ClientError as e:
+            if byte_range and e.response["Error"]["Code"] == "InvalidRange":
+                ret = HttpResponse(status=416)
+                ret["Content-Range"] = f"bytes */{mirrored_resource.size}"
+                return ret
+            raise
+
+        ret = StreamingHttpResponse(response["Body"].iter_chunks(CHUNK_SIZE), content_type="application/zip")
+        if byte_range and response.get("ContentRange"):
+            ret.status_code = 206
+            ret["Content-Range"] = response["ContentRange"]
+        ret["Content-Length"] = str(response["ContentLength"])
+        ret["Accept-Ranges"] = "bytes"
+        ret["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return ret
 
     def s3_file_exists(self, mirrored_resource: modeldb.MirroredResource) -> bool:
         http_code, content_length = self.s3_file_head(mirrored_resource)
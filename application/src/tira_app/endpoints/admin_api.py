@@ -613,6 +613,35 @@ def admin_edit_dataset(request: "HttpRequest", dataset_id: str) -> "HttpResponse
     return JsonResponse({"status": 1, "message": "GET is not implemented for add dataset"})
 
 
+@check_permissions
+@check_resources_exist("json")
+def admin_evaluate_runs(request: "HttpRequest", dataset_id: str) -> "HttpResponse":
+    """Evaluate many runs of the dataset at once, e.g., to re-evaluate all runs after the evaluator changed.
+    Send the runs via POST as {"runs": [{"vm_id": ..., "run_id": ...}, ...]}. The truths are loaded only once for all
+    runs and the evaluations are added to the runs as soon as they are finished.
+    """
+    if request.method != "POST":
+        return JsonResponse({"status": 1, "message": "GET is not implemented for evaluate runs"})
+
+    from .vm_api import run_evaluations
+
+    try:
+        runs = [(str(i["vm_id"]), str(i["run_id"])) for i in json.loads(request.body)["runs"]]
+    except Exception:
+        return JsonResponse(
+            {"status": 1, "message": 'Please pass the runs as {"runs": [{"vm_id": .., "run_id": ..}]}.'}
+        )
+
+    missing = [run_id for vm_id, run_id in runs if not model.run_exists(vm_id, dataset_id, run_id)]
+    if not runs or missing:
+        return JsonResponse({"status": 1, "message": f"The runs {missing} do not exist on the dataset {dataset_id}."})
+
+    task_id = model.get_dataset(dataset_id)["task"]
+    job_ids = run_evaluations(runs, task_id, dataset_id)
+
+    return JsonResponse({"status": 0, "message": f"Started the evaluation of {len(runs)} runs.", "jobs": job_ids})
+
+
 def call_django_command_failsave(cmd: str, args: list[str]) -> "dict[str, Optional[str]]":
     import sys
     from io import StringIO
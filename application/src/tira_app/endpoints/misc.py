@@ -22,6 +22,7 @@ rest_api_version = "v1.0.0-draft"
 
 EVALUATOR_TO_TYPE = {
     "TrecTools": "Retrieval",
+    "IrMeasures": "Retrieval",
     "RunFileEvaluator": "Retrieval",
     "HuggingFaceEvaluator": "Classification",
     "WowsEvalEvaluator": "Retrieval",
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
+import hmac
 import json
 import logging
 import zipfile
 from time import gmtime, strftime
 from typing import IO
 
-from django.http import HttpResponseServerError, JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, HttpResponseServerError, JsonResponse
 from django.urls import path
 from django.views.decorators.http import require_POST
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from ... import tira_model as model
 from ...checks import check_conditional_permissions
 from ...model import RunningProcesses
+from ...pipeline_refresher import invalidate_running_pipelines
 from ..vm_api import _run_evaluation
 
 logger = logging.getLogger("tira")
@@ -192,6 +197,29 @@ def validate_docker_image(request: Request) -> Response:
     return JsonResponse({"status": 0, "message": "ok", "context": ret})
 
 
+@api_view(["POST"])
+@permission_classes([])
+@authentication_classes([])
+def pipeline_events(request: Request) -> Response:
+    """Webhook for pipeline and job events of the git hoster so that the cache daemon refreshes the repository."""
+    token = settings.GIT_CI_WEBHOOK_TOKEN
+    if not token or not hmac.compare_digest(str(token), request.headers.get("X-Gitlab-Token", "")):
+        return HttpResponseForbidden(json.dumps({"status": 1, "message": "Invalid webhook token."}))
+
+    try:
+        event = json.loads(request.body)
+        # Pipeline events describe the project, job events only reference it.
+        git_repository_id = event["project"]["id"] if "project" in event else event["project_id"]
+    except (ValueError, KeyError, TypeError):
+        git_repository_id = None
+
+    if isinstance(git_repository_id, bool) or not isinstance(git_repository_id, (int, str)) or not git_repository_id:
+        return HttpResponseBadRequest(json.dumps({"status": 1, "message": "A field project.id is expected."}))
+
+    invalidate_running_pipelines(git_repository_id, cache)
+    return JsonResponse({"status": 0, "message": "ok"})
+
+
 endpoints = [
     path("upload-response/<str:vm_id>/<str:job_id>", upload_response),
     path(
@@ -201,4 +229,5 @@ endpoints = [
     path("registered-workers/<str:vm_id>", registered_workers),
     path("active-jobs/<str:vm_id>/<str:task_id>", active_jobs),
     path("validate-docker-image", validate_docker_image),
+    path("pipeline-events", pipeline_events),
 ]
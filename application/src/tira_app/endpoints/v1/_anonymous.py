@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING
 import yaml
 from django.conf import settings
 from django.core.cache import cache
-from django.http import FileResponse, HttpResponse, HttpResponseServerError
+from django.http import HttpResponse, HttpResponseServerError
 from django.urls import path
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.request import Request
@@ -116,20 +116,18 @@ def download_anonymous_submission(request: Request, submission_uuid: str) -> Res
         with zipfile.ZipFile(zipped, "w", zipfile.ZIP_DEFLATED) as zipf:
             for f in result_dir.rglob("*"):
                 zipf.write(f, arcname=f.relative_to(result_dir.parent))
-        mirror = upload_mirrored_resource(zipped)
+        mirror = upload_mirrored_resource(zipped, move=True)
         upload.mirrored_resource = mirror
         upload.save()
 
     try:
-        ret_body = s3_db.read_mirrored_resource(upload.mirrored_resource)
+        return s3_db.download_response(request, upload.mirrored_resource, f"{submission_uuid}.zip")
     except Exception as e:
         msg = f"Could not load data from s3 in download_anonymous_submission {e}."
         print(msg, e)
         logger.warning(msg)
         return HttpResponseServerError(json.dumps({"status": 1, "message": "Could not load data from s3."}))
 
-    return FileResponse(ret_body, as_attachment=True, filename=f"{submission_uuid}.zip")
-
 
 def check_format_for_dataset(directory: "Path", dataset: "Dataset"):
     format = json.loads(dataset.format)
@@ -186,7 +184,7 @@ def claim_submission(request: Request, vm_id: str, submission_uuid: str) -> Resp
             },
         )
         body["upload_group"] = model.add_upload(task_id, vm_id)["id"]
-        model.model.update_upload_metadata(
+        model.update_upload_metadata(
             task_id, vm_id, body["upload_group"], body["display_name"], body["description"], body["paper_link"]
         )
 
@@ -201,7 +199,7 @@ def claim_submission(request: Request, vm_id: str, submission_uuid: str) -> Resp
 
             return [all_bytes]
 
-    new_run = model.model.add_uploaded_run(task_id, vm_id, dataset_id, body["upload_group"], MockedResponse())
+    new_run = model.add_uploaded_run(task_id, vm_id, dataset_id, body["upload_group"], MockedResponse())
     new_run_db = modeldb.Run.objects.get(run_id=new_run["run"]["run_id"])
     new_run_db.from_upload = upload
     new_run_db.save()
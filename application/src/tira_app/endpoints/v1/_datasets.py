@@ -1,9 +1,8 @@
 import json
-import tempfile
-import zipfile
+import logging
+import uuid
 from hashlib import md5
 from pathlib import Path
-from shutil import copyfileobj
 from typing import TYPE_CHECKING
 
 import markdown
@@ -17,13 +16,18 @@ from rest_framework_json_api.views import ModelViewSet
 
 from ... import model as modeldb
 from ... import tira_model as model
-from ...data.s3 import S3Database
+from ...data.s3 import MultipartUpload, S3Database
+from ...streaming_zip import files_to_zip, stream_zip
 
 if TYPE_CHECKING:
-    from typing import Any, Optional
+    from typing import Any, BinaryIO, Generator, Iterable, Optional, Tuple
 
 # TODO: this file needs to be refactored to use ModelSerializer and ModelViewSet
 
+logger = logging.getLogger("tira")
+
+MIRRORED_RESOURCE_CHUNK_SIZE = 1024 * 1024
+
 
 class DatasetSerializer(ModelSerializer):
     id = CharField(source="dataset_id")
@@ -133,25 +137,58 @@ def load_mirrored_resource(md5_sum: str) -> "Optional[dict[str, Any]]":
     return ret
 
 
-def upload_mirrored_resource(zipped: Path):
-    zip_bytes = Path(zipped).read_bytes()
+def _hash_file(source: Path, target: "Optional[BinaryIO]" = None) -> "Tuple[str, str, int]":
+    """The md5 sum, the md5 sum of the first kilobyte, and the size of the source, optionally copied to target."""
+    md5_sum, first_kilobyte, size = md5(), b"", 0
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(MIRRORED_RESOURCE_CHUNK_SIZE), b""):
+            if len(first_kilobyte) < 1024:
+                first_kilobyte += chunk[: 1024 - len(first_kilobyte)]
+            md5_sum.update(chunk)
+            size += len(chunk)
+            if target is not None:
+                target.write(chunk)
 
-    md5_sum = str(md5(zip_bytes).hexdigest())
-    md5_first_kilobyte = str(md5(zip_bytes[:1024]).hexdigest())
+    return md5_sum.hexdigest(), md5(first_kilobyte).hexdigest(), size
 
-    target_dir = Path(settings.TIRA_ROOT) / "data" / "mirrored-resources"
+
+def store_mirrored_resource(zipped: Path, target_dir: Path, move: bool = False) -> "Tuple[str, str, int]":
+    """Store the file as target_dir/<md5 sum> in a single pass over the file and return the md5 sum, the md5 sum of
+    the first kilobyte, and the size. If move is true, the file is renamed into the target_dir when both are on the same
+    file system and removed otherwise.
+    """
+    zipped = Path(zipped)
     target_dir.mkdir(exist_ok=True, parents=True)
-    target_dir = target_dir / md5_sum
+    tmp_file = target_dir / f".{uuid.uuid4().hex}.tmp"
 
-    existing_resource = load_mirrored_resource(md5_sum)
+    try:
+        if move and zipped.stat().st_dev == target_dir.stat().st_dev:
+            md5_sum, md5_first_kilobyte, size = _hash_file(zipped)
+            staged = zipped
+        else:
+            with open(tmp_file, "wb") as f:
+                md5_sum, md5_first_kilobyte, size = _hash_file(zipped, f)
+            staged = tmp_file
+
+        if not (target_dir / md5_sum).exists():
+            staged.replace(target_dir / md5_sum)
+        else:
+            logger.info(f"The resource {target_dir / md5_sum} already exists, discard the copy of {zipped}.")
+    finally:
+        tmp_file.unlink(missing_ok=True)
+        if move:
+            zipped.unlink(missing_ok=True)
+
+    return md5_sum, md5_first_kilobyte, size
 
-    if not existing_resource:
-        with open(target_dir, "wb") as f_target, open(zipped, "rb") as s:
-            copyfileobj(s, f_target)
+
+def upload_mirrored_resource(zipped: Path, move: bool = False):
+    target_dir = Path(settings.TIRA_ROOT) / "data" / "mirrored-resources"
+    md5_sum, md5_first_kilobyte, size = store_mirrored_resource(zipped, target_dir, move)
 
     ret = modeldb.MirroredResource.objects.update_or_create(
         md5_sum=md5_sum,
-        defaults={"md5_first_kilobyte": md5_first_kilobyte, "size": len(zip_bytes), "mirrors": "webis-s3"},
+        defaults={"md5_first_kilobyte": md5_first_kilobyte, "size": size, "mirrors": "webis-s3"},
     )[0]
 
     s3_db = S3Database()
@@ -160,6 +197,56 @@ def upload_mirrored_resource(zipped: Path):
     return ret
 
 
+def _write_to_upload(upload: MultipartUpload, chunk: bytes) -> "Optional[Exception]":
+    try:
+        upload.write(chunk)
+        return None
+    except Exception as e:
+        return e
+
+
+def stream_as_mirrored_resource(
+    chunks: "Iterable[bytes]",
+) -> "Generator[bytes, None, modeldb.MirroredResource]":
+    """Yield the chunks while they are uploaded to s3 in parts and return the mirrored resource of their content.
+
+    A failing upload does not interrupt the yielded chunks, its error is raised after the last chunk was yielded.
+    """
+    upload, error = None, None
+    try:
+        upload = S3Database().multipart_upload()
+    except Exception as e:
+        error = e
+
+    try:
+        for chunk in chunks:
+            error = error or _write_to_upload(upload, chunk)
+            yield chunk
+
+        if error is not None:
+            raise error
+        md5_sum, md5_first_kilobyte, size = upload.complete()
+    except BaseException:
+        if upload is not None:
+            upload.abort()
+        raise
+
+    return modeldb.MirroredResource.objects.update_or_create(
+        md5_sum=md5_sum,
+        defaults={"md5_first_kilobyte": md5_first_kilobyte, "size": size, "mirrors": "webis-s3"},
+    )[0]
+
+
+def upload_as_mirrored_resource(chunks: "Iterable[bytes]") -> modeldb.MirroredResource:
+    """Upload the chunks to s3 in parts and return the mirrored resource of their content."""
+    stream = stream_as_mirrored_resource(chunks)
+    while True:
+        try:
+            next(stream)
+        except StopIteration as e:
+            return e.value
+
+
 def upload_dataset_part_as_mirrored_resource(task_id: str, dataset_id: str, dataset_type: str) -> str:
     dataset_suffix = "" if dataset_type == "input" else "-truth"
 
@@ -173,21 +260,18 @@ def upload_dataset_part_as_mirrored_resource(task_id: str, dataset_id: str, data
     target_directory: Path = (
         model.model.data_path / (dataset_prefix + "datasets" + dataset_suffix) / task_id / dataset_id
     )
+    entries = files_to_zip(target_directory)
+    if not any(f.is_file() for f, _ in entries):
+        raise ValueError(f"The dataset {dataset_id} has no {dataset_type} files to mirror.")
 
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        zipped = Path(tmp_dir) / f"{target_directory.stem}.zip"
-        with zipfile.ZipFile(zipped, "w") as zipf:
-            for f in target_directory.rglob("*"):
-                zipf.write(f, arcname=f.relative_to(target_directory.parent))
+    dataset = modeldb.Dataset.objects.get(dataset_id=dataset_id)
+    mirror = upload_as_mirrored_resource(stream_zip(entries))
 
-        dataset = modeldb.Dataset.objects.get(dataset_id=dataset_id)
-        mirror = upload_mirrored_resource(zipped)
-
-        modeldb.DatasetHasMirroredResource.objects.create(
-            dataset=dataset, mirrored_resource=mirror, resource_type=f"{dataset_type}s"
-        )
+    modeldb.DatasetHasMirroredResource.objects.create(
+        dataset=dataset, mirrored_resource=mirror, resource_type=f"{dataset_type}s"
+    )
 
-        return mirror.md5_sum
+    return mirror.md5_sum
 
 
 def mirrors_for_dataset(dataset_id: str) -> "dict[str, dict[str, Any]]":
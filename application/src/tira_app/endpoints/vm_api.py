@@ -29,6 +29,7 @@ from rest_framework.decorators import authentication_classes, permission_classes
 from tira.check_format import _fmt, check_format
 from tira.io_utils import sanitize_text
 from tira.third_party_integrations import temporary_directory
+from werkzeug.utils import secure_filename
 
 from .. import tira_model as model
 from ..checks import (
@@ -190,6 +191,34 @@ def _run_evaluation(vm_id: str, task_id: str, run_id: str, dataset_id: str):
         run_sandboxed_eval(run_id=run_id, dataset=dataset_id, task=task_id, team=vm_id)
 
 
+def run_evaluations(runs: "list[tuple[str, str]]", task: str, dataset: str) -> "list[str]":
+    """Evaluate many (team, run_id) runs at once with a single task of the worker and return the ids of their jobs.
+    The worker evaluates the runs with the trusted evaluator of the dataset if allowed, so that the truths are parsed
+    only once and no evaluations are forked from the (multithreaded) web server.
+    """
+    from tira_worker import evaluate_batch
+
+    dataset_configuration = model.get_dataset(dataset)
+    evaluator_id = dataset_configuration["evaluator_id"]
+    evaluator = model.get_evaluator(dataset, task)
+    jobs = [
+        {"run_id": run_id, "team": team, "job_id": add_job("evaluator", task, team, dataset, evaluator)}
+        for team, run_id in runs
+    ]
+    queue = dataset_configuration.get("queue", "evaluator")
+    if not queue:
+        queue = "evaluator"
+
+    result = evaluate_batch.apply_async(args=[jobs, dataset, evaluator_id, task], queue=queue)
+    for job in jobs:
+        try:
+            add_celery_id_to_job(job["job_id"], result.id)
+        except Exception as e:
+            logger.exception("Could not add celery id to evaluation job", exc_info=e)
+
+    return [i["job_id"] for i in jobs]
+
+
 def run_sandboxed_software(
     task_id: str,
     dataset_id: str,
@@ -302,49 +331,129 @@ def upload(request: "HttpRequest", task_id: str, vm_id: str, dataset_id: str, up
         if not request.FILES or "file" not in request.FILES.keys():
             return JsonResponse({"status": 1, "message": "Please pass a payload. No file in the post"})
 
-        uploaded_file = request.FILES["file"]
+        return add_uploaded_run(
+            task_id,
+            vm_id,
+            dataset_id,
+            upload_id,
+            request.FILES["file"],
+            request.POST.get("display_name"),
+            request.POST.get("description"),
+        )
+    else:
+        return JsonResponse({"status": 1, "message": "GET is not allowed here."})
 
-        from shutil import rmtree
 
-        from ..model import Dataset, Run
-        from .v1._anonymous import check_format_for_dataset
+def add_uploaded_run(
+    task_id: str,
+    vm_id: str,
+    dataset_id: str,
+    upload_id: str,
+    uploaded_file: Any,
+    display_name: Optional[str],
+    description: Optional[str],
+) -> HttpResponse:
+    """Add the uploaded file as run, shared by direct uploads and uploads that were sent in parts."""
+    from shutil import rmtree
 
-        dataset = Dataset.objects.get(dataset_id=dataset_id)
+    from ..model import Dataset, Run
+    from .v1._anonymous import check_format_for_dataset
 
-        if upload_id == "new-submission":
-            upload_id = model.add_upload(task_id, vm_id, None)["id"]
-            model.update_upload_metadata(
-                task_id,
-                vm_id,
-                upload_id,
-                sanitize_text(request.POST.get("display_name")),
-                sanitize_text(request.POST.get("description")),
-                "",
-            )
+    dataset = Dataset.objects.get(dataset_id=dataset_id)
 
-        new_run = model.add_uploaded_run(task_id, vm_id, dataset_id, upload_id, uploaded_file)
+    if upload_id == "new-submission":
+        upload_id = model.add_upload(task_id, vm_id, None)["id"]
+        model.update_upload_metadata(
+            task_id,
+            vm_id,
+            upload_id,
+            sanitize_text(display_name),
+            sanitize_text(description),
+            "",
+        )
 
-        run_dir = Path(new_run["run_dir"])
-        del new_run["run_dir"]
-        status_code, message = check_format_for_dataset(run_dir / "output", dataset)
-        if status_code != _fmt.OK:
-            rmtree(run_dir)
-            Run.objects.get(run_id=new_run["run"]["run_id"]).delete()
-            return JsonResponse({"status": 1, "message": message})
+    new_run = model.add_uploaded_run(task_id, vm_id, dataset_id, upload_id, uploaded_file)
 
-        _run_evaluation(vm_id, task_id, new_run["run"]["run_id"], dataset_id)
+    run_dir = Path(new_run["run_dir"])
+    del new_run["run_dir"]
+    status_code, message = check_format_for_dataset(run_dir / "output", dataset)
+    if status_code != _fmt.OK:
+        rmtree(run_dir)
+        Run.objects.get(run_id=new_run["run"]["run_id"]).delete()
+        return JsonResponse({"status": 1, "message": message})
 
-        return JsonResponse(
-            {
-                "status": 0,
-                "message": "ok",
-                "new_run": new_run,
-                "started_evaluation": False,
-            }
-        )
-    else:
+    _run_evaluation(vm_id, task_id, new_run["run"]["run_id"], dataset_id)
+
+    return JsonResponse(
+        {
+            "status": 0,
+            "message": "ok",
+            "new_run": new_run,
+            "started_evaluation": False,
+        }
+    )
+
+
+@csrf_exempt
+@check_permissions
+@check_resources_exist("json")
+def upload_part(
+    request: "HttpRequest", task_id: str, vm_id: str, dataset_id: str, upload_id: str, chunked_upload_id: str, part: int
+) -> HttpResponse:
+    if request.method != "POST":
         return JsonResponse({"status": 1, "message": "GET is not allowed here."})
 
+    return _store_upload_part(request, f"{task_id}-{vm_id}", chunked_upload_id, part)
+
+
+@csrf_exempt
+@check_permissions
+@check_resources_exist("json")
+def upload_parts(
+    request: "HttpRequest", task_id: str, vm_id: str, dataset_id: str, upload_id: str, chunked_upload_id: str
+) -> HttpResponse:
+    """GET returns the parts that were already received, POST assembles the parts and adds them as run."""
+    from ..chunked_uploads import AssembledFile, assemble, chunked_upload_dir, received_parts, remove_upload
+
+    try:
+        upload_dir = chunked_upload_dir(f"{task_id}-{vm_id}", chunked_upload_id)
+        if request.method != "POST":
+            return JsonResponse({"status": 0, "parts": received_parts(upload_dir)})
+
+        body = json.loads(request.body)
+        name = secure_filename(body.get("name", "upload.zip")) or "upload.zip"
+        assembled = assemble(upload_dir, int(body["parts"]), body.get("md5"), name)
+    except Exception as e:
+        logger.warning(f"Could not assemble the chunked upload {chunked_upload_id}: {e}")
+        return JsonResponse({"status": 1, "message": f"Could not assemble the upload: {e}"})
+
+    try:
+        return add_uploaded_run(
+            task_id,
+            vm_id,
+            dataset_id,
+            upload_id,
+            AssembledFile(assembled),
+            body.get("display_name"),
+            body.get("description"),
+        )
+    finally:
+        remove_upload(upload_dir)
+
+
+def _store_upload_part(request: "HttpRequest", namespace: str, chunked_upload_id: str, part: int) -> HttpResponse:
+    from ..chunked_uploads import chunked_upload_dir, store_part
+
+    if not request.FILES or "file" not in request.FILES.keys():
+        return JsonResponse({"status": 1, "message": "Please pass a payload. No file in the post"})
+
+    try:
+        upload_dir = chunked_upload_dir(namespace, chunked_upload_id)
+        md5 = store_part(upload_dir, part, request.FILES["file"], request.POST.get("md5"))
+        return JsonResponse({"status": 0, "message": "ok", "part": part, "md5": md5})
+    except ValueError as e:
+        return HttpResponseServerError(json.dumps({"status": 1, "message": str(e)}))
+
 
 def _parse_notebook_to_html(notebook_content: str) -> "Optional[str]":
     import nbformat
@@ -451,102 +560,150 @@ def _parse_metadata_from_upload(upload_dir: Path) -> "dict[str, Any]":
 @authentication_classes([])
 def anonymous_upload(request: "HttpRequest", dataset_id: str) -> HttpResponse:
     if request.method == "POST":
-        try:
-            if not dataset_id or dataset_id is None or dataset_id == "None":
-                return HttpResponseServerError(
-                    json.dumps(
-                        {
-                            "status": 1,
-                            "message": "Please specify the associated dataset.",
-                        }
-                    )
-                )
+        return add_anonymous_upload(dataset_id, request.FILES["file"])
+    else:
+        return HttpResponseServerError(json.dumps({"status": 1, "message": "GET is not allowed here."}))
 
-            dataset = model.get_dataset(dataset_id)
-            if (
-                not dataset
-                or "format" not in dataset
-                or not dataset["format"]
-                or "task" not in dataset
-                or not dataset["task"]
-            ):
-                return HttpResponseServerError(
-                    json.dumps(
-                        {
-                            "status": 1,
-                            "message": f"Uploads are not allowed for the dataset {html.escape(dataset_id)}.",
-                        }
-                    )
-                )
 
-            if dataset["is_deprecated"]:
-                return HttpResponseServerError(
-                    json.dumps(
-                        {
-                            "status": 1,
-                            "message": f"The dataset {html.escape(dataset_id)} is deprecated and therefore allows no uploads.",
-                        }
-                    )
-                )
+def _anonymous_upload_error(dataset_id: str) -> "Optional[HttpResponse]":
+    """The error response if the dataset does not exist or does not accept anonymous uploads, None otherwise."""
+    if not dataset_id or dataset_id is None or dataset_id == "None":
+        return HttpResponseServerError(json.dumps({"status": 1, "message": "Please specify the associated dataset."}))
 
-            task = model.get_task(dataset["task"], False)
-            if not task or not task["featured"]:
-                return HttpResponseServerError(
-                    json.dumps(
-                        {
-                            "status": 1,
-                            "message": f"The dataset {html.escape(dataset_id)} is deprecated and therefore allows no uploads.",
-                        }
-                    )
-                )
+    dataset = model.get_dataset(dataset_id)
+    if not dataset or "format" not in dataset or not dataset["format"] or "task" not in dataset or not dataset["task"]:
+        return HttpResponseServerError(
+            json.dumps({"status": 1, "message": f"Uploads are not allowed for the dataset {html.escape(dataset_id)}."})
+        )
 
-            uploaded_file = request.FILES["file"]
-            upload_id = str(uuid.uuid4())
+    task = model.get_task(dataset["task"], False)
+    if dataset["is_deprecated"] or not task or not task["featured"]:
+        return HttpResponseServerError(
+            json.dumps(
+                {
+                    "status": 1,
+                    "message": f"The dataset {html.escape(dataset_id)} is deprecated and therefore allows no uploads.",
+                }
+            )
+        )
 
-            result_dir = temporary_directory()
+    return None
 
-            with open(result_dir / "upload.zip", "wb+") as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
 
-            with zipfile.ZipFile(result_dir / "upload.zip", "r") as zip_ref:
-                zip_ref.extractall(result_dir / "extracted")
+def _store_uploaded_file(uploaded_file: Any, target: Path) -> None:
+    from ..chunked_uploads import AssembledFile
 
-            formats = dataset["format"]
-            if len(formats) == 1:
-                formats = formats[0]
+    if isinstance(uploaded_file, AssembledFile):
+        # Assembled uploads are already on disk, so they are moved instead of copied.
+        shutil.move(uploaded_file.path, target)
+        return
 
-            status_code, message = check_format(result_dir / "extracted", formats, dataset.get("format_configuration"))
+    with open(target, "wb+") as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
 
-            if status_code != _fmt.OK:
-                return HttpResponseServerError(json.dumps({"status": 1, "message": message}))
 
-            from .. import model as modeldb
+def add_anonymous_upload(dataset_id: str, uploaded_file: Any) -> HttpResponse:
+    """Add the uploaded zip as anonymous upload, shared by direct uploads and uploads that were sent in parts."""
+    try:
+        error = _anonymous_upload_error(dataset_id)
+        if error is not None:
+            return error
 
-            anon_uploads_dir = Path(settings.TIRA_ROOT) / "data" / "anonymous-uploads"
-            (anon_uploads_dir).mkdir(exist_ok=True, parents=True)
-            upload_dir = anon_uploads_dir / upload_id
-            shutil.move(result_dir / "extracted", upload_dir)
+        dataset = model.get_dataset(dataset_id)
+        upload_id = str(uuid.uuid4())
 
-            dataset = modeldb.Dataset.objects.get(dataset_id=dataset_id)
-            metadata_from_upload = _parse_metadata_from_upload(upload_dir)
-            modeldb.AnonymousUploads.objects.create(
-                uuid=upload_id,
-                dataset=dataset,
-                has_metadata=metadata_from_upload["has_metadata"],
-                metadata_git_repo=metadata_from_upload["metadata_git_repo"],
-                metadata_has_notebook=metadata_from_upload["metadata_has_notebook"],
-                valid_formats=metadata_from_upload["valid_formats"],
-            )
+        result_dir = temporary_directory()
 
-            return JsonResponse({"status": 0, "message": "ok", "uuid": upload_id})
-        except Exception as e:
-            logger.exception(e)
-            logger.warning(f"Could not create upload: {e}")
-            return HttpResponseServerError(json.dumps({"status": 1, "message": f"There was an error: {e}. {repr(e)}"}))
-    else:
+        _store_uploaded_file(uploaded_file, result_dir / "upload.zip")
+
+        with zipfile.ZipFile(result_dir / "upload.zip", "r") as zip_ref:
+            zip_ref.extractall(result_dir / "extracted")
+
+        formats = dataset["format"]
+        if len(formats) == 1:
+            formats = formats[0]
+
+        status_code, message = check_format(result_dir / "extracted", formats, dataset.get("format_configuration"))
+
+        if status_code != _fmt.OK:
+            return HttpResponseServerError(json.dumps({"status": 1, "message": message}))
+
+        from .. import model as modeldb
+
+        anon_uploads_dir = Path(settings.TIRA_ROOT) / "data" / "anonymous-uploads"
+        (anon_uploads_dir).mkdir(exist_ok=True, parents=True)
+        upload_dir = anon_uploads_dir / upload_id
+        shutil.move(result_dir / "extracted", upload_dir)
+
+        dataset = modeldb.Dataset.objects.get(dataset_id=dataset_id)
+        metadata_from_upload = _parse_metadata_from_upload(upload_dir)
+        modeldb.AnonymousUploads.objects.create(
+            uuid=upload_id,
+            dataset=dataset,
+            has_metadata=metadata_from_upload["has_metadata"],
+            metadata_git_repo=metadata_from_upload["metadata_git_repo"],
+            metadata_has_notebook=metadata_from_upload["metadata_has_notebook"],
+            valid_formats=metadata_from_upload["valid_formats"],
+        )
+
+        return JsonResponse({"status": 0, "message": "ok", "uuid": upload_id})
+    except Exception as e:
+        logger.exception(e)
+        logger.warning(f"Could not create upload: {e}")
+        return HttpResponseServerError(json.dumps({"status": 1, "message": f"There was an error: {e}. {repr(e)}"}))
+
+
+@csrf_exempt
+@permission_classes([])
+@authentication_classes([])
+def anonymous_upload_part(request: "HttpRequest", dataset_id: str, chunked_upload_id: str, part: int) -> HttpResponse:
+    if request.method != "POST":
         return HttpResponseServerError(json.dumps({"status": 1, "message": "GET is not allowed here."}))
 
+    error = _anonymous_upload_error(dataset_id)
+    if error is not None:
+        return error
+
+    from ..chunked_uploads import ANONYMOUS_NAMESPACE_PREFIX
+
+    return _store_upload_part(request, f"{ANONYMOUS_NAMESPACE_PREFIX}{dataset_id}", chunked_upload_id, part)
+
+
+@csrf_exempt
+@permission_classes([])
+@authentication_classes([])
+def anonymous_upload_parts(request: "HttpRequest", dataset_id: str, chunked_upload_id: str) -> HttpResponse:
+    """GET returns the parts that were already received, POST assembles the parts and adds them as anonymous upload."""
+    from ..chunked_uploads import (
+        ANONYMOUS_NAMESPACE_PREFIX,
+        AssembledFile,
+        assemble,
+        chunked_upload_dir,
+        received_parts,
+        remove_upload,
+    )
+
+    error = _anonymous_upload_error(dataset_id)
+    if error is not None:
+        return error
+
+    try:
+        upload_dir = chunked_upload_dir(f"{ANONYMOUS_NAMESPACE_PREFIX}{dataset_id}", chunked_upload_id)
+        if request.method != "POST":
+            return JsonResponse({"status": 0, "parts": received_parts(upload_dir)})
+
+        body = json.loads(request.body)
+        assembled = assemble(upload_dir, int(body["parts"]), body.get("md5"))
+    except Exception as e:
+        logger.warning(f"Could not assemble the chunked upload {chunked_upload_id}: {e}")
+        return HttpResponseServerError(json.dumps({"status": 1, "message": f"Could not assemble the upload: {e}"}))
+
+    try:
+        return add_anonymous_upload(dataset_id, AssembledFile(assembled))
+    finally:
+        remove_upload(upload_dir)
+
 
 @check_permissions
 @check_resources_exist("json")
@@ -688,6 +845,7 @@ def docker_software_save(request: "HttpRequest", task_id: str, vm_id: str, docke
         try:
             data = json.loads(request.body)
             model.update_docker_software_metadata(
+                task_id,
                 docker_software_id,
                 sanitize_text(data.get("display_name")),
                 sanitize_text(data.get("description")),
@@ -871,9 +1029,7 @@ def __rendered_references(task_id: str, vm_id: str, run: dict[str, str]) -> tupl
             + "is a  non-factoid quesiton answering dataset based on the questions and "
             + "answers of Yahoo! Webscope L6."
         )
-        bib_references[
-            "dataset"
-        ] = """@inproceedings{Hashemi2020Antique,
+        bib_references["dataset"] = """@inproceedings{Hashemi2020Antique,
   title        = {ANTIQUE: A Non-Factoid Question Answering Benchmark},
   author       = {Helia Hashemi and Mohammad Aliannejadi and Hamed Zamani and Bruce Croft},
   booktitle    = {ECIR},
@@ -886,9 +1042,7 @@ def __rendered_references(task_id: str, vm_id: str, run: dict[str, str]) -> tupl
             + "respectively [TIREx](https://webis.de/publications#froebe_2023e) "
             + "is used to enable reprodicible and blinded experiments."
         )
-        bib_references[
-            "task"
-        ] = """@InProceedings{froebe:2023b,
+        bib_references["task"] = """@InProceedings{froebe:2023b,
   address =                  {Berlin Heidelberg New York},
   author =                   {Maik Fr{\"o}be and Matti Wiegmann and Nikolay Kolyada and Bastian Grahm and Theresa Elstner and Frank Loebe and Matthias Hagen and Benno Stein and Martin Potthast},
   booktitle =                {Advances in Information Retrieval. 45th European Conference on {IR} Research ({ECIR} 2023)},
@@ -921,9 +1075,7 @@ def __rendered_references(task_id: str, vm_id: str, run: dict[str, str]) -> tupl
             "The implementation of [MonoT5](https://arxiv.org/abs/2101.05667) in"
             " [PyGaggle](https://ir.webis.de/anthology/2021.sigirconf_conference-2021.304/)."
         )
-        bib_references[
-            "run"
-        ] = """@article{DBLP:journals/corr/abs-2101-05667,
+        bib_references["run"] = """@article{DBLP:journals/corr/abs-2101-05667,
   author       = {Ronak Pradeep and Rodrigo Frassetto Nogueira and Jimmy Lin},
   title        = {The Expando-Mono-Duo Design Pattern for Text Ranking with Pretrained Sequence-to-Sequence Models},
   journal      = {CoRR},
@@ -957,9 +1109,7 @@ def __rendered_references(task_id: str, vm_id: str, run: dict[str, str]) -> tupl
             "The implementation of [DLH](https://ir.webis.de/anthology/2006.ecir_conference-2006.3/) in"
             " [PyTerrier](https://ir.webis.de/anthology/2021.cikm_conference-2021.533/)."
         )
-        bib_references[
-            "run"
-        ] = """@inproceedings{amati-2006-frequentist,
+        bib_references["run"] = """@inproceedings{amati-2006-frequentist,
   author    = {Giambattista Amati},
   editor    = {Mounia Lalmas and Andy MacFarlane and Stefan M. R{\"{u}}ger and Anastasios Tombros and Theodora Tsikrika and Alexei Yavlinsky},
   title     = {Frequentist and Bayesian Approach to Information Retrieval},
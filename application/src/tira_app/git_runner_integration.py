@@ -3,12 +3,12 @@ import logging
 import os
 import shutil
 import stat
-import string
 import tempfile
 from copy import deepcopy
 from datetime import date
 from datetime import datetime as dt
 from glob import glob
+from hashlib import md5
 from itertools import chain
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -24,13 +24,19 @@ from github import Github
 from slugify import slugify
 from tqdm import tqdm
 
+from .job_traces import JobTraces, printable
+from .pipeline_refresher import invalidate_running_pipelines
+
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Any, Optional
 
     from github.Repository import Repository
 
 logger = logging.getLogger("tira")
 
+# The tails of the traces of running jobs, so that refreshes only download new bytes of the traces.
+_job_traces = JobTraces()
+
 
 def __normalize_file(file_content: str, tira_user_name: str, task_id: str) -> str:
     default_datasets = {
@@ -782,6 +788,10 @@ class GitLabRunner(GitRunner):
                 }
             )
 
+        from django.core.cache import cache
+
+        invalidate_running_pipelines(git_repository_id, cache)
+
     def add_new_tag_to_docker_image_repository(self, repository_name, old_tag, new_tag):
         """
         Background for the implementation:
@@ -918,6 +928,9 @@ class GitLabRunner(GitRunner):
                     pipeline["pipeline"].cancel()
                 gl_project.branches.delete(branch)
 
+        if cache:
+            invalidate_running_pipelines(git_repository_id, cache)
+
     def yield_all_running_pipelines(self, git_repository_id, user_id, cache=None, force_cache_refresh=False):
         for pipeline in self.all_running_pipelines_for_repository(git_repository_id, cache, force_cache_refresh):
             pipeline = deepcopy(pipeline)
@@ -945,6 +958,7 @@ class GitLabRunner(GitRunner):
         gl = self.gitHoster_client
         gl_project = gl.projects.get(int(git_repository_id))
         already_covered_run_ids = set()
+        followed_job_ids = set()
         for status in ["scheduled", "running", "pending", "created", "waiting_for_resource", "preparing"]:
             for pipeline in gl_project.pipelines.list(status=status):
                 user_software_job = None
@@ -968,8 +982,8 @@ class GitLabRunner(GitRunner):
                 if "-training---" in p:
                     try:
                         stdout = ""
-                        user_software_job = gl_project.jobs.get(user_software_job.id)
-                        stdout = self.clean_job_output(user_software_job.trace().decode("UTF-8"))
+                        followed_job_ids.add(user_software_job.id)
+                        stdout = self.job_output(gl_project.id, user_software_job.id)
                     except Exception:
                         # Job is not started or similar
                         pass
@@ -977,8 +991,8 @@ class GitLabRunner(GitRunner):
                 run_id = p.split("---")[-1]
 
                 already_covered_run_ids.add(run_id)
-                job_config = self.extract_job_configuration(gl_project, pipeline.ref)
-                if job_config:
+                job_config = self.parsed_job_configuration(gl_project, pipeline.ref, pipeline.sha, cache)
+                if job_config is not None:
                     ret += [
                         {
                             "run_id": run_id,
@@ -991,7 +1005,9 @@ class GitLabRunner(GitRunner):
                         }
                     ]
 
-        ret += self.__all_failed_pipelines_for_repository(gl_project, already_covered_run_ids)
+        _job_traces.retain(self.host, gl_project.id, followed_job_ids)
+        ret += self.__all_failed_pipelines_for_repository(gl_project, already_covered_run_ids, cache)
+        ret = self.__resolve_job_configurations(ret)
 
         if cache:
             logger.info(f"Cache refreshed for key {cache_key} ...")
@@ -999,8 +1015,12 @@ class GitLabRunner(GitRunner):
 
         return ret
 
+    def job_output(self, project_id, job_id):
+        """The output of the user software in the trace of the job, only new bytes of the trace are downloaded."""
+        return _job_traces.output(self.host, project_id, job_id, {"PRIVATE-TOKEN": self.git_token})
+
     def clean_job_output(self, ret):
-        ret = "".join(filter(lambda x: x in string.printable, ret.strip()))
+        ret = printable(ret.strip().encode("UTF-8"))
         if '$ eval "${TIRA_COMMAND_TO_EXECUTE}"[0;m' in ret:
             return self.clean_job_suffix(ret.split('$ eval "${TIRA_COMMAND_TO_EXECUTE}"[0;m')[1])
         elif '$ eval "${TIRA_EVALUATION_COMMAND_TO_EXECUTE}"[0;m' in ret:
@@ -1018,48 +1038,97 @@ class GitLabRunner(GitRunner):
         return ret.strip()
 
     def extract_job_configuration(self, gl_project, branch):
-        ret = {}
+        pipelines = [{"job_config": self.parsed_job_configuration(gl_project, branch)}]
+        return self.__resolve_job_configurations(pipelines)[0]["job_config"]
 
+    def parsed_job_configuration(self, gl_project, branch, sha=None, cache=None) -> "Optional[dict[str, str]]":
+        """The key-value pairs of the job-to-execute.txt of the branch. The job-to-execute.txt never changes after the
+        branch was created, so the pairs are cached without timeout per repository, branch, and head commit.
+        """
         if not branch or branch.strip().lower() == "main":
             return None
 
+        cache_key = None
+        if cache and sha:
+            cache_key = f"job-configuration-{gl_project.id}-{sha}-{md5(branch.encode('utf-8')).hexdigest()}"
+            try:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            except Exception:
+                logger.exception(f"Could not find cache module {cache_key}.")
+
         try:
-            for commit in gl_project.commits.list(ref_name=branch, page=0, per_page=3):
-                if len(ret) > 0:
-                    break
-
-                if branch in commit.title and "Merge" not in commit.title:
-                    for diff_entry in commit.diff():
-                        if len(ret) > 0:
-                            break
-
-                        if diff_entry["old_path"] == diff_entry["new_path"] and diff_entry["new_path"].endswith(
-                            "/job-to-execute.txt"
-                        ):
-                            diff_entry = diff_entry["diff"].replace("\n+", "\n").split("\n")
-                            ret = {
-                                i.split("=")[0].strip(): i.split("=")[1].strip()
-                                for i in diff_entry
-                                if len(i.split("=")) == 2
-                            }
+            ret = self.__job_configuration_of_branch(gl_project, branch)
         except Exception as e:
             logger.warning(f'Could not extract job configuration on "{branch}".', exc_info=e)
-            pass
+            # Do not cache the configuration, the failure might be temporary (e.g., a rate limit).
+            return {}
+
+        if cache_key:
+            cache.set(cache_key, ret, timeout=None)
+
+        return ret
+
+    @staticmethod
+    def __job_configuration_of_branch(gl_project, branch: str) -> "dict[str, str]":
+        """The key-value pairs of the job-to-execute.txt that was added by one of the latest commits of the branch."""
+        for commit in gl_project.commits.list(ref_name=branch, page=0, per_page=3):
+            if branch not in commit.title or "Merge" in commit.title:
+                continue
 
+            for diff_entry in commit.diff():
+                if diff_entry["old_path"] == diff_entry["new_path"] and diff_entry["new_path"].endswith(
+                    "/job-to-execute.txt"
+                ):
+                    ret = GitLabRunner.__job_configuration_of_diff(diff_entry["diff"])
+                    if ret:
+                        return ret
+
+        return {}
+
+    @staticmethod
+    def __job_configuration_of_diff(diff: str) -> "dict[str, str]":
+        lines = diff.replace("\n+", "\n").split("\n")
+        return {i.split("=")[0].strip(): i.split("=")[1].strip() for i in lines if len(i.split("=")) == 2}
+
+    def __resolve_job_configurations(self, pipelines: "list[dict]") -> "list[dict]":
+        """Replace the parsed job configurations of the pipelines with the job configuration that is shown in the UI.
+        The softwares of all pipelines are loaded with a single database query.
+        """
+        from .tira_model import model
+
+        def docker_software_id(job_config):
+            try:
+                return int(job_config["TIRA_SOFTWARE_ID"].split("docker-software-")[-1])
+            except Exception:
+                return None
+
+        docker_software_ids = [docker_software_id(i["job_config"]) for i in pipelines if i["job_config"] is not None]
+        docker_software_ids = {i for i in docker_software_ids if i is not None}
+        try:
+            softwares = model.get_docker_software_summaries(docker_software_ids) if docker_software_ids else {}
+        except Exception as e:
+            logger.warning(f"Could not extract the softwares {docker_software_ids} from the database: {str(e)}")
+            softwares = {}
+
+        for pipeline in pipelines:
+            if pipeline["job_config"] is not None:
+                pipeline["job_config"] = self.__job_configuration(
+                    pipeline["job_config"], softwares.get(docker_software_id(pipeline["job_config"]), {})
+                )
+
+        return pipelines
+
+    def __job_configuration(self, ret: "dict[str, str]", software_from_db: "dict[str, Any]") -> "dict[str, str]":
         if (
             "TIRA_COMMAND_TO_EXECUTE" in ret
             and "'No software to execute. Only evaluation'" in ret["TIRA_COMMAND_TO_EXECUTE"]
             and ("TIRA_SOFTWARE_ID" not in ret or "-1" == ret["TIRA_SOFTWARE_ID"])
         ):
             software_from_db = {"display_name": "Evaluate Run", "image": "evaluator", "command": "evaluator"}
-        else:
-            try:
-                from .tira_model import model
-
-                software_from_db = model.get_docker_software(int(ret["TIRA_SOFTWARE_ID"].split("docker-software-")[-1]))
-            except Exception as e:
-                logger.warning(f'Could not extract the software from the database for "{json.dumps(ret)}": {str(e)}')
-                software_from_db = {}
+        elif not software_from_db:
+            logger.warning(f'Could not extract the software from the database for "{json.dumps(ret)}".')
 
         return {
             "software_name": software_from_db.get("display_name", "Loading..."),
@@ -1075,10 +1144,11 @@ class GitLabRunner(GitRunner):
             "task_id": ret.get("TIRA_TASK_ID", "Loading..."),
         }
 
-    def __all_failed_pipelines_for_repository(self, gl_project, already_covered_run_ids):
+    def __all_failed_pipelines_for_repository(self, gl_project, already_covered_run_ids, cache=None):
         ret = []
 
         for branch in gl_project.branches.list():
+            sha = branch.commit.get("id") if isinstance(getattr(branch, "commit", None), dict) else None
             branch = branch.name
             p = (branch + "---started-").split("---started-")[0]
             run_id = p.split("---")[-1]
@@ -1086,8 +1156,8 @@ class GitLabRunner(GitRunner):
             if run_id in already_covered_run_ids:
                 continue
 
-            job_config = self.extract_job_configuration(gl_project, branch)
-            if not job_config:
+            job_config = self.parsed_job_configuration(gl_project, branch, sha, cache)
+            if job_config is None:
                 continue
 
             ret += [
@@ -0,0 +1,126 @@
+"""Follow the traces (stdout) of running jobs of the git hoster incrementally instead of downloading them repeatedly.
+
+For each job, the byte offset of the trace that was already processed is remembered so that subsequent refreshes only
+request new bytes via an HTTP Range header. Only the output of the user software (i.e., after the start marker and
+before the first end marker) is kept, bounded to the last ``TRACE_TAIL_SIZE`` characters.
+"""
+
+import string
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Optional
+
+# The maximum number of characters of the output that are kept per job.
+TRACE_TAIL_SIZE = 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+START_MARKERS = ('$ eval "${TIRA_COMMAND_TO_EXECUTE}"[0;m', '$ eval "${TIRA_EVALUATION_COMMAND_TO_EXECUTE}"[0;m')
+END_MARKERS = ("[32;1m$ env|grep 'TIRA' > task.env", "section_end:")
+
+# Bytes of multi-byte utf-8 characters are never printable, so filtering bytes is equivalent to filtering characters.
+_NON_PRINTABLE = bytes(i for i in range(256) if chr(i) not in string.printable)
+
+
+def printable(raw: bytes) -> str:
+    """Remove all characters that are not in string.printable (e.g., escape sequences of colors) in a single pass."""
+    return raw.translate(None, _NON_PRINTABLE).decode("ascii")
+
+
+class JobTraceTail:
+    """The bounded output of the user software in the trace of a job that is appended chunk by chunk."""
+
+    def __init__(self, max_size: int = TRACE_TAIL_SIZE) -> None:
+        self.max_size = max_size
+        self.offset = 0
+        self.started = False
+        self.finished = False
+        self.text = ""
+        self.lock = threading.Lock()
+
+    def append(self, raw: bytes) -> None:
+        self.offset += len(raw)
+        if self.finished or not raw:
+            return
+
+        self.text += printable(raw)
+        if not self.started:
+            for marker in START_MARKERS:
+                if marker in self.text:
+                    self.started = True
+                    self.text = self.text.split(marker, 1)[1]
+                    break
+            else:
+                # Keep enough characters to detect markers that are split across chunks.
+                self.text = self.text[-max(len(i) for i in START_MARKERS) :]
+                return
+
+        for marker in END_MARKERS:
+            if marker in self.text:
+                self.finished = True
+                self.text = self.text.split(marker, 1)[0]
+
+        if len(self.text) > self.max_size:
+            self.text = self.text[-self.max_size :]
+
+    def append_response(self, response: "Any") -> None:
+        """Append the new bytes of a response to a request for the trace starting at the current offset.
+
+        Hosters that ignore the Range header respond with the complete trace, the already processed bytes are skipped.
+        """
+        if response.status_code == 416:
+            # The range is not satisfiable, i.e., there are no new bytes.
+            return
+        response.raise_for_status()
+
+        skip = self.offset if response.status_code == 200 else 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if skip >= len(chunk):
+                skip -= len(chunk)
+                continue
+            self.append(chunk[skip:])
+            skip = 0
+
+    def output(self) -> str:
+        return self.text.strip() if self.started else ""
+
+
+class JobTraces:
+    """The tails of the traces of running jobs, shared by all refreshes of the running pipelines in this process."""
+
+    def __init__(self, max_size: int = TRACE_TAIL_SIZE) -> None:
+        self.max_size = max_size
+        self.__lock = threading.Lock()
+        self.__tails: "dict[tuple, JobTraceTail]" = {}
+
+    def tail(self, host: str, project_id: "Any", job_id: "Any") -> JobTraceTail:
+        with self.__lock:
+            key = (host, str(project_id), str(job_id))
+            if key not in self.__tails:
+                self.__tails[key] = JobTraceTail(self.max_size)
+            return self.__tails[key]
+
+    def output(
+        self, host: str, project_id: "Any", job_id: "Any", headers: "dict[str, str]", timeout: "Optional[float]" = 30
+    ) -> str:
+        """Fetch the new bytes of the trace of the job from the GitLab API and return the output of the software."""
+        import requests
+
+        tail = self.tail(host, project_id, job_id)
+        with tail.lock:
+            if not tail.finished:
+                url = f"https://{host}/api/v4/projects/{project_id}/jobs/{job_id}/trace"
+                headers = {**headers, "Range": f"bytes={tail.offset}-"} if tail.offset > 0 else headers
+                with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                    tail.append_response(response)
+
+            return tail.output()
+
+    def retain(self, host: str, project_id: "Any", job_ids: "Iterable[Any]") -> None:
+        """Forget the tails of all jobs of the project except the given ones, e.g., because they are not running."""
+        keep = {(host, str(project_id), str(i)) for i in job_ids}
+        with self.__lock:
+            for key in list(self.__tails.keys()):
+                if key[:2] == (host, str(project_id)) and key not in keep:
+                    del self.__tails[key]
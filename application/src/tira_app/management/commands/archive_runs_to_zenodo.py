@@ -1,5 +1,4 @@
 import json
-import shutil
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
@@ -156,8 +155,7 @@ class Command(BaseCommand):
                         run_id = model.runs(task_id, i, user_id, display_name)[0]["run_id"]
                         target_file = f"{output_dir}/{run_id}.zip"
 
-                        zip_file = zip_run(i, user_id, run_id)
-                        shutil.copyfile(zip_file, target_file)
+                        zip_run(i, user_id, run_id, Path(target_file))
                         ret[task_id][user_id][display_name][i] = {"run_id": run_id, "md5": md5(target_file)}
 
         print(json.dumps(ret))
@@ -187,8 +185,7 @@ class Command(BaseCommand):
                             print(f"Skip group {dataset_group} for {display_name}.")
                             continue
 
-                        zip_file = zip_runs(user_id, [(k, v) for k, v in run_ids.items()], file_name)
-                        shutil.copyfile(zip_file, target_file)
+                        zip_runs(user_id, [(k, v) for k, v in run_ids.items()], Path(target_file))
                         ret[task_id][user_id][display_name][dataset_group] = {
                             "dataset_group": dataset_group,
                             "md5": md5(target_file),
@@ -1,72 +1,80 @@
 import datetime
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from django.core.cache import cache
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
 from ... import tira_model as model
-
-logger = logging.getLogger("cache_daemon")
 from ...git_runner import all_git_runners
+from ...pipeline_refresher import PipelineRefresher
 from ...tira_model import get_all_reranking_datasets, get_git_integration
 
+logger = logging.getLogger("cache_daemon")
+
 
 class Command(BaseCommand):
     help = "cache daemon"
 
-    def keep_running_softwares_fresh(self, sleep_time):
-        while True:
-            time.sleep(int(sleep_time))
+    def repositories_of_active_tasks(self) -> "dict[str, str]":
+        """The git repositories of the evaluators of all featured tasks that use git pipelines, mapped to their task."""
+        ret = {}
+        for task in model.get_tasks():
+            if task is None:
+                continue
+            if model.git_pipeline_is_enabled_for_task(task["task_id"], cache):
+                if "featured" not in task or not task["featured"]:
+                    print(f'Skip inactive task {task["task_id"]}')
+                    continue
+
+                evaluators_for_task = model.get_evaluators_for_task(task["task_id"], cache)
+                for i in evaluators_for_task:
+                    if i["is_git_runner"] and i["git_repository_id"]:
+                        ret[str(i["git_repository_id"])] = task["task_id"]
+
+        return ret
+
+    def keep_running_softwares_fresh(self, sleep_time, max_idle_time=None, workers=4):
+        repository_to_task: "dict[str, str]" = {}
+
+        def refresh(git_repository_id: str) -> int:
+            task_id = repository_to_task.get(git_repository_id)
+            git_integration = get_git_integration(task_id=task_id)
+            running_pipelines = git_integration.all_running_pipelines_for_repository(
+                git_repository_id, cache, force_cache_refresh=True
+            )
             print(
-                f"{datetime.datetime.now()}: Start loop to keep the running softwares fresh (slept for {int(sleep_time)} seconds)..."
+                f"Refreshed Cache ({datetime.datetime.now()}): {task_id} on repo {git_repository_id} has"
+                f" {len(running_pipelines)} jobs.",
+                flush=True,
             )
-            for task in model.get_tasks():
-                if task is None:
-                    continue
-                if model.git_pipeline_is_enabled_for_task(task["task_id"], cache):
-                    if "featured" not in task or not task["featured"]:
-                        print(f'Skip inactive task {task["task_id"]}')
-                        continue
-
-                    evaluators_for_task = model.get_evaluators_for_task(task["task_id"], cache)
-                    repositories = set(
-                        [
-                            i["git_repository_id"]
-                            for i in evaluators_for_task
-                            if i["is_git_runner"] and i["git_repository_id"]
-                        ]
-                    )
-
-                    for git_repository_id in repositories:
-                        try:
-                            print(task["task_id"] + "--->" + str(git_repository_id))
-                            git_integration = get_git_integration(task_id=task["task_id"])
-                            running_pipelines = git_integration.all_running_pipelines_for_repository(
-                                git_repository_id, cache, force_cache_refresh=True
-                            )
-                            print(
-                                "Refreshed Cache ("
-                                + str(datetime.datetime.now())
-                                + "): "
-                                + task["task_id"]
-                                + " on repo "
-                                + str(git_repository_id)
-                                + " has "
-                                + str(len(running_pipelines))
-                                + " jobs."
-                            )
-                        except Exception as e:
-                            print(f"Exception during refreshing the repository {git_repository_id}: e")
-                            logger.warning(
-                                f"Exception during refreshing the repository {git_repository_id}", exc_info=e
-                            )
-                            continue
-
-                time.sleep(0.1)
-
-    def refresh_user_images_in_repo(self, git_runner, sleep_time):
+            return len([i for i in running_pipelines if i["execution"]["scheduling"] != "failed"])
+
+        refresher = PipelineRefresher(
+            refresh,
+            cache,
+            active_interval=int(sleep_time),
+            max_idle_interval=int(max_idle_time) if max_idle_time else 10 * int(sleep_time),
+            workers=int(workers),
+        )
+        last_update = None
+
+        while True:
+            if last_update is None or time.monotonic() - last_update > int(sleep_time):
+                print(f"{datetime.datetime.now()}: Update the repositories to keep fresh...", flush=True)
+                try:
+                    repository_to_task = self.repositories_of_active_tasks()
+                    refresher.update_repositories(repository_to_task.keys())
+                except Exception as e:
+                    logger.warning("Exception during loading the repositories to keep fresh", exc_info=e)
+                last_update = time.monotonic()
+
+            refresher.step()
+            time.sleep(1)
+
+    def refresh_user_images_in_repo(self, git_runner, sleep_time, workers=4):
         users_of_active_tasks = set()
         for task in model.get_tasks():
             if task is None:
@@ -84,25 +92,17 @@ class Command(BaseCommand):
             flush=True,
         )
 
-        for user in users_of_active_tasks:
+        def refresh(user: str) -> None:
             try:
                 images = git_runner.docker_images_in_user_repository(user, cache, force_cache_refresh=True)
-                print(
-                    "Refreshed Cache ("
-                    + str(datetime.datetime.now())
-                    + "): "
-                    + user
-                    + " has "
-                    + str(len(images))
-                    + " images.",
-                    flush=True,
-                )
+                print(f"Refreshed Cache ({datetime.datetime.now()}): {user} has {len(images)} images.", flush=True)
             except Exception as e:
                 print(f"Exception during refreshing image repository {user}: {e}", flush=True)
-                continue
-            time.sleep(0.1)
 
-    def keep_user_images_fresh(self, sleep_time):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(refresh, users_of_active_tasks))
+
+    def keep_user_images_fresh(self, sleep_time, workers=4):
         while True:
             time.sleep(int(sleep_time))
             print(
@@ -114,7 +114,7 @@ class Command(BaseCommand):
             )
             for git_runner in all_git_runners():
                 try:
-                    self.refresh_user_images_in_repo(git_runner, sleep_time)
+                    self.refresh_user_images_in_repo(git_runner, sleep_time, int(workers))
                 except Exception as e:
                     print(f"Exception in keep_user_images_fresh: {e}", flush=True)
                     continue
@@ -137,10 +137,12 @@ class Command(BaseCommand):
         call_command("createcachetable")
 
         if "keep_running_softwares_fresh" in options and options["keep_running_softwares_fresh"]:
-            self.keep_running_softwares_fresh(options["keep_running_softwares_fresh"])
+            self.keep_running_softwares_fresh(
+                options["keep_running_softwares_fresh"], options.get("max_idle_time"), options.get("workers") or 4
+            )
 
         if "keep_user_images_fresh" in options and options["keep_user_images_fresh"]:
-            self.keep_user_images_fresh(options["keep_user_images_fresh"])
+            self.keep_user_images_fresh(options["keep_user_images_fresh"], options.get("workers") or 4)
 
         if "keep_reranking_datasets_fresh" in options and options["keep_reranking_datasets_fresh"]:
             self.keep_reranking_datasets_fresh(options["keep_reranking_datasets_fresh"])
@@ -149,3 +151,10 @@ class Command(BaseCommand):
         parser.add_argument("--keep_running_softwares_fresh", default=None, type=str)
         parser.add_argument("--keep_reranking_datasets_fresh", default=None, type=str)
         parser.add_argument("--keep_user_images_fresh", default=None, type=str)
+        parser.add_argument(
+            "--max_idle_time",
+            default=None,
+            type=str,
+            help="The maximum seconds between refreshes of repositories without running pipelines.",
+        )
+        parser.add_argument("--workers", default=4, type=int, help="The number of concurrent refreshes.")
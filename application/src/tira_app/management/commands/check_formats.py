@@ -1,35 +1,157 @@
+import hashlib
 import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Iterator, Optional, Tuple
+
 logger = logging.getLogger("tira")
 
+# The number of runs or uploads whose detected formats are written to the database at once.
+BATCH_SIZE = 500
+
+
+def output_fingerprint(directory: Path) -> str:
+    """A fingerprint of the names, sizes, and modification times of all files below the directory and of the detected
+    formats, so that the formats are only detected again if the output or the detected formats changed.
+    """
+    from tira.check_format import REPORTED_FORMATS
+
+    ret = hashlib.md5(json.dumps(REPORTED_FORMATS).encode("UTF-8"))
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for f in sorted(files):
+            path = os.path.join(root, f)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            ret.update(f"{os.path.relpath(path, directory)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("UTF-8"))
+
+    return ret.hexdigest()
+
+
+def detect_valid_formats(entry: "Tuple[str, str, Optional[str]]") -> "Tuple[str, Optional[str], str]":
+    """Detect the valid formats of the (primary key, directory, previous fingerprint) entry.
+
+    Returns the primary key, the valid formats serialized as json (None if the fingerprint did not change), and the
+    fingerprint of the directory.
+    """
+    from tira.check_format import report_valid_formats
+
+    pk, directory, previous_fingerprint = entry
+    fingerprint = output_fingerprint(Path(directory))
+    if fingerprint == previous_fingerprint:
+        return pk, None, fingerprint
+
+    return pk, json.dumps(report_valid_formats(Path(directory))), fingerprint
+
+
+def _dataset_id(i: "Any") -> "Optional[str]":
+    """The dataset of the run (via input_dataset) or of the anonymous upload (via dataset)."""
+    return i.input_dataset_id if hasattr(i, "input_dataset_id") else i.dataset_id
+
+
+def _bulk_update(changed: "list[Any]") -> None:
+    from ...tira_model import refresh_leaderboards
+
+    type(changed[0]).objects.bulk_update(changed, ["valid_formats", "valid_formats_fingerprint"])
+    # bulk_update sends no signals, so the leaderboards that show the valid formats are refreshed explicitly.
+    refresh_leaderboards(sorted({i for i in map(_dataset_id, changed) if i}))
+
+
+def collect_entries(objects: "Iterable[Any]", force: bool) -> "Tuple[dict[Any, Any], list[Tuple[Any, str, Any]]]":
+    """The objects by their primary key and the (primary key, directory, previous fingerprint) entries to check."""
+    objects_by_pk, entries = {}, []
+    for i in objects:
+        try:
+            directory = str(i.get_path_in_file_system())
+        except ValueError as e:
+            logger.warning(f"Skip {i.pk} as its output can not be located: {e}")
+            continue
+        objects_by_pk[i.pk] = i
+        entries.append((i.pk, directory, None if force else i.valid_formats_fingerprint))
+
+    return objects_by_pk, entries
+
+
+@contextmanager
+def detected_formats(entries: "list[Tuple[Any, str, Any]]", workers: int) -> "Iterator[Iterable[Tuple[Any, Any, str]]]":
+    """The results of detect_valid_formats for the entries, detected in a pool of processes if workers > 1."""
+    from django.db import connections
+
+    if workers <= 1:
+        yield map(detect_valid_formats, entries)
+        return
+
+    # The worker processes only read files, they must not inherit open database connections.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield executor.map(detect_valid_formats, entries, chunksize=16)
+
+
+def write_valid_formats(
+    objects_by_pk: "dict[Any, Any]", results: "Iterable[Tuple[Any, Any, str]]", empty_formats_as_none: bool
+) -> None:
+    """Write the changed valid formats to the database in batches and refresh the leaderboards of their datasets."""
+    changed = []
+    for pk, valid_formats, fingerprint in results:
+        if valid_formats is None:
+            continue
+
+        i = objects_by_pk[pk]
+        i.valid_formats = None if empty_formats_as_none and len(valid_formats) < 4 else valid_formats
+        i.valid_formats_fingerprint = fingerprint
+        changed.append(i)
+        if len(changed) >= BATCH_SIZE:
+            _bulk_update(changed)
+            changed = []
+
+    if changed:
+        _bulk_update(changed)
+
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
-        from tira.check_format import report_valid_formats
-
         from ... import model as modeldb
         from ...tira_model import model
 
         if "task" in options and options["task"]:
-            for dataset in tqdm(model.get_datasets_by_task(options["task"])):
-                # print(dataset["dataset_id"])
-                for run in tqdm(
-                    modeldb.Run.objects.filter(input_dataset__dataset_id=dataset["dataset_id"]), dataset["dataset_id"]
-                ):
-                    if run.evaluator:
-                        continue
-                    run.valid_formats = json.dumps(report_valid_formats(run.get_path_in_file_system()))
-                    if len(run.valid_formats) < 4:
-                        run.valid_formats = None
-                    run.save()
+            dataset_ids = [i["dataset_id"] for i in model.get_datasets_by_task(options["task"])]
+            objects = modeldb.Run.objects.filter(
+                input_dataset__dataset_id__in=dataset_ids, evaluator__isnull=True
+            ).select_related("software__vm", "docker_software__vm", "upload__vm", "input_dataset")
+            empty_formats_as_none = True
         else:
-            for upload in tqdm(modeldb.AnonymousUploads.objects.all()):
-                upload.valid_formats = json.dumps(report_valid_formats(upload.get_path_in_file_system()))
-                upload.save()
+            objects = modeldb.AnonymousUploads.objects.all()
+            empty_formats_as_none = False
+
+        objects_by_pk, entries = collect_entries(objects, options["force"])
+        with detected_formats(entries, max(1, options["workers"])) as results:
+            write_valid_formats(objects_by_pk, tqdm(results, total=len(entries)), empty_formats_as_none)
 
     def add_arguments(self, parser):
         parser.add_argument("--task", default=None, type=str)
+        parser.add_argument(
+            "--workers",
+            default=os.cpu_count() or 1,
+            type=int,
+            help="The number of processes that detect the valid formats in parallel.",
+        )
+        parser.add_argument(
+            "--force",
+            default=False,
+            action="store_true",
+            help=(
+                "Detect the valid formats also for outputs that did not change since the last detection. This is needed"
+                " after the logic of the format checks changed, as the fingerprint covers only the REPORTED_FORMATS."
+            ),
+        )
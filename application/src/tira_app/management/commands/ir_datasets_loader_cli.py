@@ -20,6 +20,8 @@ class Command(BaseCommand):
     @param --include_original {True}: optional, boolean: flag to signal, if the original data should be included
     @param --rerank: optional, string: if used, mapping will be in preparation for re-ranking operations and a path to
         file with TREC-run formatted data is required
+    @param --workers {1}: optional, int: the number of processes that serialize and compress the documents
+    @param --compress_documents {False}: optional, boolean: write documents.jsonl.gz instead of documents.jsonl
     """
 
     def import_dataset_for_fullrank(
@@ -32,6 +34,8 @@ class Command(BaseCommand):
         skip_qrels: bool,
         skip_duplicate_ids: bool,
         allowlist_path_ids: bool,
+        workers: int = 1,
+        compress_documents: bool = False,
     ):
         print(
             "Task: Full-Rank -> create files: \n documents.jsonl \n queries.jsonl \n qrels.txt \n at"
@@ -47,6 +51,8 @@ class Command(BaseCommand):
             skip_qrels=skip_qrels,
             skip_duplicate_ids=skip_duplicate_ids,
             allowlist_path_ids=allowlist_path_ids,
+            workers=workers,
+            compress_documents=compress_documents,
         )
 
     def import_dataset_for_rerank(
@@ -109,6 +115,8 @@ class Command(BaseCommand):
                 skip_qrels=skip_qrels,
                 skip_duplicate_ids=options["skip_duplicate_ids"],
                 allowlist_path_ids=options["allowlist_path_ids"],
+                workers=options["workers"],
+                compress_documents=options["compress_documents"],
             )
 
     def add_arguments(self, parser):
@@ -122,3 +130,5 @@ class Command(BaseCommand):
         parser.add_argument("--skip_duplicate_ids", default=True, type=bool)
         parser.add_argument("--rerank", default=None, type=Path)
         parser.add_argument("--allowlist_path_ids", default=None, type=Path, required=False)
+        parser.add_argument("--workers", default=1, type=int)
+        parser.add_argument("--compress_documents", action="store_true")
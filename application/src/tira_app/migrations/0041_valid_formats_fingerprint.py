@@ -0,0 +1,22 @@
+# Generated by Django 5.0.9 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tira", "0040_alter_dockersoftware_cache_behaviour_enum"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="anonymousuploads",
+            name="valid_formats_fingerprint",
+            field=models.CharField(default=None, max_length=150, null=True),
+        ),
+        migrations.AddField(
+            model_name="run",
+            name="valid_formats_fingerprint",
+            field=models.CharField(default=None, max_length=150, null=True),
+        ),
+    ]
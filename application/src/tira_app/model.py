@@ -303,6 +303,7 @@ class AnonymousUploads(models.Model):
     metadata_git_repo = models.CharField(max_length=500, default=None, null=True)
     metadata_has_notebook = models.BooleanField(default=False)
     valid_formats = models.TextField(default=None, null=True)
+    valid_formats_fingerprint = models.CharField(max_length=150, default=None, null=True)
     mirrored_resource = models.ForeignKey(MirroredResource, on_delete=models.RESTRICT, null=True, default=None)
 
     def get_path_in_file_system(self):
@@ -466,6 +467,7 @@ class Run(models.Model):
     deleted = models.BooleanField(default=False)
     access_token = models.CharField(max_length=150, default="")
     valid_formats = models.TextField(default=None, null=True)
+    valid_formats_fingerprint = models.CharField(max_length=150, default=None, null=True)
     from_upload = models.ForeignKey(AnonymousUploads, on_delete=models.RESTRICT, null=True, default=None)
     mirrored_resource = models.ForeignKey(MirroredResource, on_delete=models.RESTRICT, null=True, default=None)
 
@@ -0,0 +1,150 @@
+"""Keep the cached running pipelines of git repositories fresh without refreshing all repositories in a fixed loop.
+
+Repositories with running pipelines are refreshed every ``active_interval`` seconds, idle repositories back off
+exponentially up to ``max_idle_interval`` seconds. Repositories that are invalidated (because a pipeline was started or
+stopped or a webhook of the git hoster reported a change) are refreshed immediately. Refreshes run concurrently with a
+bounded number of workers.
+"""
+
+import logging
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Optional
+
+    from django.core.cache import BaseCache
+
+logger = logging.getLogger("cache_daemon")
+
+INVALIDATION_PREFIX = "invalidated-running-pipelines-repo-"
+# Invalidations that are not picked up by a cache daemon within this many seconds are dropped.
+INVALIDATION_TIMEOUT = 60 * 60
+
+
+def invalidate_running_pipelines(git_repository_id: "Any", cache: "BaseCache") -> None:
+    """Ask the cache daemon to refresh the running pipelines of the repository as soon as possible."""
+    cache.set(f"{INVALIDATION_PREFIX}{git_repository_id}", uuid.uuid4().hex, timeout=INVALIDATION_TIMEOUT)
+
+
+def new_invalidations(git_repository_ids: "Iterable[str]", cache: "BaseCache", seen: "dict[str, str]") -> "set[str]":
+    """The repositories that were invalidated since the invalidations in seen, which is updated accordingly.
+
+    Invalidations are only read and expire after INVALIDATION_TIMEOUT seconds: deleting them after reading would lose
+    invalidations that arrive in between.
+    """
+    keys = {f"{INVALIDATION_PREFIX}{i}": i for i in git_repository_ids}
+    if not keys:
+        return set()
+
+    ret = set()
+    for key, invalidation in cache.get_many(list(keys.keys())).items():
+        if seen.get(keys[key]) != invalidation:
+            seen[keys[key]] = invalidation
+            ret.add(keys[key])
+
+    return ret
+
+
+class PipelineRefresher:
+    def __init__(
+        self,
+        refresh: "Callable[[str], int]",
+        cache: "Optional[BaseCache]",
+        active_interval: float,
+        max_idle_interval: float,
+        workers: int = 4,
+        clock: "Callable[[], float]" = time.monotonic,
+    ):
+        """
+        :param refresh: Refreshes the cached pipelines of the repository and returns the number of running pipelines.
+        :param cache: The cache that holds invalidations, None to ignore invalidations.
+        :param active_interval: The seconds between refreshes of repositories with running pipelines.
+        :param max_idle_interval: The maximum seconds between refreshes of repositories without running pipelines.
+        :param workers: The maximum number of repositories that are refreshed concurrently.
+        """
+        self.refresh = refresh
+        self.cache = cache
+        self.active_interval = active_interval
+        self.max_idle_interval = max(active_interval, max_idle_interval)
+        self.workers = workers
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.__due: "dict[str, float]" = {}
+        self.__interval: "dict[str, float]" = {}
+        self.__running: "dict[str, int]" = {}
+        self.__in_flight: "dict[str, Future]" = {}
+        self.__invalidated_in_flight: "set[str]" = set()
+        self.__seen_invalidations: "dict[str, str]" = {}
+
+    def update_repositories(self, git_repository_ids: "Iterable[str]") -> None:
+        """Set the repositories to keep fresh, new repositories are refreshed immediately."""
+        git_repository_ids = set(str(i) for i in git_repository_ids)
+        for i in git_repository_ids - set(self.__due.keys()):
+            self.__due[i] = self.clock()
+            self.__interval[i] = self.active_interval
+            self.__running[i] = 0
+
+        for i in set(self.__due.keys()) - git_repository_ids:
+            del self.__due[i], self.__interval[i], self.__running[i]
+
+    def invalidate(self, git_repository_id: str) -> None:
+        if git_repository_id in self.__in_flight:
+            # The running refresh might have missed the change, so the repository is refreshed again afterwards.
+            self.__invalidated_in_flight.add(git_repository_id)
+        elif git_repository_id in self.__due:
+            self.__due[git_repository_id] = self.clock()
+            self.__interval[git_repository_id] = self.active_interval
+
+    def due_repositories(self) -> "list[str]":
+        """The repositories that should be refreshed now, repositories with running pipelines first."""
+        now = self.clock()
+        ret = [i for i, due in self.__due.items() if due <= now and i not in self.__in_flight]
+        return sorted(ret, key=lambda i: (self.__running[i] == 0, self.__due[i]))
+
+    def step(self) -> None:
+        """Collect the finished refreshes and start refreshes of due repositories while workers are available."""
+        if self.cache is not None:
+            for i in new_invalidations(self.__due.keys(), self.cache, self.__seen_invalidations):
+                self.invalidate(i)
+
+        for i, future in list(self.__in_flight.items()):
+            if future.done():
+                self.__finished(i, future)
+
+        for i in self.due_repositories()[: self.workers - len(self.__in_flight)]:
+            self.__in_flight[i] = self.executor.submit(self.refresh, i)
+
+    def join(self) -> None:
+        """Wait until all started refreshes are finished."""
+        wait(list(self.__in_flight.values()))
+        for i, future in list(self.__in_flight.items()):
+            self.__finished(i, future)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    def __finished(self, git_repository_id: str, future: "Future") -> None:
+        del self.__in_flight[git_repository_id]
+        if git_repository_id not in self.__due:
+            self.__invalidated_in_flight.discard(git_repository_id)
+            return
+
+        try:
+            self.__running[git_repository_id] = future.result()
+        except Exception as e:
+            logger.warning(f"Exception during refreshing the repository {git_repository_id}", exc_info=e)
+
+        if self.__running[git_repository_id] > 0:
+            interval = self.active_interval
+        else:
+            interval = min(self.max_idle_interval, 2 * self.__interval[git_repository_id])
+
+        self.__interval[git_repository_id] = interval
+        self.__due[git_repository_id] = self.clock() + interval
+
+        if git_repository_id in self.__invalidated_in_flight:
+            self.__invalidated_in_flight.discard(git_repository_id)
+            self.invalidate(git_repository_id)
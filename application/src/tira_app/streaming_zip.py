@@ -0,0 +1,254 @@
+"""Create zip archives as a stream of chunks so that they can be sent to clients without staging them on disk.
+
+Members are compressed concurrently and written in order by a writer that never seeks in its output. Members that are
+already compressed (archives, compressed index files) are stored without recompression.
+"""
+
+import struct
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+# Members larger than this are compressed while they are streamed instead of concurrently in memory.
+MAX_CONCURRENT_MEMBER_SIZE = 32 * 1024 * 1024
+
+_STORED_SUFFIXES = {".gz", ".tgz", ".zip", ".bz2", ".xz", ".zst", ".lz4", ".7z", ".parquet", ".jpg", ".png"}
+
+# The already compressed files of indexes: bit-compressed postings of terrier, compound files, stored fields, terms,
+# and positions of lucene, and faiss indexes.
+_STORED_INDEX_SUFFIXES = {".bf", ".cfs", ".fdt", ".tim", ".pos", ".faiss"}
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+
+def is_compressed(path: Path) -> bool:
+    """Whether compressing the file would not save space, i.e., it is an archive or an already compressed index file."""
+    suffix = path.suffix.lower()
+    return suffix in _STORED_SUFFIXES or suffix in _STORED_INDEX_SUFFIXES
+
+
+def files_to_zip(directory: Path, arcname_root: Optional[Path] = None) -> "List[Tuple[Path, str]]":
+    """All entries below the directory together with their name in the archive, relative to arcname_root."""
+    arcname_root = arcname_root if arcname_root else directory.parent
+    return [(f, str(f.relative_to(arcname_root))) for f in sorted(directory.rglob("*"))]
+
+
+def _zip_info(path: Path, arcname: str) -> zipfile.ZipInfo:
+    ret = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+    ret.CRC = 0
+    if not path.is_dir():
+        ret.compress_type = zipfile.ZIP_STORED if is_compressed(path) else zipfile.ZIP_DEFLATED
+    return ret
+
+
+def _compress(path: Path, zinfo: zipfile.ZipInfo) -> "Tuple[zipfile.ZipInfo, bytes]":
+    data = path.read_bytes()
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        data = compressor.compress(data) + compressor.flush()
+    zinfo.compress_size = len(data)
+
+    return zinfo, data
+
+
+def _compress_if_small(entry: "Tuple[Path, str]") -> "Tuple[zipfile.ZipInfo, Optional[bytes]]":
+    path, arcname = entry
+    zinfo = _zip_info(path, arcname)
+    if path.is_dir():
+        return zinfo, b""
+    if zinfo.file_size > MAX_CONCURRENT_MEMBER_SIZE:
+        return zinfo, None
+
+    return _compress(path, zinfo)
+
+
+class _ZipWriter:
+    """Writes the zip format for members whose data is passed in, so that the writer never seeks in its output.
+
+    Members with unknown sizes are followed by a zip64 data descriptor, zip64 records are used where sizes or offsets
+    exceed the limits of the zip format.
+    """
+
+    def __init__(self) -> None:
+        self.offset = 0
+        self.members: "List[zipfile.ZipInfo]" = []
+
+    def __write(self, data: bytes) -> bytes:
+        self.offset += len(data)
+        return data
+
+    def local_header(self, zinfo: zipfile.ZipInfo, streamed: bool = False) -> bytes:
+        """The local header of the member, the sizes of streamed members follow their data in a data descriptor."""
+        zinfo.header_offset = self.offset
+        self.members.append(zinfo)
+        filename, flags = _encode_filename(zinfo.filename)
+        extra = b""
+        version, crc, compress_size, file_size = 20, zinfo.CRC, zinfo.compress_size, zinfo.file_size
+        if streamed:
+            version, flags, crc = 45, flags | _FLAG_DATA_DESCRIPTOR, 0
+            compress_size, file_size = _ZIP64_LIMIT, _ZIP64_LIMIT
+            extra = struct.pack("<HHQQ", 1, 16, 0, 0)
+
+        dos_date, dos_time = _dos_date_time(zinfo.date_time)
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            version,
+            flags,
+            zinfo.compress_type,
+            dos_time,
+            dos_date,
+            crc,
+            compress_size,
+            file_size,
+            len(filename),
+            len(extra),
+        )
+        return self.__write(header + filename + extra)
+
+    def data(self, data: bytes) -> bytes:
+        return self.__write(data)
+
+    def data_descriptor(self, zinfo: zipfile.ZipInfo) -> bytes:
+        return self.__write(struct.pack("<IIQQ", 0x08074B50, zinfo.CRC, zinfo.compress_size, zinfo.file_size))
+
+    def central_directory(self) -> bytes:
+        """The central directory with the records of all members, followed by the end of central directory records."""
+        start = self.offset
+        records = b"".join(_central_directory_record(i) for i in self.members)
+        self.__write(records)
+
+        end = b""
+        if len(self.members) >= 0xFFFF or len(records) >= _ZIP64_LIMIT or start >= _ZIP64_LIMIT:
+            entries = len(self.members)
+            end += struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, entries, entries, len(records), start)
+            end += struct.pack("<IIQI", 0x07064B50, 0, self.offset, 1)
+        entries = min(len(self.members), 0xFFFF)
+        size, offset = min(len(records), _ZIP64_LIMIT), min(start, _ZIP64_LIMIT)
+        end += struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, entries, entries, size, offset, 0)
+
+        return records + self.__write(end)
+
+
+def _encode_filename(filename: str) -> "Tuple[bytes, int]":
+    try:
+        return filename.encode("ascii"), 0
+    except UnicodeEncodeError:
+        return filename.encode("utf-8"), _FLAG_UTF8
+
+
+def _dos_date_time(date_time: "Tuple[int, int, int, int, int, int]") -> "Tuple[int, int]":
+    year, month, day, hour, minute, second = date_time
+    return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+
+def _central_directory_record(zinfo: zipfile.ZipInfo) -> bytes:
+    filename, flags = _encode_filename(zinfo.filename)
+    streamed = zinfo.flag_bits & _FLAG_DATA_DESCRIPTOR
+    flags |= _FLAG_DATA_DESCRIPTOR if streamed else 0
+
+    # The zip64 extra field contains exactly the values that do not fit into the record, in this order.
+    zip64 = [i for i in (zinfo.file_size, zinfo.compress_size, zinfo.header_offset) if i >= _ZIP64_LIMIT]
+    extra = struct.pack(f"<HH{len(zip64)}Q", 1, 8 * len(zip64), *zip64) if zip64 else b""
+    version = 45 if zip64 or streamed else 20
+
+    dos_date, dos_time = _dos_date_time(zinfo.date_time)
+    record = struct.pack(
+        "<IHHHHHHIIIHHHHHII",
+        0x02014B50,
+        3 << 8 | version,
+        version,
+        flags,
+        zinfo.compress_type,
+        dos_time,
+        dos_date,
+        zinfo.CRC,
+        min(zinfo.compress_size, _ZIP64_LIMIT),
+        min(zinfo.file_size, _ZIP64_LIMIT),
+        len(filename),
+        len(extra),
+        0,
+        0,
+        0,
+        zinfo.external_attr,
+        min(zinfo.header_offset, _ZIP64_LIMIT),
+    )
+    return record + filename + extra
+
+
+def _stream_member(writer: _ZipWriter, path: Path, zinfo: zipfile.ZipInfo) -> "Iterator[bytes]":
+    """Compress the member while it is read so that large members are never held in memory."""
+    zinfo.flag_bits |= _FLAG_DATA_DESCRIPTOR
+    zinfo.CRC, zinfo.compress_size, zinfo.file_size = 0, 0, 0
+    compressor = None
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+
+    yield writer.local_header(zinfo, streamed=True)
+    with path.open("rb") as src:
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            zinfo.CRC = zlib.crc32(chunk, zinfo.CRC)
+            zinfo.file_size += len(chunk)
+            chunk = compressor.compress(chunk) if compressor else chunk
+            zinfo.compress_size += len(chunk)
+            yield writer.data(chunk)
+
+    if compressor:
+        chunk = compressor.flush()
+        zinfo.compress_size += len(chunk)
+        yield writer.data(chunk)
+    yield writer.data_descriptor(zinfo)
+
+
+def stream_zip(entries: "Iterable[Tuple[Path, str]]", workers: int = 4) -> "Iterator[bytes]":
+    """Yield the chunks of a zip archive with the given (path, arcname) entries.
+
+    :param entries: The files and directories to add to the archive together with their name in the archive.
+    :param workers: The number of threads that compress members concurrently.
+    """
+    for chunk in _stream_zip(list(entries), workers):
+        if chunk:
+            yield chunk
+
+
+def _stream_zip(entries: "List[Tuple[Path, str]]", workers: int) -> "Iterator[bytes]":
+    writer = _ZipWriter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Compress a bounded number of members ahead of the writer while keeping their order.
+        pending: "deque" = deque()
+        for i in range(len(entries)):
+            while len(pending) < 2 * workers and i + len(pending) < len(entries):
+                pending.append(executor.submit(_compress_if_small, entries[i + len(pending)]))
+
+            path, _ = entries[i]
+            zinfo, data = pending.popleft().result()
+            if data is not None:
+                yield writer.local_header(zinfo)
+                yield writer.data(data)
+            else:
+                yield from _stream_member(writer, path, zinfo)
+
+    yield writer.central_directory()
+
+
+def write_zip(entries: "Iterable[Tuple[Path, str]]", target: Path, workers: int = 4) -> Path:
+    """Write the zip archive with the given (path, arcname) entries to the target file."""
+    with target.open("wb") as f:
+        for chunk in stream_zip(entries, workers):
+            f.write(chunk)
+
+    return target
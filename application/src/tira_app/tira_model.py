@@ -15,15 +15,17 @@ from discourse_client_in_disraptor import DiscourseApiClient
 from django.conf import settings
 from django.core.cache import BaseCache, cache
 from django.db import connections, router
+from django.db.models.signals import post_save
 from slugify import slugify
 from tira.io_utils import get_tira_id
 
+from . import model as modeldb
 from .data.HybridDatabase import HybridDatabase
 from .git_runner import get_git_runner, get_git_runner_for_software_integration
 from .util import register_run
 
 if TYPE_CHECKING:
-    from typing import Any, List, Literal, Optional, Union
+    from typing import Any, Iterable, List, Literal, Optional, Union
 
     from django.core.files.uploadedfile import UploadedFile
     from django.http import HttpRequest
@@ -339,6 +341,13 @@ def get_docker_software(docker_software_id: int) -> "dict[str, Any]":
     return model.get_docker_software(docker_software_id)
 
 
+def get_docker_software_summaries(docker_software_ids: "Iterable[int]") -> "dict[int, dict[str, Any]]":
+    """
+    Return the display_name, user_image_name, and command of the docker softwares by their id with a single query.
+    """
+    return model.get_docker_software_summaries(docker_software_ids)
+
+
 def get_all_uploads_for_vm(vm_id: str):
     return model.get_all_uploads_for_vm(vm_id)
 
@@ -447,7 +456,10 @@ def get_evaluator(dataset_id: str, task_id: "Optional[str]" = None) -> "dict[str
 
 
 def get_evaluations_with_keys_by_dataset(
-    dataset_id: str, include_unpublished: bool = False, show_only_unreviewed: bool = False
+    dataset_id: str,
+    include_unpublished: bool = False,
+    show_only_unreviewed: bool = False,
+    force_cache_refresh: bool = False,
 ) -> "tuple[list[str], list[dict[str, Any]]]":
     """Get all evaluations and evaluation measures for all vms on the given dataset.
 
@@ -456,10 +468,63 @@ def get_evaluations_with_keys_by_dataset(
 
     :returns: a tuple (ev_keys, evaluation), where ev-keys is a list of keys of the evaluation measure
     and evaluation a list of evaluations and each evaluation is a dict with {vm_id: str, run_id: str, measures: list}
+
+    The leaderboard is materialised in the cache per dataset and refreshed via refresh_leaderboards whenever a run,
+    review, or evaluator of the dataset changes.
     """
-    return model.get_evaluations_with_keys_by_dataset(
+    cache_key = __leaderboard_cache_key(dataset_id, include_unpublished, show_only_unreviewed)
+    ret = cache.get(cache_key)
+    if ret is not None and not force_cache_refresh:
+        return ret
+
+    ret = model.get_evaluations_with_keys_by_dataset(
         dataset_id, include_unpublished, show_only_unreviewed=show_only_unreviewed
     )
+    logger.info(f"Cache refreshed for key {cache_key} ...")
+    cache.set(cache_key, ret)
+
+    return ret
+
+
+def __leaderboard_cache_key(dataset_id: str, include_unpublished: bool, show_only_unreviewed: bool) -> str:
+    return f"leaderboard-{dataset_id}-{bool(include_unpublished)}-{bool(show_only_unreviewed)}"
+
+
+def refresh_leaderboards(dataset_ids: "Union[str, list[str]]") -> None:
+    """Drop the materialised leaderboards of the given datasets and of all meta datasets that aggregate them, so that
+    they are rebuilt on their next access.
+    """
+    if isinstance(dataset_ids, str):
+        dataset_ids = [dataset_ids]
+
+    affected_datasets = set()
+    for dataset_id in dataset_ids:
+        if dataset_id:
+            affected_datasets.add(dataset_id)
+            affected_datasets.update(model.get_meta_datasets_of(dataset_id))
+
+    cache.delete_many(
+        [
+            __leaderboard_cache_key(dataset_id, include_unpublished, show_only_unreviewed)
+            for dataset_id in sorted(affected_datasets)
+            for include_unpublished in [False, True]
+            for show_only_unreviewed in [False, True]
+        ]
+    )
+
+
+def refresh_leaderboards_of_task(task_id: str) -> None:
+    refresh_leaderboards(
+        [i["dataset_id"] for i in get_datasets_by_task(task_id, include_deprecated=True, return_only_names=True)]
+    )
+
+
+def __refresh_leaderboards_of_saved_dataset(sender, instance: "modeldb.Dataset", **kwargs) -> None:
+    # Datasets (e.g., meta_dataset_of of meta datasets) are also edited directly via the ORM
+    refresh_leaderboards(instance.dataset_id)
+
+
+post_save.connect(__refresh_leaderboards_of_saved_dataset, sender=modeldb.Dataset)
 
 
 def get_job_details(task_id: str, vm_id: str, job_id: str) -> "Optional[dict[str, Any]]":
@@ -538,23 +603,29 @@ def add_upload(task_id, vm_id, rename_to: "Optional[str]" = None) -> "dict[str,
 
 
 def delete_upload(task_id: str, vm_id: str, upload_id: str) -> None:
-    return model.delete_upload(task_id, vm_id, upload_id)
+    model.delete_upload(task_id, vm_id, upload_id)
+    refresh_leaderboards_of_task(task_id)
 
 
 def update_upload_metadata(
     task_id: str, vm_id: str, upload_id: str, display_name: str, description: str, paper_link: str
 ) -> None:
-    return model.update_upload_metadata(task_id, vm_id, upload_id, display_name, description, paper_link)
+    model.update_upload_metadata(task_id, vm_id, upload_id, display_name, description, paper_link)
+    refresh_leaderboards_of_task(task_id)
 
 
 def add_uploaded_run(
     task_id: str, vm_id: str, dataset_id: str, upload_id: str, uploaded_file: "UploadedFile"
 ) -> "dict[str, Any]":
     """Add the uploaded file as a new result and return it"""
-    return model.add_uploaded_run(task_id, vm_id, dataset_id, upload_id, uploaded_file)
+    ret = model.add_uploaded_run(task_id, vm_id, dataset_id, upload_id, uploaded_file)
+    refresh_leaderboards(dataset_id)
+
+    return ret
 
 
 def update_docker_software_metadata(
+    task_id: str,
     docker_software_id: str,
     display_name: str,
     description: str,
@@ -562,9 +633,10 @@ def update_docker_software_metadata(
     ir_re_ranker: str,
     ir_re_ranking_input: str,
 ) -> None:
-    return model.update_docker_software_metadata(
+    model.update_docker_software_metadata(
         docker_software_id, display_name, description, paper_link, ir_re_ranker, ir_re_ranking_input
     )
+    refresh_leaderboards_of_task(task_id)
 
 
 def add_docker_software_mounts(docker_software: "dict[str, Any]", mounts: str) -> None:
@@ -795,11 +867,15 @@ def add_evaluator(
     from django.core.cache import cache
 
     get_evaluators_for_task(task_id=task_id, cache=cache, force_cache_refresh=True)
+    refresh_leaderboards(dataset_id)
 
 
 def add_run(dataset_id: str, vm_id: str, run_id: str) -> str:
     """Add a new run to the model. Currently, this initiates the caching on the application side of things."""
-    return model.add_run(dataset_id, vm_id, run_id)
+    ret = model.add_run(dataset_id, vm_id, run_id)
+    refresh_leaderboards(dataset_id)
+
+    return ret
 
 
 def update_review(
@@ -823,7 +899,7 @@ def update_review(
 ) -> bool:
     """updates the review specified by dataset_id, vm_id, and run_id with the values given in the parameters.
     Required Parameters are also required in the function"""
-    return model.update_review(
+    ret = model.update_review(
         dataset_id,
         vm_id,
         run_id,
@@ -842,6 +918,9 @@ def update_review(
         blinded,
         has_warnings,
     )
+    refresh_leaderboards(dataset_id)
+
+    return ret
 
 
 def edit_task(
@@ -914,7 +993,7 @@ def edit_dataset(
     truth_format_configuration: "Optional[str]" = None,
 ) -> "dict[str, Any]":
     """Update the datasets's data"""
-    return model.edit_dataset(
+    ret = model.edit_dataset(
         task_id,
         dataset_id,
         dataset_name,
@@ -936,23 +1015,35 @@ def edit_dataset(
         dataset_format_configuration,
         truth_format_configuration,
     )
+    refresh_leaderboards(dataset_id)
+
+    return ret
 
 
 def delete_docker_software(task_id: str, vm_id: str, docker_software_id: str) -> bool:
     """
     Delete a given Docker software.
     """
-    return model.delete_docker_software(task_id, vm_id, docker_software_id)
+    ret = model.delete_docker_software(task_id, vm_id, docker_software_id)
+    refresh_leaderboards_of_task(task_id)
+
+    return ret
 
 
 def delete_software(task_id: str, vm_id: str, software_id: str) -> bool:
     """Set the Software's deleted flag to true and prune it from the cache.
     TODO add option to truly delete the software."""
-    return model.delete_software(task_id, vm_id, software_id)
+    ret = model.delete_software(task_id, vm_id, software_id)
+    refresh_leaderboards_of_task(task_id)
+
+    return ret
 
 
 def delete_run(dataset_id: str, vm_id: str, run_id: str) -> bool:
-    return model.delete_run(dataset_id, vm_id, run_id)
+    ret = model.delete_run(dataset_id, vm_id, run_id)
+    refresh_leaderboards(dataset_id)
+
+    return ret
 
 
 def delete_task(task_id: str) -> None:
@@ -54,7 +54,30 @@ urlpatterns: list[Union[URLResolver, URLPattern]] = [
         name="software_details",
     ),
     path("task/<str:task_id>/vm/<str:vm_id>/upload/<str:dataset_id>/<str:upload_id>", vm_api.upload, name="upload"),
+    path(
+        "task/<str:task_id>/vm/<str:vm_id>/upload-parts/<str:dataset_id>/<str:upload_id>/<str:chunked_upload_id>",
+        vm_api.upload_parts,
+        name="upload_parts",
+    ),
+    path(
+        (
+            "task/<str:task_id>/vm/<str:vm_id>/upload-parts/<str:dataset_id>/<str:upload_id>/<str:chunked_upload_id>"
+            "/<int:part>"
+        ),
+        vm_api.upload_part,
+        name="upload_part",
+    ),
     path("api/v1/anonymous-uploads/<str:dataset_id>", vm_api.anonymous_upload, name="anonymous_upload"),
+    path(
+        "api/v1/anonymous-uploads/<str:dataset_id>/parts/<str:chunked_upload_id>",
+        vm_api.anonymous_upload_parts,
+        name="anonymous_upload_parts",
+    ),
+    path(
+        "api/v1/anonymous-uploads/<str:dataset_id>/parts/<str:chunked_upload_id>/<int:part>",
+        vm_api.anonymous_upload_part,
+        name="anonymous_upload_part",
+    ),
     path("task/<str:task_id>/vm/<str:vm_id>/upload-delete/<str:upload_id>", vm_api.delete_upload, name="deleteupload"),
     path(
         (
@@ -89,6 +112,7 @@ urlpatterns: list[Union[URLResolver, URLPattern]] = [
         name="tira-admin-import-irds-dataset",
     ),
     path("tira-admin/edit-dataset/<str:dataset_id>", admin_api.admin_edit_dataset, name="tira-admin-edit-dataset"),
+    path("tira-admin/evaluate-runs/<str:dataset_id>", admin_api.admin_evaluate_runs, name="tira-admin-evaluate-runs"),
     path(
         "tira-admin/delete-dataset/<str:dataset_id>", admin_api.admin_delete_dataset, name="tira-admin-delete-dataset"
     ),
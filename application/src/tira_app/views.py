@@ -9,7 +9,7 @@ from typing import Any
 
 from django.conf import settings
 from django.core.cache import cache
-from django.http import FileResponse, HttpResponseServerError, JsonResponse
+from django.http import FileResponse, HttpResponseServerError, JsonResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 from django.utils.safestring import mark_safe
 
@@ -19,12 +19,17 @@ from . import tira_model as model
 from .authentication import auth
 from .checks import check_conditional_permissions, check_permissions, check_resources_exist
 from .data.s3 import S3Database
+from .streaming_zip import files_to_zip, stream_zip, write_zip
 
 s3_db = S3Database()
 
 logger = logging.getLogger("tira")
 logger.info("Views: Logger active")
 
+MIRRORING_RUN_PREFIX = "mirroring-run-"
+# Markers of mirrors that are in flight expire after this many seconds, e.g., when the worker was killed.
+MIRRORING_RUN_TIMEOUT = 60 * 60
+
 
 def add_context(func):
     def func_wrapper(request, *args, **kwargs):
@@ -100,30 +105,45 @@ def add_user_vms_to_context(request, context: "dict[str, Any]", task_id, include
         context["docker_documentation"] = help
 
 
-def zip_run(dataset_id, vm_id, run_id):
-    """Zip the given run and hand it out for download. Deletes the zip on the server again."""
+def run_entries_to_zip(dataset_id, vm_id, run_id):
     path_to_be_zipped = Path(settings.TIRA_ROOT) / "data" / "runs" / dataset_id / vm_id / run_id
-    zipped = Path(f"{path_to_be_zipped.stem}.zip")
+    return files_to_zip(path_to_be_zipped)
+
 
-    with zipfile.ZipFile(zipped, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for f in path_to_be_zipped.rglob("*"):
-            zipf.write(f, arcname=f.relative_to(path_to_be_zipped.parent))
+def zip_run(dataset_id, vm_id, run_id, target: Path) -> Path:
+    """Zip the given run into the target file and return the path to the zip."""
+    return write_zip(run_entries_to_zip(dataset_id, vm_id, run_id), target)
 
-    return zipped
 
+def zip_runs(vm_id, dataset_ids_and_run_ids, target: Path) -> Path:
+    """Zip the given runs into the target file and return the path to the zip."""
+    entries = []
+    for dataset_id, run_id in dataset_ids_and_run_ids:
+        entries += run_entries_to_zip(dataset_id, vm_id, run_id)
 
-def zip_runs(vm_id, dataset_ids_and_run_ids, name):
-    """Zip the given run and hand it out for download. Deletes the zip on the server again."""
+    return write_zip(entries, target)
 
-    zipped = Path(f"{name}.zip")
 
-    with zipfile.ZipFile(zipped, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for dataset_id, run_id in dataset_ids_and_run_ids:
-            path_to_be_zipped = Path(settings.TIRA_ROOT) / "data" / "runs" / dataset_id / vm_id / run_id
-            for f in path_to_be_zipped.rglob("*"):
-                zipf.write(f, arcname=f.relative_to(path_to_be_zipped.parent))
+def stream_and_mirror_run(db_run, entries):
+    """Stream the zipped run to the client while it is uploaded to s3 as mirrored resource for subsequent downloads."""
+    from .endpoints.v1._datasets import stream_as_mirrored_resource
 
-    return zipped
+    try:
+        db_run.mirrored_resource = yield from stream_as_mirrored_resource(stream_zip(entries))
+        db_run.save()
+    except Exception as e:
+        logger.warning(f"Could not upload data to s3 in download_rundir {e}.")
+    finally:
+        cache.delete(f"{MIRRORING_RUN_PREFIX}{db_run.run_id}")
+
+
+def stream_run(db_run, entries):
+    """Stream the zipped run to the client, only one of concurrent downloads mirrors the run to s3."""
+    if cache.add(f"{MIRRORING_RUN_PREFIX}{db_run.run_id}", True, timeout=MIRRORING_RUN_TIMEOUT):
+        return stream_and_mirror_run(db_run, entries)
+
+    # Another download mirrors the run at the moment, so this one is streamed without mirroring it again.
+    return stream_zip(entries)
 
 
 @check_resources_exist("json")
@@ -150,33 +170,27 @@ def view_ir_metadata_of_run(request, task_id, dataset_id, vm_id, run_id, metadat
 @check_conditional_permissions(public_data_ok=True)
 @check_resources_exist("json")
 def download_rundir(request, task_id, dataset_id, vm_id, run_id):
-    """Zip the given run and hand it out for download. Deletes the zip on the server again."""
-    from .endpoints.v1._datasets import upload_mirrored_resource
-
+    """Hand out the zipped run for download, the first download streams the zip while it is mirrored to s3."""
     db_run = modeldb.Run.objects.select_related("mirrored_resource").get(run_id=run_id)
     if db_run.mirrored_resource is None:
-        zipped = zip_run(dataset_id, vm_id, run_id)
-        try:
-            mirror = upload_mirrored_resource(zipped)
-        except Exception as e:
-            msg = f"Could not upload data from s3 in download_rundir {e}."
-            print(msg, e)
-            logger.warning(msg)
-            return HttpResponseServerError(json.dumps({"status": 1, "message": "Could not load data from s3."}))
+        entries = run_entries_to_zip(dataset_id, vm_id, run_id)
+        if not any(f.is_file() for f, _ in entries):
+            # Archives without files are never handed out, so that they are not mirrored.
+            logger.warning(f"The run directory of {dataset_id}/{vm_id}/{run_id} does not exist or is empty.")
+            return HttpResponseServerError(json.dumps({"status": 1, "message": "The run does not exist."}))
 
-        db_run.mirrored_resource = mirror
-        db_run.save()
+        response = StreamingHttpResponse(stream_run(db_run, entries), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="{run_id}.zip"'
+        return response
 
     try:
-        ret_body = s3_db.read_mirrored_resource(db_run.mirrored_resource)
+        return s3_db.download_response(request, db_run.mirrored_resource, f"{run_id}.zip")
     except Exception as e:
         msg = f"Could not load data from s3 in download_rundir {e}."
         print(msg, e)
         logger.warning(msg)
         return HttpResponseServerError(json.dumps({"status": 1, "message": "Could not load data from s3."}))
 
-    return FileResponse(ret_body, as_attachment=True, filename=f"{run_id}.zip")
-
 
 @check_conditional_permissions(public_data_ok=True)
 @check_resources_exist("json")
@@ -246,11 +260,10 @@ def download_datadir(request, dataset_type, input_type, dataset_id):
         return JsonResponse({"status": 1, "reason": "Does not exist"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
 
     try:
-        ret_body = s3_db.read_mirrored_resource(mirrors[0].mirrored_resource)
+        filename = f"{dataset_id}-{dataset_type}{input_type}.zip"
+        return s3_db.download_response(request, mirrors[0].mirrored_resource, filename)
     except Exception as e:
         msg = f"Could not load data from s3 in download_datadir {e}."
         print(msg, e)
         logger.warning(msg)
         return HttpResponseServerError(json.dumps({"status": 1, "message": "Could not load data from s3."}))
-
-    return FileResponse(ret_body, as_attachment=True, filename=f"{dataset_id}-{dataset_type}{input_type}.zip")
@@ -823,6 +823,108 @@ API_ACCESS_MATRIX = [
             ORGANIZER_WRONG_TASK: 302,
         },
     ),
+    route_to_test(
+        url_pattern=(
+            "task/<str:task_id>/vm/<str:vm_id>/upload-parts/<str:dataset_id>/<str:upload_id>/<str:chunked_upload_id>"
+        ),
+        params={
+            "task_id": "shared-task-1",
+            "vm_id": "example_participant",
+            "dataset_id": 0,
+            "upload_id": -1,
+            "chunked_upload_id": "upload-1",
+        },
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 302,
+            PARTICIPANT: 302,
+            ORGANIZER: 302,
+            ORGANIZER_WRONG_TASK: 302,
+        },
+    ),
+    route_to_test(
+        url_pattern=(
+            "task/<str:task_id>/vm/<str:vm_id>/upload-parts/<str:dataset_id>/<str:upload_id>/<str:chunked_upload_id>"
+        ),
+        params={
+            "task_id": "shared-task-1",
+            "vm_id": PARTICIPANT.split("_")[-1],
+            "dataset_id": 0,
+            "upload_id": -1,
+            "chunked_upload_id": "upload-1",
+        },
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 302,
+            PARTICIPANT: 200,
+            ORGANIZER: 302,
+            ORGANIZER_WRONG_TASK: 302,
+        },
+    ),
+    route_to_test(
+        url_pattern=(
+            "task/<str:task_id>/vm/<str:vm_id>/upload-parts/<str:dataset_id>/<str:upload_id>/"
+            "<str:chunked_upload_id>/<int:part>"
+        ),
+        params={
+            "task_id": "shared-task-1",
+            "vm_id": "example_participant",
+            "dataset_id": 0,
+            "upload_id": -1,
+            "chunked_upload_id": "upload-1",
+            "part": 0,
+        },
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 302,
+            PARTICIPANT: 302,
+            ORGANIZER: 302,
+            ORGANIZER_WRONG_TASK: 302,
+        },
+    ),
+    route_to_test(
+        url_pattern=(
+            "task/<str:task_id>/vm/<str:vm_id>/upload-parts/<str:dataset_id>/<str:upload_id>/"
+            "<str:chunked_upload_id>/<int:part>"
+        ),
+        params={
+            "task_id": "shared-task-1",
+            "vm_id": PARTICIPANT.split("_")[-1],
+            "dataset_id": 0,
+            "upload_id": -1,
+            "chunked_upload_id": "upload-1",
+            "part": 0,
+        },
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 302,
+            PARTICIPANT: 200,
+            ORGANIZER: 302,
+            ORGANIZER_WRONG_TASK: 302,
+        },
+    ),
+    route_to_test(
+        url_pattern="api/v1/anonymous-uploads/<str:dataset_id>/parts/<str:chunked_upload_id>",
+        params={"dataset_id": "does-not-exist", "chunked_upload_id": "upload-1"},
+        group_to_expected_status_code={
+            ADMIN: 500,
+            GUEST: 500,
+            PARTICIPANT: 500,
+            ORGANIZER: 500,
+            ORGANIZER_WRONG_TASK: 500,
+        },
+    ),
+    route_to_test(
+        url_pattern="api/v1/anonymous-uploads/<str:dataset_id>/parts/<str:chunked_upload_id>/<int:part>",
+        params={"dataset_id": "does-not-exist", "chunked_upload_id": "upload-1", "part": 0},
+        group_to_expected_status_code={
+            ADMIN: 500,
+            GUEST: 500,
+            PARTICIPANT: 500,
+            ORGANIZER: 500,
+            ORGANIZER_WRONG_TASK: 500,
+        },
+    ),
     route_to_test(
         url_pattern="api/evaluations_of_run/<str:vm_id>/<str:run_id>",
         params={"vm_id": PARTICIPANT.split("_")[-1], "run_id": "run-1-example_participant"},
@@ -1127,6 +1229,39 @@ API_ACCESS_MATRIX = [
             ORGANIZER_WRONG_TASK: 405,
         },
     ),
+    route_to_test(
+        url_pattern="tira-admin/evaluate-runs/<str:dataset_id>",
+        params={"dataset_id": "does-not-exist"},
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 405,
+            PARTICIPANT: 405,
+            ORGANIZER: 405,
+            ORGANIZER_WRONG_TASK: 405,
+        },
+    ),
+    route_to_test(
+        url_pattern="tira-admin/evaluate-runs/<str:dataset_id>",
+        params={"dataset_id": f"dataset-of-organizer-{now}-training"},
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 405,
+            PARTICIPANT: 405,
+            ORGANIZER: 200,
+            ORGANIZER_WRONG_TASK: 405,
+        },
+    ),
+    route_to_test(
+        url_pattern="tira-admin/evaluate-runs/<str:dataset_id>",
+        params={"dataset_id": f"dataset-1-{now}-training"},
+        group_to_expected_status_code={
+            ADMIN: 200,
+            GUEST: 405,
+            PARTICIPANT: 405,
+            ORGANIZER: 405,
+            ORGANIZER_WRONG_TASK: 405,
+        },
+    ),
     route_to_test(
         url_pattern="tira-admin/delete-dataset/<str:dataset_id>",
         params={"dataset_id": "does-not-exist"},
@@ -1902,6 +2037,18 @@ API_ACCESS_MATRIX = [
             ADMIN: 500,
         },
     ),
+    route_to_test(
+        url_pattern="v1/admin/pipeline-events",
+        params={},
+        method="POST",
+        group_to_expected_status_code={
+            GUEST: 403,
+            PARTICIPANT: 403,
+            ORGANIZER_WRONG_TASK: 403,
+            ORGANIZER: 403,
+            ADMIN: 403,
+        },
+    ),
     # The following v1/ endpoints should be restricted to only allow admin-access for now
     route_to_test(
         url_pattern="v1/evaluations/",
@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from utils_for_testing import mock_request, set_up_tira_environment
+
+from tira_app import tira_model
+from tira_app.authentication import auth, clear_vm_exists_cache
+
+groups = "tira_vm_PARTICIPANT-FOR-TEST-1,tira_org_EXAMPLE-ORGANIZER"
+
+
+class TestAuthorizationContext(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        set_up_tira_environment()
+
+    def setUp(self):
+        clear_vm_exists_cache()
+
+    def test_headers_are_parsed_once_per_request(self):
+        request = mock_request(groups, "api/task/shared-task-1")
+
+        with patch.object(tira_model, "get_vm", wraps=tira_model.get_vm) as get_vm:
+            for _ in range(3):
+                self.assertEqual(["PARTICIPANT-FOR-TEST-1", "ignored-user.-default"], auth.get_vm_ids(request))
+                self.assertEqual(["EXAMPLE-ORGANIZER"], auth.get_organizer_ids(request))
+                self.assertEqual("ignored-user.", auth.get_user_id(request))
+                auth.get_role(request, user_id=auth.get_user_id(request), vm_id="PARTICIPANT-FOR-TEST-1")
+
+        self.assertEqual(2, get_vm.call_count)
+
+    def test_existence_of_vms_is_cached_across_requests(self):
+        with patch.object(tira_model, "get_vm", wraps=tira_model.get_vm) as get_vm:
+            for _ in range(3):
+                auth.get_vm_ids(mock_request(groups, "api/task/shared-task-1"))
+
+        self.assertEqual(2, get_vm.call_count)
+
+    def test_role_of_participant_is_unchanged(self):
+        request = mock_request(groups, "api/task/shared-task-1")
+
+        self.assertEqual(auth.ROLE_PARTICIPANT, auth.get_role(request, vm_id="PARTICIPANT-FOR-TEST-1"))
+        self.assertEqual(auth.ROLE_ADMIN, auth.get_role(mock_request("admins", "api/task/shared-task-1")))
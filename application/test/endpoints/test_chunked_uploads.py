@@ -0,0 +1,87 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tira_app import chunked_uploads
+from tira_app.chunked_uploads import AssembledFile, assemble, received_parts, store_part
+
+
+class _UploadedPart:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    def chunks(self):
+        return [self.content[:3], self.content[3:]]
+
+
+class TestChunkedUploads(unittest.TestCase):
+    def test_parts_are_assembled_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            upload_dir = Path(tmp_dir) / "namespace" / "upload-1"
+            store_part(upload_dir, 1, _UploadedPart(b"world"), hashlib.md5(b"world").hexdigest())
+            store_part(upload_dir, 0, _UploadedPart(b"hello "), None)
+
+            actual = assemble(upload_dir, 2, hashlib.md5(b"hello world").hexdigest())
+
+            self.assertEqual(b"hello world", actual.read_bytes())
+            self.assertEqual(b"hello world", b"".join(AssembledFile(actual).chunks()))
+
+    def test_received_parts_allow_to_resume_an_upload(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            upload_dir = Path(tmp_dir) / "namespace" / "upload-1"
+            store_part(upload_dir, 0, _UploadedPart(b"hello "), None)
+
+            self.assertEqual({0: hashlib.md5(b"hello ").hexdigest()}, received_parts(upload_dir))
+            with self.assertRaises(ValueError):
+                assemble(upload_dir, 2, None)
+
+    def test_parts_with_unexpected_checksum_are_rejected(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            upload_dir = Path(tmp_dir) / "namespace" / "upload-1"
+
+            with self.assertRaises(ValueError):
+                store_part(upload_dir, 0, _UploadedPart(b"corrupted"), hashlib.md5(b"hello ").hexdigest())
+
+            self.assertEqual({}, received_parts(upload_dir))
+            self.assertEqual([], list(upload_dir.iterdir()))
+
+    def test_uploads_larger_than_the_maximum_are_rejected(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(chunked_uploads, "MAX_UPLOAD_SIZE", 10):
+            upload_dir = Path(tmp_dir) / "namespace" / "upload-1"
+            store_part(upload_dir, 0, _UploadedPart(b"hello "), None)
+            store_part(upload_dir, 0, _UploadedPart(b"hello "), None)
+
+            with self.assertRaises(ValueError):
+                store_part(upload_dir, 1, _UploadedPart(b"world"), None)
+
+            self.assertEqual([0], list(received_parts(upload_dir).keys()))
+
+    def test_new_anonymous_uploads_are_rejected_if_too_many_are_pending(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(
+            chunked_uploads, "MAX_PENDING_ANONYMOUS_UPLOADS", 2
+        ):
+            namespace = Path(tmp_dir) / "anonymous-dataset-1"
+            store_part(namespace / "upload-1", 0, _UploadedPart(b"hello "), None)
+            store_part(namespace / "upload-2", 0, _UploadedPart(b"hello "), None)
+
+            with self.assertRaises(ValueError):
+                store_part(Path(tmp_dir) / "anonymous-dataset-2" / "upload-3", 0, _UploadedPart(b"hello "), None)
+
+            # Pending uploads can be completed and uploads with an account are not limited
+            store_part(namespace / "upload-2", 1, _UploadedPart(b"world"), None)
+            store_part(Path(tmp_dir) / "namespace" / "upload-4", 0, _UploadedPart(b"hello "), None)
+            self.assertFalse((Path(tmp_dir) / "anonymous-dataset-2" / "upload-3").exists())
+
+    def test_anonymous_uploads_are_rejected_if_the_pending_uploads_are_too_large(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(chunked_uploads, "MAX_PENDING_ANONYMOUS_SIZE", 10):
+            namespace = Path(tmp_dir) / "anonymous-dataset-1"
+            store_part(namespace / "upload-1", 0, _UploadedPart(b"hello "), None)
+
+            with self.assertRaises(ValueError):
+                store_part(namespace / "upload-2", 0, _UploadedPart(b"world"), None)
+
+            store_part(namespace / "upload-1", 0, _UploadedPart(b"hello!"), None)
+            self.assertEqual([0], list(received_parts(namespace / "upload-1").keys()))
+            self.assertEqual({}, received_parts(namespace / "upload-2"))
@@ -0,0 +1,51 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+from tira_app.endpoints.v1._datasets import store_mirrored_resource
+
+CONTENT = b"0123456789" * 300
+
+
+class TestMirroredResources(unittest.TestCase):
+    def test_file_is_copied_and_hashed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            zipped = Path(tmp_dir) / "run.zip"
+            zipped.write_bytes(CONTENT)
+
+            actual = store_mirrored_resource(zipped, Path(tmp_dir) / "mirrored-resources")
+
+            expected = (hashlib.md5(CONTENT).hexdigest(), hashlib.md5(CONTENT[:1024]).hexdigest(), len(CONTENT))
+            self.assertEqual(expected, actual)
+            self.assertEqual(CONTENT, (Path(tmp_dir) / "mirrored-resources" / expected[0]).read_bytes())
+            self.assertTrue(zipped.exists())
+            self.assertEqual([expected[0]], [i.name for i in (Path(tmp_dir) / "mirrored-resources").iterdir()])
+
+    def test_file_is_moved(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            zipped = Path(tmp_dir) / "run.zip"
+            zipped.write_bytes(CONTENT)
+            inode = zipped.stat().st_ino
+
+            md5_sum, _, _ = store_mirrored_resource(zipped, Path(tmp_dir) / "mirrored-resources", move=True)
+
+            target = Path(tmp_dir) / "mirrored-resources" / md5_sum
+            self.assertFalse(zipped.exists())
+            self.assertEqual(CONTENT, target.read_bytes())
+            self.assertEqual(inode, target.stat().st_ino)
+
+    def test_existing_resources_are_kept(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_dir = Path(tmp_dir) / "mirrored-resources"
+            target_dir.mkdir()
+            (target_dir / hashlib.md5(CONTENT).hexdigest()).write_bytes(CONTENT)
+            zipped = Path(tmp_dir) / "run.zip"
+            zipped.write_bytes(CONTENT)
+
+            with self.assertLogs("tira", level="INFO") as logs:
+                store_mirrored_resource(zipped, target_dir, move=True)
+
+            self.assertIn("already exists", logs.output[0])
+            self.assertFalse(zipped.exists())
+            self.assertEqual(1, len(list(target_dir.iterdir())))
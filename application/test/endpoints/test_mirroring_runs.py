@@ -0,0 +1,65 @@
+import io
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from tira_app.streaming_zip import files_to_zip
+from tira_app.views import stream_run
+
+
+class _Run:
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.mirrored_resource = None
+        self.saved = 0
+
+    def save(self):
+        self.saved += 1
+
+
+def _stream_as_mirrored_resource(chunks):
+    yield from chunks
+    return "mirrored-resource"
+
+
+class TestMirroringRuns(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        run_dir = Path(self.tmp_dir.name) / "run-1"
+        (run_dir / "output").mkdir(parents=True)
+        (run_dir / "output" / "run.txt").write_text("1 Q0 doc-1 1 1.0 tag\n")
+        self.entries = files_to_zip(run_dir)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch("tira_app.endpoints.v1._datasets.stream_as_mirrored_resource", _stream_as_mirrored_resource)
+    def test_concurrent_downloads_mirror_the_run_only_once(self):
+        run = _Run("run-concurrent-downloads")
+        first = stream_run(run, self.entries)
+        first_chunk = next(first)
+
+        # The first download is still in flight, so the second one is only streamed
+        second = b"".join(stream_run(run, self.entries))
+        self.assertEqual(0, run.saved)
+
+        first = first_chunk + b"".join(first)
+        self.assertEqual(1, run.saved)
+        self.assertEqual("mirrored-resource", run.mirrored_resource)
+        for actual in [first, second]:
+            self.assertEqual(
+                b"1 Q0 doc-1 1 1.0 tag\n", zipfile.ZipFile(io.BytesIO(actual)).read("run-1/output/run.txt")
+            )
+
+    @patch("tira_app.endpoints.v1._datasets.stream_as_mirrored_resource", _stream_as_mirrored_resource)
+    def test_downloads_after_an_aborted_mirror_mirror_the_run(self):
+        run = _Run("run-aborted-download")
+        aborted = stream_run(run, self.entries)
+        next(aborted)
+        aborted.close()
+
+        b"".join(stream_run(run, self.entries))
+        self.assertEqual(1, run.saved)
@@ -0,0 +1,47 @@
+import json
+from unittest.mock import patch
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from utils_for_testing import InMemoryCache
+
+from tira_app.endpoints.v1 import _admin
+from tira_app.pipeline_refresher import INVALIDATION_PREFIX
+
+
+@override_settings(GIT_CI_WEBHOOK_TOKEN="webhook-token")
+class TestPipelineEvents(SimpleTestCase):
+    def post(self, event, token="webhook-token"):
+        cache = InMemoryCache()
+        request = RequestFactory().post(
+            "/v1/admin/pipeline-events",
+            data=event if isinstance(event, str) else json.dumps(event),
+            content_type="application/json",
+            headers={"X-Gitlab-Token": token},
+        )
+        with patch.object(_admin, "cache", cache):
+            return _admin.pipeline_events(request), cache.entries
+
+    def test_pipeline_events_invalidate_the_repository(self):
+        response, entries = self.post({"object_kind": "pipeline", "project": {"id": 42}})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([f"{INVALIDATION_PREFIX}42"], list(entries.keys()))
+
+    def test_job_events_invalidate_the_repository(self):
+        response, entries = self.post({"object_kind": "build", "project_id": 42})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([f"{INVALIDATION_PREFIX}42"], list(entries.keys()))
+
+    def test_events_with_an_invalid_token_are_rejected(self):
+        response, entries = self.post({"object_kind": "pipeline", "project": {"id": 42}}, token="wrong-token")
+
+        self.assertEqual(403, response.status_code)
+        self.assertEqual({}, entries)
+
+    def test_malformed_or_incomplete_events_are_rejected(self):
+        for event in ["not json", [], '"project"', {"object_kind": "pipeline"}, {"project": {}}, {"project_id": None}]:
+            response, entries = self.post(event)
+
+            self.assertEqual(400, response.status_code, event)
+            self.assertEqual({}, entries)
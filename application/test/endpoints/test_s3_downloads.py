@@ -0,0 +1,99 @@
+import io
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from tira_app.data.s3 import S3Database
+
+CONTENT = b"0123456789"
+RESOURCE = SimpleNamespace(md5_sum="d41d8cd98f00b204e9800998ecf8427e", size=len(CONTENT))
+
+
+class _S3Client:
+    def __init__(self):
+        self.requests = []
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.requests.append(Range)
+        if not Range:
+            return {"Body": StreamingBody(io.BytesIO(CONTENT), len(CONTENT)), "ContentLength": len(CONTENT)}
+
+        start, end = Range.replace("bytes=", "").split("-")
+        if int(start) >= len(CONTENT):
+            raise ClientError({"Error": {"Code": "InvalidRange"}}, "GetObject")
+        end = int(end) if end else len(CONTENT) - 1
+        body = CONTENT[int(start) : end + 1]
+        return {
+            "Body": StreamingBody(io.BytesIO(body), len(body)),
+            "ContentLength": len(body),
+            "ContentRange": f"bytes {start}-{end}/{len(CONTENT)}",
+        }
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return f"https://s3.example.com/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+
+
+class _S3Database(S3Database):
+    def __init__(self):
+        self.client = _S3Client()
+
+    def s3_client(self):
+        return self.client
+
+
+class TestS3Downloads(SimpleTestCase):
+    def download(self, **headers):
+        s3_db = _S3Database()
+        request = RequestFactory().get("/download", **headers)
+        return s3_db.download_response(request, RESOURCE, "run.zip"), s3_db.client.requests
+
+    def test_complete_download_is_streamed(self):
+        response, requests = self.download()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(CONTENT, b"".join(response.streaming_content))
+        self.assertEqual(str(len(CONTENT)), response["Content-Length"])
+        self.assertEqual('attachment; filename="run.zip"', response["Content-Disposition"])
+        self.assertEqual([None], requests)
+
+    def test_ranged_download(self):
+        response, requests = self.download(HTTP_RANGE="bytes=2-4")
+
+        self.assertEqual(206, response.status_code)
+        self.assertEqual(b"234", b"".join(response.streaming_content))
+        self.assertEqual("bytes 2-4/10", response["Content-Range"])
+        self.assertEqual(["bytes=2-4"], requests)
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.download(HTTP_RANGE="bytes=20-")
+
+        self.assertEqual(416, response.status_code)
+        self.assertEqual("bytes */10", response["Content-Range"])
+
+    def test_multiple_ranges_are_answered_with_the_complete_file(self):
+        response, requests = self.download(HTTP_RANGE="bytes=0-1,4-5")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([None], requests)
+
+    @override_settings(S3_DOWNLOAD_MODE="presigned")
+    def test_presigned_download_redirects_to_s3(self):
+        response, requests = self.download()
+
+        self.assertEqual(302, response.status_code)
+        self.assertTrue(response["Location"].startswith("https://s3.example.com/"))
+        self.assertEqual([], requests)
+
+    @override_settings(S3_DOWNLOAD_MODE="x-accel-redirect")
+    def test_x_accel_redirect_download(self):
+        response, requests = self.download()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"", response.content)
+        self.assertEqual(
+            f"/s3-mirrored-resources/https/s3.example.com/None/{RESOURCE.md5_sum}?X-Amz-Expires=300",
+            response["X-Accel-Redirect"],
+        )
+        self.assertEqual([], requests)
@@ -0,0 +1,61 @@
+from hashlib import md5
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from tira_app.data import s3
+from tira_app.data.s3 import MultipartUpload
+
+CONTENT = b"0123456789"
+
+
+class _S3Client:
+    def __init__(self):
+        self.parts = []
+        self.objects = {}
+        self.aborted = []
+
+    def create_multipart_upload(self, Bucket, Key):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts.append(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.parts)
+
+    def copy(self, CopySource, Bucket, Key, Config):
+        self.objects[Key] = self.objects[CopySource["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        del self.objects[Key]
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+
+
+class TestS3Uploads(SimpleTestCase):
+    def test_written_bytes_are_uploaded_in_parts_and_stored_under_their_md5_sum(self):
+        client = _S3Client()
+        upload = MultipartUpload(client)
+
+        with patch.object(s3._TRANSFER_CONFIG, "multipart_chunksize", 4):
+            for i in range(0, len(CONTENT), 3):
+                upload.write(CONTENT[i : i + 3])
+            actual = upload.complete()
+
+        self.assertEqual((md5(CONTENT).hexdigest(), md5(CONTENT).hexdigest(), len(CONTENT)), actual)
+        self.assertEqual([b"012345", b"6789"], client.parts)
+        self.assertEqual({md5(CONTENT).hexdigest(): CONTENT}, client.objects)
+
+    def test_empty_uploads_are_not_completed(self):
+        client = _S3Client()
+        upload = MultipartUpload(client)
+
+        with self.assertRaises(ValueError):
+            upload.complete()
+        upload.abort()
+
+        self.assertEqual({}, client.objects)
+        self.assertEqual(["upload-1"], client.aborted)
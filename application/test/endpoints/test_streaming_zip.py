@@ -0,0 +1,56 @@
+import io
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from tira_app import streaming_zip
+from tira_app.streaming_zip import files_to_zip, stream_zip
+
+
+def _run_directory(tmp_dir):
+    ret = Path(tmp_dir) / "run-1"
+    (ret / "output" / "pyterrier-index").mkdir(parents=True)
+    run = [f"{q} Q0 doc-{d} {d} 1.0 tag\n" for q in range(20) for d in range(50)]
+    (ret / "output" / "run.txt").write_text("".join(run))
+    (ret / "output" / "run.jsonl.gz").write_bytes(b"\x1f\x8b-already-compressed")
+    (ret / "output" / "pyterrier-index" / "data.properties").write_text("index.terrier.version=5.8")
+    (ret / "output" / "pyterrier-index" / "data.inverted.bf").write_bytes(b"bit-compressed-postings")
+    (ret / "output" / "ünicode.txt").write_text("ünicode")
+    return ret
+
+
+class TestStreamingZip(unittest.TestCase):
+    def assert_valid_zip_of_run(self, run_dir, chunks):
+        actual = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+        self.assertIsNone(actual.testzip())
+        self.assertEqual((run_dir / "output" / "run.txt").read_bytes(), actual.read("run-1/output/run.txt"))
+        self.assertEqual(zipfile.ZIP_DEFLATED, actual.getinfo("run-1/output/run.txt").compress_type)
+        self.assertEqual(zipfile.ZIP_STORED, actual.getinfo("run-1/output/run.jsonl.gz").compress_type)
+        self.assertEqual(
+            zipfile.ZIP_DEFLATED, actual.getinfo("run-1/output/pyterrier-index/data.properties").compress_type
+        )
+        self.assertEqual(
+            zipfile.ZIP_STORED, actual.getinfo("run-1/output/pyterrier-index/data.inverted.bf").compress_type
+        )
+        self.assertEqual("ünicode", actual.read("run-1/output/ünicode.txt").decode("utf-8"))
+        self.assertTrue(actual.getinfo("run-1/output/pyterrier-index/").is_dir())
+
+    def test_small_members_are_compressed_concurrently(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run_dir = _run_directory(tmp_dir)
+            self.assert_valid_zip_of_run(run_dir, stream_zip(files_to_zip(run_dir), workers=2))
+
+    def test_large_members_are_streamed(self):
+        max_concurrent_member_size = streaming_zip.MAX_CONCURRENT_MEMBER_SIZE
+        streaming_zip.MAX_CONCURRENT_MEMBER_SIZE = 10
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                run_dir = _run_directory(tmp_dir)
+                self.assert_valid_zip_of_run(run_dir, stream_zip(files_to_zip(run_dir), workers=2))
+        finally:
+            streaming_zip.MAX_CONCURRENT_MEMBER_SIZE = max_concurrent_member_size
+
+    def test_empty_archive(self):
+        self.assertEqual([], zipfile.ZipFile(io.BytesIO(b"".join(stream_zip([])))).infolist())
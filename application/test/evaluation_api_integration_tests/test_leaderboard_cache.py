@@ -0,0 +1,71 @@
+from django.test import TestCase
+from utils_for_testing import dataset_1, dataset_2, dataset_meta, set_up_tira_environment
+
+from tira_app import model as modeldb
+from tira_app import tira_model
+
+
+class TestLeaderboardCache(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        set_up_tira_environment()
+
+    def test_leaderboard_is_served_from_the_cache(self):
+        expected = tira_model.get_evaluations_with_keys_by_dataset(dataset_2)
+
+        # Change the underlying data without going through tira_model, so the materialised leaderboard is stale
+        tira_model.model.update_review(dataset_2, "participant-2", "run-ds2-0-participant-2-eval", published=True)
+        actual = tira_model.get_evaluations_with_keys_by_dataset(dataset_2)
+
+        self.assertEqual(expected, actual)
+        refreshed = tira_model.get_evaluations_with_keys_by_dataset(dataset_2, force_cache_refresh=True)
+        self.assertNotEqual(expected, refreshed)
+
+        tira_model.model.update_review(dataset_2, "participant-2", "run-ds2-0-participant-2-eval", published=False)
+        tira_model.refresh_leaderboards(dataset_2)
+
+    def test_update_review_refreshes_the_leaderboard_of_the_dataset_and_its_meta_dataset(self):
+        for dataset_id in [dataset_2, dataset_meta]:
+            tira_model.get_evaluations_with_keys_by_dataset(dataset_id)
+
+        tira_model.update_review(dataset_2, "participant-2", "run-ds2-1-participant-2-eval", published=True)
+
+        for dataset_id in [dataset_2, dataset_meta]:
+            expected = tira_model.model.get_evaluations_with_keys_by_dataset(dataset_id)
+            actual = tira_model.get_evaluations_with_keys_by_dataset(dataset_id)
+            self.assertEqual(expected, actual)
+
+        tira_model.update_review(dataset_2, "participant-2", "run-ds2-1-participant-2-eval", published=False)
+
+    def test_deleting_software_refreshes_the_leaderboards_of_the_task(self):
+        # Software that does not exist is not deleted, but the leaderboards are refreshed nonetheless
+        for delete in [tira_model.delete_docker_software, tira_model.delete_software]:
+            tira_model.get_evaluations_with_keys_by_dataset(dataset_2)
+            tira_model.model.update_review(dataset_2, "participant-2", "run-ds2-0-participant-2-eval", published=True)
+
+            self.assertFalse(delete("shared-task-1", "participant-2", "-1"))
+            expected = tira_model.model.get_evaluations_with_keys_by_dataset(dataset_2)
+            actual = tira_model.get_evaluations_with_keys_by_dataset(dataset_2)
+            self.assertEqual(expected, actual)
+
+            tira_model.model.update_review(dataset_2, "participant-2", "run-ds2-0-participant-2-eval", published=False)
+            tira_model.refresh_leaderboards(dataset_2)
+
+    def test_editing_the_datasets_of_a_meta_dataset_refreshes_its_leaderboard(self):
+        expected = tira_model.get_evaluations_with_keys_by_dataset(dataset_meta)
+        meta_dataset = modeldb.Dataset.objects.get(dataset_id=dataset_meta)
+
+        meta_dataset.meta_dataset_of = dataset_1
+        meta_dataset.save()
+        actual = tira_model.get_evaluations_with_keys_by_dataset(dataset_meta)
+
+        self.assertNotEqual(expected, actual)
+        self.assertEqual(tira_model.model.get_evaluations_with_keys_by_dataset(dataset_meta), actual)
+
+        meta_dataset.meta_dataset_of = dataset_1 + "," + dataset_2
+        meta_dataset.save()
+        self.assertEqual(expected, tira_model.get_evaluations_with_keys_by_dataset(dataset_meta))
+
+    @classmethod
+    def tearDownClass(cls):
+        pass
@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from utils_for_testing import InMemoryCache
+
+from tira_app.git_runner_integration import GitLabRunner
+
+JOB_FILE_DIFF = "@@ -0,0 +1,3 @@\n+TIRA_SOFTWARE_ID=docker-software-42\n+TIRA_DATASET_ID=dataset-1\n+TIRA_CPU_COUNT=2"
+
+
+def gitlab_project(branch):
+    commit = MagicMock(title=f"Job {branch}")
+    commit.diff.return_value = [
+        {"old_path": "x/job-to-execute.txt", "new_path": "x/job-to-execute.txt", "diff": JOB_FILE_DIFF}
+    ]
+    ret = MagicMock(id=1)
+    ret.commits.list.return_value = [commit]
+    return ret
+
+
+class TestJobConfigurationCache(unittest.TestCase):
+    def setUp(self):
+        self.runner = GitLabRunner.__new__(GitLabRunner)
+        self.cache = InMemoryCache()
+
+    def test_job_configuration_is_fetched_once_per_head_commit(self):
+        project = gitlab_project("branch-1")
+        expected = {"TIRA_SOFTWARE_ID": "docker-software-42", "TIRA_DATASET_ID": "dataset-1", "TIRA_CPU_COUNT": "2"}
+
+        self.assertEqual(expected, self.runner.parsed_job_configuration(project, "branch-1", "sha-1", self.cache))
+        self.assertEqual(expected, self.runner.parsed_job_configuration(project, "branch-1", "sha-1", self.cache))
+        self.assertEqual(1, project.commits.list.call_count)
+
+        self.runner.parsed_job_configuration(project, "branch-1", "sha-2", self.cache)
+        self.assertEqual(2, project.commits.list.call_count)
+
+    def test_failures_are_not_cached(self):
+        project = gitlab_project("branch-1")
+        project.commits.list.side_effect = ValueError("rate limit")
+
+        self.assertEqual({}, self.runner.parsed_job_configuration(project, "branch-1", "sha-1", self.cache))
+        self.assertEqual({}, self.cache.entries)
+
+    def test_job_configuration_is_parsed_from_the_commit_of_the_branch(self):
+        project = gitlab_project("branch-1")
+        merge_commit = MagicMock(title="Merge branch-1")
+        other_commit = MagicMock(title="Job branch-1")
+        other_commit.diff.return_value = [{"old_path": "README.md", "new_path": "README.md", "diff": "+A=B"}]
+        project.commits.list.return_value = [merge_commit, other_commit] + project.commits.list.return_value
+
+        actual = self.runner.parsed_job_configuration(project, "branch-1")
+
+        self.assertEqual("docker-software-42", actual["TIRA_SOFTWARE_ID"])
+        self.assertEqual(3, len(actual))
+        merge_commit.diff.assert_not_called()
+
+    def test_main_branch_has_no_job_configuration(self):
+        self.assertIsNone(self.runner.parsed_job_configuration(gitlab_project("main"), "main", "sha-1", self.cache))
+
+    @patch("tira_app.tira_model.model")
+    def test_softwares_are_loaded_with_a_single_query(self, model):
+        model.get_docker_software_summaries.return_value = {
+            42: {"display_name": "My Software", "user_image_name": "image:1", "command": "run.sh"}
+        }
+
+        actual = self.runner.extract_job_configuration(gitlab_project("branch-1"), "branch-1")
+
+        model.get_docker_software_summaries.assert_called_once_with({42})
+        self.assertEqual("My Software", actual["software_name"])
+        self.assertEqual("2 CPU Cores", actual["cores"])
+        self.assertEqual("dataset-1", actual["dataset"])
@@ -0,0 +1,78 @@
+import unittest
+
+from tira_app.job_traces import JobTraces, JobTraceTail, printable
+
+TRACE = (
+    b"\x1b[0KRunning with gitlab-runner\n"
+    b'\x1b[32;1m$ eval "${TIRA_COMMAND_TO_EXECUTE}"\x1b[0;m\n'
+    b"epoch 1 \xe2\x9c\x93\nepoch 2\n"
+    b"section_end:1700000000:step_script\nCleaning up\n"
+)
+
+
+class _Response:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ValueError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        return [self.content[i : i + 3] for i in range(0, len(self.content), 3)]
+
+
+class TestJobTraces(unittest.TestCase):
+    def test_printable_removes_escape_sequences_and_unicode(self):
+        self.assertEqual("[0;m a  b", printable("\x1b[0;m a ✓ b".encode("UTF-8")))
+
+    def test_output_of_complete_trace(self):
+        tail = JobTraceTail()
+        tail.append(TRACE)
+
+        self.assertEqual("epoch 1 \nepoch 2", tail.output())
+        self.assertTrue(tail.finished)
+        self.assertEqual(len(TRACE), tail.offset)
+
+    def test_markers_that_are_split_across_chunks_are_detected(self):
+        tail = JobTraceTail()
+        for i in range(len(TRACE)):
+            tail.append(TRACE[i : i + 1])
+            if i == len(TRACE) // 2:
+                self.assertFalse(tail.finished)
+
+        self.assertEqual("epoch 1 \nepoch 2", tail.output())
+
+    def test_output_is_empty_before_the_software_started(self):
+        tail = JobTraceTail()
+        tail.append(TRACE[:40])
+
+        self.assertEqual("", tail.output())
+        self.assertLess(len(tail.text), 60)
+
+    def test_output_is_bounded(self):
+        tail = JobTraceTail(max_size=10)
+        tail.append(TRACE[:-50])
+        tail.append(b"0123456789abcdef")
+
+        self.assertEqual("6789abcdef", tail.output())
+
+    def test_ranges_that_are_ignored_skip_processed_bytes(self):
+        tail = JobTraceTail()
+        tail.append_response(_Response(206, TRACE[:100]))
+        tail.append_response(_Response(200, TRACE))
+        tail.append_response(_Response(416, b""))
+
+        self.assertEqual("epoch 1 \nepoch 2", tail.output())
+        self.assertEqual(len(TRACE), tail.offset)
+
+    def test_tails_of_finished_jobs_are_removed(self):
+        traces = JobTraces()
+        traces.tail("git.example.com", 1, 10).append(TRACE)
+        traces.tail("git.example.com", 2, 20).append(TRACE)
+
+        traces.retain("git.example.com", 1, [11])
+
+        self.assertEqual(0, traces.tail("git.example.com", 1, 10).offset)
+        self.assertEqual(len(TRACE), traces.tail("git.example.com", 2, 20).offset)
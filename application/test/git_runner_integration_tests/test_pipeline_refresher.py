@@ -0,0 +1,102 @@
+import unittest
+
+from utils_for_testing import InMemoryCache
+
+from tira_app.pipeline_refresher import PipelineRefresher, invalidate_running_pipelines
+
+
+class TestPipelineRefresher(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.running = {"repo-1": 1, "repo-2": 0}
+        self.refreshed = []
+        self.cache = InMemoryCache()
+
+    def refresh(self, git_repository_id):
+        self.refreshed.append(git_repository_id)
+        return self.running[git_repository_id]
+
+    def refresher(self):
+        ret = PipelineRefresher(self.refresh, self.cache, 10, 80, clock=lambda: self.now)
+        ret.update_repositories(["repo-1", "repo-2"])
+        ret.step()
+        ret.join()
+        self.refreshed = []
+        return ret
+
+    def test_new_repositories_are_refreshed_immediately(self):
+        refresher = PipelineRefresher(self.refresh, self.cache, 10, 80, clock=lambda: self.now)
+        refresher.update_repositories(["repo-1", "repo-2"])
+        refresher.step()
+        refresher.join()
+
+        self.assertEqual({"repo-1", "repo-2"}, set(self.refreshed))
+
+    def test_idle_repositories_back_off(self):
+        refresher = self.refresher()
+
+        self.now = 10
+        self.assertEqual(["repo-1"], refresher.due_repositories())
+
+        self.now = 20
+        self.assertEqual(["repo-1", "repo-2"], refresher.due_repositories())
+
+    def test_backoff_is_bounded(self):
+        refresher = self.refresher()
+        for _ in range(10):
+            self.now += 100
+            refresher.step()
+            refresher.join()
+
+        self.now += 80
+        self.assertIn("repo-2", refresher.due_repositories())
+
+    def test_invalidated_repositories_are_refreshed_immediately(self):
+        refresher = self.refresher()
+        invalidate_running_pipelines("repo-2", self.cache)
+
+        self.now = 1
+        refresher.step()
+        refresher.join()
+
+        self.assertEqual(["repo-2"], self.refreshed)
+
+        self.now = 2
+        refresher.step()
+        refresher.join()
+        self.assertEqual(["repo-2"], self.refreshed)
+
+    def test_invalidations_during_a_step_are_not_lost(self):
+        refresher = self.refresher()
+        invalidate_running_pipelines("repo-2", self.cache)
+        get_many = self.cache.get_many
+
+        def get_many_with_concurrent_invalidation(keys):
+            ret = get_many(keys)
+            invalidate_running_pipelines("repo-2", self.cache)
+            return ret
+
+        self.cache.get_many = get_many_with_concurrent_invalidation
+        self.now = 1
+        refresher.step()
+        refresher.join()
+        self.cache.get_many = get_many
+
+        self.now = 2
+        refresher.step()
+        refresher.join()
+        self.assertEqual(["repo-2", "repo-2"], self.refreshed)
+
+    def test_failed_refreshes_are_retried(self):
+        refresher = self.refresher()
+        del self.running["repo-1"]
+
+        self.now = 10
+        refresher.step()
+        refresher.join()
+        self.running["repo-1"] = 1
+
+        self.now = 30
+        refresher.step()
+        refresher.join()
+        self.assertEqual(2, self.refreshed.count("repo-1"))
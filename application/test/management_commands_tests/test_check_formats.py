@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, call, patch
+
+from tira_app.management.commands import check_formats
+from tira_app.management.commands.check_formats import detect_valid_formats, output_fingerprint, write_valid_formats
+
+RUN = "".join(f"{q} Q0 doc-{d} {d} {10 - d} tag\n" for q in range(1, 6) for d in range(1, 3))
+
+
+class _Run:
+    objects = Mock()
+
+    def __init__(self, pk, input_dataset_id):
+        self.pk = pk
+        self.input_dataset_id = input_dataset_id
+
+
+class TestCheckFormats(unittest.TestCase):
+    def test_fingerprint_changes_with_the_output(self):
+        with tempfile.TemporaryDirectory() as d:
+            (Path(d) / "run.txt").write_text(RUN)
+            fingerprint = output_fingerprint(Path(d))
+            self.assertEqual(fingerprint, output_fingerprint(Path(d)))
+
+            os.utime(Path(d) / "run.txt", ns=(0, 0))
+            self.assertNotEqual(fingerprint, output_fingerprint(Path(d)))
+
+    def test_valid_formats_are_detected(self):
+        with tempfile.TemporaryDirectory() as d:
+            (Path(d) / "run.txt").write_text(RUN)
+
+            pk, valid_formats, fingerprint = detect_valid_formats(("run-1", d, None))
+
+            self.assertEqual("run-1", pk)
+            self.assertEqual({"run.txt": True}, json.loads(valid_formats))
+            self.assertEqual(output_fingerprint(Path(d)), fingerprint)
+
+    def test_unchanged_outputs_are_skipped(self):
+        with tempfile.TemporaryDirectory() as d:
+            (Path(d) / "run.txt").write_text(RUN)
+
+            actual = detect_valid_formats(("run-1", d, output_fingerprint(Path(d))))
+
+            self.assertEqual(("run-1", None, output_fingerprint(Path(d))), actual)
+
+    @patch("tira_app.tira_model.refresh_leaderboards")
+    def test_leaderboards_of_changed_runs_are_refreshed_per_batch(self, refresh_leaderboards):
+        runs = {i: _Run(i, f"dataset-{i}") for i in range(3)}
+        results = [(0, '{"run.txt": true}', "f-0"), (1, None, "f-1"), (2, "{}", "f-2")]
+
+        with patch.object(check_formats, "BATCH_SIZE", 1):
+            write_valid_formats(runs, results, empty_formats_as_none=True)
+
+        self.assertEqual('{"run.txt": true}', runs[0].valid_formats)
+        self.assertIsNone(runs[2].valid_formats)
+        self.assertEqual("f-2", runs[2].valid_formats_fingerprint)
+        self.assertFalse(hasattr(runs[1], "valid_formats"))
+        self.assertEqual(2, _Run.objects.bulk_update.call_count)
+        self.assertEqual([call(["dataset-0"]), call(["dataset-2"])], refresh_leaderboards.call_args_list)
@@ -268,6 +268,9 @@ IR_MEASURES_COMMAND = custom_settings.get(
 )
 
 GITHUB_TOKEN = custom_settings["github_token"]
+# The secret that webhooks of the git hoster send to trigger a refresh of the cached pipelines of a repository.
+# Webhooks are rejected if no secret is configured.
+GIT_CI_WEBHOOK_TOKEN = custom_settings.get("git_ci_webhook_token")
 
 # Caching
 CACHES = {
@@ -327,6 +330,9 @@ REFERENCE_DATASETS: dict[str, str] = {}
 CODE_SUBMISSION_REPOSITORY_NAMESPACE = "tira-io"
 S3_CONFIG = Path(__file__).parent / "test-s3-config"
 S3_BUCKET = "None"
+S3_DOWNLOAD_MODE = "stream"
+S3_PRESIGNED_URL_EXPIRY = 300
+S3_X_ACCEL_REDIRECT_LOCATION = "/s3-mirrored-resources/"
 
 WELL_KNOWN = {
     "api": custom_settings["tira_rest_api"]["base_url"],
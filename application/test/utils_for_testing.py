@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Any, Iterable, Optional, Union
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.management import call_command
 from django.http import HttpRequest
 from django.http.request import QueryDict
@@ -20,7 +21,7 @@ from rest_framework.test import APIRequestFactory
 from settings_test import TIRA_ROOT
 
 import tira_app.model as modeldb
-from tira_app.authentication import TrustedHeaderAuthentication
+from tira_app.authentication import TrustedHeaderAuthentication, clear_vm_exists_cache
 from tira_app.tira_model import model as tira_model
 
 auth_backend = TrustedHeaderAuthentication()  # There must be a way to get this from rest_framework right?
@@ -39,6 +40,8 @@ def set_up_tira_filesystem():
     shutil.rmtree(Path(TIRA_ROOT), ignore_errors=True)
 
     call_command("flush", interactive=False)
+    cache.clear()
+    clear_vm_exists_cache()
 
     (Path(TIRA_ROOT) / "model" / "virtual-machines").mkdir(parents=True, exist_ok=True)
     (Path(TIRA_ROOT) / "model" / "virtual-machine-hosts").mkdir(parents=True, exist_ok=True)
@@ -438,3 +441,23 @@ def assert_all_url_patterns_are_tested(tested_url_patterns: "Iterable[str]"):
     assert len(untested) == 0, f"{len(untested)} patterns are untested: {untested}; tested: {tested_url_patterns}"
     assert len(untested) == 0, f"{len(untested)} patterns are untested: {untested}; tested: {tested_url_patterns}"
     assert len(untested) == 0, f"{len(untested)} patterns are untested: {untested}; tested: {tested_url_patterns}"
+
+
+class InMemoryCache:
+    """A minimal stand-in for the django cache whose entries can be inspected by tests."""
+
+    def __init__(self) -> None:
+        self.entries: "dict[str, Any]" = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.entries.get(key, default)
+
+    def set(self, key: str, value: Any, timeout: "Optional[int]" = None) -> None:
+        self.entries[key] = value
+
+    def get_many(self, keys: "Iterable[str]") -> "dict[str, Any]":
+        return {k: self.entries[k] for k in keys if k in self.entries}
+
+    def delete_many(self, keys: "Iterable[str]") -> None:
+        for k in keys:
+            self.entries.pop(k, None)
@@ -1,15 +1,17 @@
 import tempfile
 import unittest
 from pathlib import Path
-from typing import List
+from types import SimpleNamespace
+from typing import List, Optional
+from unittest.mock import patch
 
+from tira.evaluators import _cached_columns_if_valid, clear_truth_cache
 from tira.evaluators import evaluate as _eval
 
 
 def persist_run_to_file(directory: Path):
     directory.mkdir(parents=True, exist_ok=True)
-    (directory / "run.txt").write_text(
-        """1 Q0 doc-1 1 10 tag
+    (directory / "run.txt").write_text("""1 Q0 doc-1 1 10 tag
 1 Q0 doc-2 2 9 tag
 3 Q0 doc-3 1 1 tag
 5 Q0 doc-1 1 10 tag
@@ -18,14 +20,12 @@ def persist_run_to_file(directory: Path):
 5 Q0 doc-4 4 7 tag
 5 Q0 doc-5 6 6 tag
 5 Q0 doc-6 7 5 tag
-5 Q0 doc-7 8 4 tag"""
-    )
+5 Q0 doc-7 8 4 tag""")
 
 
 def persist_qrels_to_file(directory: Path):
     directory.mkdir(parents=True, exist_ok=True)
-    (directory / "qrels.txt").write_text(
-        """1 0 doc-1 0
+    (directory / "qrels.txt").write_text("""1 0 doc-1 0
 1 0 doc-2 1
 1 0 doc-3 2
 3 0 doc-5 1
@@ -34,14 +34,12 @@ def persist_qrels_to_file(directory: Path):
 5 0 doc-4 0
 5 0 doc-5 0
 5 0 doc-6 0
-5 0 doc-7 0"""
-    )
+5 0 doc-7 0""")
 
 
 def persist_zero_qrels_to_file(directory: Path):
     directory.mkdir(parents=True, exist_ok=True)
-    (directory / "qrels.txt").write_text(
-        """1 0 doc-1 0
+    (directory / "qrels.txt").write_text("""1 0 doc-1 0
 1 0 doc-2 0
 1 0 doc-3 0
 3 0 doc-5 0
@@ -50,11 +48,10 @@ def persist_zero_qrels_to_file(directory: Path):
 5 0 doc-4 0
 5 0 doc-5 0
 5 0 doc-6 0
-5 0 doc-7 0"""
-    )
+5 0 doc-7 0""")
 
 
-def evaluate(run: Path, truths: Path, lags: List[str]):
+def evaluate(run: Path, truths: Path, lags: List[str], workers: Optional[int] = None):
     return _eval(
         run,
         truths,
@@ -64,6 +61,7 @@ def evaluate(run: Path, truths: Path, lags: List[str]):
             "truth_format": "LongEvalLags",
             "truth_format_configuration": {"lags": lags, "format": "qrels.txt"},
             "measures": ["nDCG@10", "RR", "P@10"],
+            "workers": workers,
         },
     )
 
@@ -130,3 +128,41 @@ class TestIrLongEvalFormat(unittest.TestCase):
             self.assertEqual(expected.keys(), actual.keys())
             for k, v in expected.items():
                 self.assertAlmostEqual(v, actual[k], delta=0.0001)
+
+    def test_parallel_and_sequential_evaluation_of_long_eval_lags_is_identical(self):
+        lags = ["some-lag", "lag-1", "lag-3"]
+        with tempfile.TemporaryDirectory() as d:
+            for lag in lags:
+                persist_run_to_file(Path(d) / "preds" / lag)
+                persist_qrels_to_file(Path(d) / "truths" / lag)
+
+            sequential = evaluate(Path(d) / "preds", Path(d) / "truths", lags, workers=1)
+            parallel = evaluate(Path(d) / "preds", Path(d) / "truths", lags, workers=3)
+
+        self.assertEqual(sequential, parallel)
+        self.assertEqual(lags, list(parallel.keys()))
+
+    def test_daemonic_processes_evaluate_long_eval_lags_in_threads(self):
+        lags = ["some-lag", "lag-1", "lag-3"]
+        with tempfile.TemporaryDirectory() as d:
+            for lag in lags:
+                persist_run_to_file(Path(d) / "preds" / lag)
+                persist_qrels_to_file(Path(d) / "truths" / lag)
+
+            sequential = evaluate(Path(d) / "preds", Path(d) / "truths", lags, workers=1)
+            with patch("multiprocessing.current_process", return_value=SimpleNamespace(daemon=True)), patch(
+                "tira.evaluators.ProcessPoolExecutor", side_effect=AssertionError("daemonic processes can not fork")
+            ):
+                threaded = evaluate(Path(d) / "preds", Path(d) / "truths", lags, workers=3)
+
+        self.assertEqual(sequential, threaded)
+
+    def test_cached_truths_are_released(self):
+        with tempfile.TemporaryDirectory() as d:
+            persist_run_to_file(Path(d) / "preds" / "lag-1")
+            persist_qrels_to_file(Path(d) / "truths" / "lag-1")
+            evaluate(Path(d) / "preds", Path(d) / "truths", ["lag-1"], workers=1)
+
+        self.assertGreater(_cached_columns_if_valid.cache_info().currsize, 0)
+        clear_truth_cache()
+        self.assertEqual(0, _cached_columns_if_valid.cache_info().currsize)
@@ -0,0 +1,113 @@
+import unittest
+
+import pandas as pd
+from trectools import TrecEval, TrecQrel, TrecRun
+
+from tests.format_check import VALID_QREL_PATH, VALID_RUN_OUTPUT, VALID_RUN_WITH_METADATA_OUTPUT
+from tira.check_format import lines_if_valid
+from tira.evaluators import IrMeasuresEvaluator, evaluate, evaluator_of_measure, get_evaluators_if_valid
+
+# The documents of each query are not sorted by score and some documents have the same score.
+UNSORTED_RUN = [
+    {"qid": str(q), "docno": f"d{d}", "score": float((d * 7 + q) % 5)} for q in range(1, 4) for d in range(30)
+]
+QRELS = [{"qid": str(q), "docno": f"d{d}", "rel": (d + q) % 3} for q in range(1, 4) for d in range(0, 40, 2)]
+
+
+def evaluate_with_trectools(run_data, measures):
+    run, qrels = TrecRun(), TrecQrel()
+    run.run_data = pd.DataFrame(run_data).rename(columns={"qid": "query", "docno": "docid"})
+    qrels.qrels_data = pd.DataFrame(QRELS).rename(columns={"qid": "query", "docno": "docid"})
+    te = TrecEval(run, qrels)
+
+    ret = {"RR": te.get_reciprocal_rank()}
+    for depth in [5, 10, 20]:
+        ret[f"nDCG@{depth}"] = te.get_ndcg(depth=depth)
+        ret[f"P@{depth}"] = te.get_precision(depth=depth)
+
+    return {k: ret[k] for k in measures}
+
+
+def evaluate_valid_run(measures, run=VALID_RUN_OUTPUT, engine="IrMeasures"):
+    config = {"run_format": "run.txt", "truth_format": "qrels.txt", "measures": measures, "measure_engine": engine}
+    return evaluate(run, VALID_QREL_PATH, config)
+
+
+class TestIrMeasuresEvaluator(unittest.TestCase):
+    def test_measures_are_compatible_with_trectools(self):
+        expected = {"nDCG@10": 0.290247, "RR": 0.33333333, "P@10": 0.066666666666}
+        actual = evaluate_valid_run(["nDCG@10", "RR", "P@10"])
+
+        self.assertEqual(expected.keys(), actual.keys())
+        for k, v in expected.items():
+            self.assertAlmostEqual(v, actual[k], delta=0.0001)
+
+    def test_measures_with_arbitrary_cutoffs(self):
+        expected = {"nDCG@15": 0.290247, "P@2": 0.33333333, "R@5": 0.5, "R@1000": 0.5, "MAP": 0.25}
+        actual = evaluate_valid_run(["nDCG@15", "P@2", "R@5", "R@1000", "MAP"])
+
+        self.assertEqual(expected.keys(), actual.keys())
+        for k, v in expected.items():
+            self.assertAlmostEqual(v, actual[k], delta=0.0001)
+
+    def test_measures_per_query(self):
+        config = {
+            "run_format": "run.txt",
+            "truth_format": "qrels.txt",
+            "measures": ["nDCG@10", "RR"],
+            "measure_engine": "IrMeasures",
+        }
+        evaluator = get_evaluators_if_valid(config)[0]
+        self.assertIsInstance(evaluator, IrMeasuresEvaluator)
+
+        run = lines_if_valid(VALID_RUN_OUTPUT, "run.txt")
+        qrels = lines_if_valid(VALID_QREL_PATH, "qrels.txt")
+        actual = evaluator.per_query(run, qrels)
+
+        self.assertEqual(["1", "3", "5"], sorted(actual.index))
+        self.assertAlmostEqual(0.239812, actual.loc["1", "nDCG@10"], delta=0.0001)
+        self.assertAlmostEqual(0.0, actual.loc["3", "nDCG@10"], delta=0.0001)
+        self.assertAlmostEqual(0.630930, actual.loc["5", "nDCG@10"], delta=0.0001)
+        self.assertAlmostEqual(0.5, actual.loc["5", "RR"], delta=0.0001)
+
+    def test_evaluator_of_measure(self):
+        self.assertEqual("TrecTools", evaluator_of_measure("nDCG@10"))
+        self.assertEqual("IrMeasures", evaluator_of_measure("nDCG@10", "IrMeasures"))
+        self.assertEqual("IrMeasures", evaluator_of_measure("nDCG@7"))
+        self.assertEqual("RunFileEvaluator", evaluator_of_measure("NumQueries", "IrMeasures"))
+
+        with self.assertRaises(ValueError):
+            evaluator_of_measure("nDCG@0")
+
+        with self.assertRaises(ValueError):
+            evaluator_of_measure("nDCG@10", "trec_eval")
+
+    def test_engines_are_equal_on_resource_runs(self):
+        measures = ["nDCG@10", "RR", "P@10"]
+        for run in [VALID_RUN_OUTPUT, VALID_RUN_WITH_METADATA_OUTPUT]:
+            expected = evaluate_valid_run(measures, run, "TrecTools")
+            actual = evaluate_valid_run(measures, run, "IrMeasures")
+
+            self.assertEqual(expected.keys(), actual.keys())
+            for k, v in expected.items():
+                self.assertAlmostEqual(v, actual[k], delta=0.000001, msg=f"{k} on {run}")
+
+    def assert_same_as_trectools(self, run_data):
+        measures = ["nDCG@5", "nDCG@10", "nDCG@20", "P@5", "P@10", "P@20", "RR"]
+        evaluator = IrMeasuresEvaluator("run.txt", None, "qrels.txt", None, measures)
+        expected = evaluate_with_trectools(run_data, measures)
+
+        actual = evaluator._eval(pd.DataFrame(run_data), pd.DataFrame(QRELS))
+
+        self.assertEqual(expected.keys(), actual.keys())
+        for k, v in expected.items():
+            self.assertAlmostEqual(v, actual[k], delta=0.000001, msg=k)
+
+    def test_unsorted_run_is_evaluated_like_trectools(self):
+        self.assert_same_as_trectools(UNSORTED_RUN)
+
+    def test_run_with_tied_scores_is_evaluated_like_trectools(self):
+        run_data = sorted(UNSORTED_RUN, key=lambda i: (i["qid"], -i["score"]))
+        self.assertGreater(len(run_data), len({(i["qid"], i["score"]) for i in run_data}))
+
+        self.assert_same_as_trectools(run_data)
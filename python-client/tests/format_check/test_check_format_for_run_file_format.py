@@ -1,6 +1,6 @@
 import unittest
 
-from tira.check_format import check_format, lines_if_valid
+from tira.check_format import check_format, check_format_and_load, lines_if_valid
 
 from . import (
     _ERROR,
@@ -59,3 +59,16 @@ class TestCheckFormatForNonExistingFormats(unittest.TestCase):
         ]
         actual = check_format(RUN_OUTPUT_WITH_TOO_FEW_COLUMNS, "run.txt")
         self.assertEqual(expected, actual)
+
+    def test_check_format_and_load_on_valid_run_output(self):
+        level, msg, lines = check_format_and_load(VALID_RUN_OUTPUT, "run.txt")
+        self.assertEqual(_OK, level)
+        self.assertEqual("The run.txt file has the correct format.", msg)
+        self.assertEqual(10, len(lines))
+        self.assertEqual(lines, lines_if_valid(VALID_RUN_OUTPUT, "run.txt"))
+
+    def test_check_format_and_load_on_invalid_run_with_duplicate_documents(self):
+        level, msg, lines = check_format_and_load(RUN_OUTPUT_WITH_DUPLICATE_DOCUMENTS, "run.txt")
+        self.assertEqual(_ERROR, level)
+        self.assertIn("duplicate documents", msg)
+        self.assertIsNone(lines)
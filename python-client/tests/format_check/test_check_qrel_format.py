@@ -1,6 +1,6 @@
 import unittest
 
-from tira.check_format import check_format
+from tira.check_format import check_format, lines_if_valid
 
 from . import (
     _ERROR,
@@ -26,3 +26,9 @@ class TestCheckJsonlForNonExistingFormats(unittest.TestCase):
         expected = [_OK, "The qrels are valid."]
         actual = check_format(VALID_QREL_PATH, "qrels.txt")
         self.assertEqual(expected, actual)
+
+    def test_lines_of_valid_qrel_file(self):
+        actual = lines_if_valid(VALID_QREL_PATH, "qrels.txt")
+        self.assertEqual(10, len(actual))
+        self.assertEqual({"qid", "q0", "docno", "rel"}, set(actual[0].keys()))
+        self.assertTrue(all(isinstance(i["rel"], int) for i in actual))
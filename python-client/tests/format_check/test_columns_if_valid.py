@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from tira.check_format import check_format_and_load_columns, columns_if_valid, lines_if_valid
+
+from . import (
+    _ERROR,
+    RUN_OUTPUT_WITH_DUPLICATE_DOCUMENTS,
+    RUN_OUTPUT_WITH_TOO_FEW_COLUMNS,
+    RUN_OUTPUT_WITH_TOO_FEW_QUERIES,
+    VALID_QREL_PATH,
+    VALID_RUN_OUTPUT,
+)
+
+
+class TestColumnsIfValid(unittest.TestCase):
+    def test_columns_of_valid_run_output(self):
+        actual = columns_if_valid(VALID_RUN_OUTPUT, "run.txt")
+
+        self.assertIsInstance(actual, pd.DataFrame)
+        self.assertEqual(["qid", "q0", "docno", "rank", "score", "system"], list(actual.columns))
+        self.assertEqual(lines_if_valid(VALID_RUN_OUTPUT, "run.txt"), actual.to_dict("records"))
+
+    def test_columns_of_valid_qrels(self):
+        actual = columns_if_valid(VALID_QREL_PATH, "qrels.txt")
+
+        self.assertEqual(["qid", "q0", "docno", "rel"], list(actual.columns))
+        self.assertEqual(lines_if_valid(VALID_QREL_PATH, "qrels.txt"), actual.to_dict("records"))
+
+    def test_columns_of_run_with_too_few_queries(self):
+        expected = [_ERROR, "The run file has only 1 queries which is likely an error.", None]
+        actual = check_format_and_load_columns(RUN_OUTPUT_WITH_TOO_FEW_QUERIES, "run.txt")
+        self.assertEqual(expected, list(actual))
+
+    def test_columns_of_run_with_duplicate_documents(self):
+        level, msg, columns = check_format_and_load_columns(RUN_OUTPUT_WITH_DUPLICATE_DOCUMENTS, "run.txt")
+        self.assertEqual(_ERROR, level)
+        self.assertEqual(
+            'The run file has duplicate documents: the document with id "doc-1" appears multiple times for query "5".',
+            msg,
+        )
+        self.assertIsNone(columns)
+
+    def test_columns_report_the_line_of_an_invalid_run(self):
+        expected = (
+            'Invalid line in the run file, expected 6 columns, but found a line "5 doc-1 10 tag" with 4 columns. '
+            + "(line 4 of run.txt)"
+        )
+        with self.assertRaises(ValueError) as e:
+            columns_if_valid(RUN_OUTPUT_WITH_TOO_FEW_COLUMNS, "run.txt")
+        self.assertEqual(expected, str(e.exception))
+
+    def test_columns_reject_blank_lines_as_the_line_check(self):
+        with tempfile.TemporaryDirectory() as d:
+            lines = (Path(VALID_RUN_OUTPUT) / "run.txt").read_text().splitlines()
+            (Path(d) / "run.txt").write_text("\n".join(lines[:2] + [""] + lines[2:]) + "\n")
+
+            with self.assertRaises(ValueError) as expected:
+                lines_if_valid(Path(d), "run.txt")
+            with self.assertRaises(ValueError) as actual:
+                columns_if_valid(Path(d), "run.txt")
+
+        self.assertIn(str(expected.exception), str(actual.exception))
+        self.assertIn("(line 3 of run.txt)", str(actual.exception))
+
+    def test_columns_are_not_supported_for_jsonl(self):
+        with self.assertRaises(ValueError):
+            check_format_and_load_columns(VALID_RUN_OUTPUT, "*.jsonl")
@@ -0,0 +1,82 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tira.inference_server import _MicroBatcher, _Stats
+
+
+class TestInferenceServer(unittest.TestCase):
+    def test_single_request_is_predicted(self):
+        batcher = _MicroBatcher(lambda inputs: [i * 2 for i in inputs], max_batch_size=8, max_wait=0.001)
+
+        self.assertEqual([2, 4], batcher.submit([1, 2]).result(timeout=5))
+
+    def test_concurrent_requests_are_coalesced_into_one_batch(self):
+        batch_sizes = []
+        release = threading.Event()
+
+        def predict(inputs):
+            release.wait(timeout=5)
+            batch_sizes.append(len(inputs))
+            return [i * 2 for i in inputs]
+
+        stats = _Stats()
+        batcher = _MicroBatcher(predict, max_batch_size=100, max_wait=0.5, stats=stats)
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = [batcher.submit([i, i + 1]) for i in range(10)]
+            release.set()
+            actual = list(pool.map(lambda f: f.result(timeout=5), futures))
+
+        self.assertEqual([[i * 2, (i + 1) * 2] for i in range(10)], actual)
+        self.assertLess(len(batch_sizes), 10)
+        self.assertEqual(20, sum(batch_sizes))
+        self.assertAlmostEqual(20, stats.to_dict()["mean_batch_size"] * stats.to_dict()["batches"])
+
+    def test_batches_respect_the_maximum_batch_size(self):
+        batch_sizes = []
+
+        def predict(inputs):
+            batch_sizes.append(len(inputs))
+            return inputs
+
+        batcher = _MicroBatcher(predict, max_batch_size=4, max_wait=0.2)
+        futures = [batcher.submit([i]) for i in range(8)]
+
+        self.assertEqual([[i] for i in range(8)], [f.result(timeout=5) for f in futures])
+        self.assertTrue(all(i <= 4 for i in batch_sizes))
+
+    def test_failing_predict_yields_no_result(self):
+        def predict(inputs):
+            raise RuntimeError("failure")
+
+        batcher = _MicroBatcher(predict, max_batch_size=8, max_wait=0.001)
+
+        self.assertIsNone(batcher.submit([1]).result(timeout=5))
+
+    def test_stats_of_requests(self):
+        stats = _Stats()
+        stats.add_request(2, 0.1, False)
+        stats.add_request(1, 0.3, True)
+
+        actual = stats.to_dict()
+
+        self.assertEqual(2, actual["requests"])
+        self.assertEqual(3, actual["inputs"])
+        self.assertEqual(1, actual["errors"])
+        self.assertAlmostEqual(200, actual["mean_latency_ms"])
+        self.assertAlmostEqual(300, actual["max_latency_ms"])
+
+    def test_failing_input_only_fails_its_own_request(self):
+        release = threading.Event()
+
+        def predict(inputs):
+            release.wait(timeout=5)
+            if "fail" in inputs:
+                raise RuntimeError("failure")
+            return [i * 2 for i in inputs]
+
+        batcher = _MicroBatcher(predict, max_batch_size=100, max_wait=0.5)
+        futures = [batcher.submit([1]), batcher.submit(["fail"]), batcher.submit([2, 3])]
+        release.set()
+
+        self.assertEqual([[2], None, [4, 6]], [f.result(timeout=5) for f in futures])
@@ -0,0 +1,127 @@
+import shutil
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from tira.io_utils import _md5_of_file
+from tira.rest_api_client import Client, _RateLimit
+from tira.third_party_integrations import temporary_directory
+
+
+class TestRestApiSession(unittest.TestCase):
+    def client(self, **kwargs) -> Client:
+        tmp_dir = temporary_directory()
+        src_dir = Path(__file__).parent / "resources" / "tira-cache-without-production-system"
+        shutil.copy(src_dir / ".tira-settings.json", tmp_dir)
+
+        return Client(tira_cache_dir=Path(tmp_dir), api_key="no-api-key", api_user_name="no-api-key-user", **kwargs)
+
+    def test_requests_are_issued_over_the_pooled_session(self):
+        tira = self.client()
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {"status": 0}
+
+        with patch.object(tira.session, "get", return_value=response) as get:
+            self.assertEqual({"status": 0}, tira.json_response("/api/endpoint-01"))
+            self.assertEqual({"status": 0}, tira.json_response("/api/endpoint-02"))
+
+        self.assertEqual(2, get.call_count)
+
+    def test_json_responses_preserve_the_order_of_the_endpoints(self):
+        tira = self.client()
+
+        with patch.object(tira, "json_response", side_effect=lambda endpoint: {"endpoint": endpoint}):
+            actual = tira.json_responses([f"/api/endpoint-{i}" for i in range(20)], max_workers=4)
+
+        self.assertEqual([{"endpoint": f"/api/endpoint-{i}"} for i in range(20)], actual)
+
+    def test_json_responses_are_rate_limited(self):
+        tira = self.client()
+
+        with patch.object(tira, "json_response", side_effect=lambda endpoint: {"endpoint": endpoint}):
+            start = time.monotonic()
+            tira.json_responses([f"/api/endpoint-{i}" for i in range(5)], max_workers=5, rate_limit=_RateLimit(20))
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_partially_exported_runs_are_downloaded_again(self):
+        output = Path(temporary_directory())
+        run_output = output / "raw-outputs" / "dataset" / "run" / "output"
+        run_output.mkdir(parents=True)
+        (run_output / "run.txt").write_text("run")
+        (run_output / "metadata.json").write_text("{}")
+        run = {"raw-outputs-from-tira": "raw-outputs/dataset/run"}
+        run["md5sums"] = {i.name: _md5_of_file(i) for i in run_output.iterdir()}
+
+        self.assertTrue(Client._Client__run_was_exported(output, run))
+        (run_output / "metadata.json").unlink()
+        self.assertFalse(Client._Client__run_was_exported(output, run))
+        self.assertFalse(Client._Client__run_was_exported(output, {"raw-outputs-from-tira": "raw-outputs/dataset/run"}))
+
+    def test_backoff_delay_grows_exponentially_until_the_maximum_delay(self):
+        tira = self.client(failsave_max_delay=15)
+
+        for attempt, expected in [(0, 1), (1, 2), (2, 4), (3, 8), (4, 15), (10, 15)]:
+            actual = tira.backoff_delay(attempt)
+            self.assertGreaterEqual(actual, expected / 2)
+            self.assertLessEqual(actual, expected)
+
+    def test_json_responses_are_cached(self):
+        tira = self.client()
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {"status": 0}
+
+        with patch.object(tira.session, "get", return_value=response) as get:
+            tira.json_response("/api/endpoint")
+            self.assertEqual({"status": 0}, tira.json_response("/api/endpoint"))
+
+        self.assertEqual(1, get.call_count)
+
+    def test_expired_json_responses_are_revalidated(self):
+        tira = self.client(json_cache_ttl=0)
+        response = Mock(status_code=200, headers={"ETag": '"v1"'})
+        response.json.return_value = {"status": 0}
+        not_modified = Mock(status_code=304, headers={})
+
+        with patch.object(tira.session, "get", side_effect=[response, not_modified]) as get:
+            tira.json_response("/api/endpoint")
+            self.assertEqual({"status": 0}, tira.json_response("/api/endpoint"))
+
+        self.assertEqual('"v1"', get.call_args.kwargs["headers"]["If-None-Match"])
+
+    def test_cached_json_responses_are_not_served_to_other_credentials(self):
+        tira = self.client()
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {"status": 0}
+
+        with patch.object(tira.session, "get", return_value=response) as get:
+            tira.json_response("/api/role")
+            tira.api_key = "other-api-key"
+            tira.json_response("/api/role")
+
+        self.assertEqual(2, get.call_count)
+
+    def test_expired_archived_json_responses_are_loaded_again(self):
+        tira = self.client(json_cache_ttl=0)
+        archived = Path(tira.tira_cache_dir) / ".archived" / "api" / "endpoint"
+        archived.parent.mkdir(parents=True)
+        archived.write_text('{"version": 1}')
+
+        self.assertEqual({"version": 1}, tira.archived_json_response("/api/endpoint"))
+        archived.write_text('{"version": 2}')
+        self.assertEqual({"version": 2}, tira.archived_json_response("/api/endpoint"))
+
+    def test_upload_in_parts_closes_the_uploaded_file(self):
+        tira = self.client()
+        file_path = Path(temporary_directory()) / "upload.zip"
+        file_path.write_bytes(b"0123456789")
+        response = Mock(status_code=200)
+        response.json.return_value = {"parts": {}}
+        file = Mock(wraps=file_path.open("rb"))
+
+        with patch.object(tira.session, "request", return_value=response) as request:
+            tira.upload_in_parts(file_path, "https://tira.io/parts", {}, part_size=4, file=file)
+
+        self.assertEqual(5, request.call_count)
+        file.close.assert_called_once()
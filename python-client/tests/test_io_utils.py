@@ -7,11 +7,14 @@ import zipfile
 from contextlib import redirect_stdout
 from pathlib import Path
 from subprocess import CalledProcessError
+from typing import Optional
 from unittest.mock import Mock, patch
 
 from tira.check_format import _fmt
 from tira.io_utils import (
     TeeStringIO,
+    _download_file_with_md5,
+    _link_or_copy,
     _md5_of_file,
     resolve_mirrored_resources,
     sanitize_text,
@@ -24,6 +27,7 @@ from .format_check import IR_METADATA_MULTIPLE_VALID
 RESOURCE_LOADING_FROM_WEBIS = Path(__file__).parent / "resources" / "resource-loading-from-webis"
 TRUTHS_ZIP_URL = "https://files.webis.de/data-in-progress/data-research/web-search/reneuir-25/truths.zip"
 TRUTHS_ZIP_MD5 = "f28e36759760c9520e7831aba86c4d23"
+DOWNLOAD_MD5 = "781e5e245d69b566979b86e28d23f2c7"
 
 
 class TestIoUtils(unittest.TestCase):
@@ -242,6 +246,121 @@ scores"""
 
             download_file.assert_not_called()
 
+    def test_download_file_with_md5_streams_to_the_target_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_file = Path(tmp_dir) / "truths.zip"
+
+            with patch("tira.io_utils.requests.get", return_value=self._response(200, b"0123456789")) as get:
+                _download_file_with_md5("https://example.com/truths.zip", target_file, DOWNLOAD_MD5)
+
+            self.assertNotIn("Range", get.call_args.kwargs["headers"])
+            self.assertEqual(b"0123456789", target_file.read_bytes())
+            self.assertFalse((Path(tmp_dir) / "truths.zip.part").exists())
+
+    def test_download_file_with_md5_resumes_an_interrupted_download(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_file = Path(tmp_dir) / "truths.zip"
+            (Path(tmp_dir) / "truths.zip.part").write_bytes(b"0123")
+            response = self._response(206, b"456789", {"content-range": "bytes 4-9/10"})
+
+            with patch("tira.io_utils.requests.get", return_value=response) as get:
+                _download_file_with_md5("https://example.com/truths.zip", target_file, DOWNLOAD_MD5)
+
+            self.assertEqual("bytes=4-", get.call_args.kwargs["headers"]["Range"])
+            self.assertEqual(b"0123456789", target_file.read_bytes())
+
+    def test_download_file_with_md5_finishes_an_already_complete_download(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_file = Path(tmp_dir) / "truths.zip"
+            (Path(tmp_dir) / "truths.zip.part").write_bytes(b"0123456789")
+            response = self._response(416, b"", {"content-range": "bytes */10"})
+
+            with patch("tira.io_utils.requests.get", return_value=response):
+                _download_file_with_md5("https://example.com/truths.zip", target_file, DOWNLOAD_MD5)
+
+            self.assertEqual(b"0123456789", target_file.read_bytes())
+            self.assertFalse((Path(tmp_dir) / "truths.zip.part").exists())
+
+    def test_download_file_with_md5_removes_a_partial_file_that_can_not_be_resumed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_file = Path(tmp_dir) / "truths.zip"
+            (Path(tmp_dir) / "truths.zip.part").write_bytes(b"0123456789-too-long")
+            response = self._response(416, b"", {"content-range": "bytes */10"})
+
+            with patch("tira.io_utils.requests.get", return_value=response):
+                with self.assertRaises(ValueError):
+                    _download_file_with_md5("https://example.com/truths.zip", target_file, DOWNLOAD_MD5)
+
+            self.assertFalse((Path(tmp_dir) / "truths.zip.part").exists())
+            self.assertFalse(target_file.exists())
+
+    def test_download_file_with_md5_restarts_if_the_server_ignores_the_range(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_file = Path(tmp_dir) / "truths.zip"
+            (Path(tmp_dir) / "truths.zip.part").write_bytes(b"corrupted")
+
+            with patch("tira.io_utils.requests.get", return_value=self._response(200, b"0123456789")):
+                _download_file_with_md5("https://example.com/truths.zip", target_file, DOWNLOAD_MD5)
+
+            self.assertEqual(b"0123456789", target_file.read_bytes())
+
+    def test_download_file_with_md5_discards_a_download_with_unexpected_md5(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target_file = Path(tmp_dir) / "truths.zip"
+
+            with patch("tira.io_utils.requests.get", return_value=self._response(200, b"unexpected")):
+                with self.assertRaises(ValueError) as exc:
+                    _download_file_with_md5("https://example.com/truths.zip", target_file, DOWNLOAD_MD5)
+
+            self.assertIn("MD5 is unexpected", str(exc.exception))
+            self.assertFalse(target_file.exists())
+            self.assertFalse((Path(tmp_dir) / "truths.zip.part").exists())
+
+    def test_link_or_copy_hard_links_the_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src, dst = Path(tmp_dir) / "src.txt", Path(tmp_dir) / "dst.txt"
+            src.write_text("content")
+
+            _link_or_copy(src, dst)
+
+            self.assertEqual("content", dst.read_text())
+            self.assertTrue(src.samefile(dst))
+
+    def test_link_or_copy_falls_back_to_a_copy(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src, dst = Path(tmp_dir) / "src.txt", Path(tmp_dir) / "dst.txt"
+            src.write_text("content")
+
+            with patch("tira.io_utils.os.link", side_effect=OSError("Invalid cross-device link")):
+                _link_or_copy(src, dst)
+
+            self.assertEqual("content", dst.read_text())
+            self.assertFalse(src.samefile(dst))
+
+    def test_zip_dir_with_multiple_workers_is_a_valid_zip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run_dir = Path(tmp_dir) / "run"
+            (run_dir / "sub").mkdir(parents=True)
+            run = "".join(f"{q} Q0 doc-{d} {d} 1.0 tag\n" for q in range(100) for d in range(1000))
+            (run_dir / "run.txt").write_text(run)
+            (run_dir / "sub" / "small.txt").write_text("small")
+
+            with patch("tira.io_utils.ZIP_BLOCK_SIZE", 64 * 1024):
+                sequential = zipfile.ZipFile(zip_dir(run_dir))
+                concurrent = zipfile.ZipFile(zip_dir(run_dir, workers=4))
+
+            self.assertIsNone(concurrent.testzip())
+            self.assertEqual(sorted(sequential.namelist()), sorted(concurrent.namelist()))
+            self.assertEqual(run, concurrent.read("run.txt").decode())
+            self.assertEqual("small", concurrent.read("sub/small.txt").decode())
+            expected_size = sequential.getinfo("run.txt").compress_size
+            self.assertLess(concurrent.getinfo("run.txt").compress_size, 1.1 * expected_size)
+
+    def _response(self, status_code: int, content: bytes, headers: "Optional[dict]" = None) -> Mock:
+        ret = Mock(status_code=status_code, headers={"content-length": str(len(content)), **(headers or {})})
+        ret.iter_content.return_value = [content[:3], content[3:]]
+        return ret
+
     def _copy_resource_directory(self, tmp_dir: str) -> Path:
         target_dir = Path(tmp_dir) / "resource-loading-from-webis"
         shutil.copytree(RESOURCE_LOADING_FROM_WEBIS, target_dir)
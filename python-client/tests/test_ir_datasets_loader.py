@@ -1,11 +1,15 @@
+import gzip
 import os
 import unittest
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import NamedTuple
+from unittest.mock import patch
 
 import pandas as pd
 
-from tira.ir_datasets_loader import get_as_re_rank_input
+from tira import ir_datasets_loader
+from tira.ir_datasets_loader import IrDatasetsLoader, get_as_re_rank_input
 
 EXAMPLE_RANKING_01 = """
 1 Q0 12 1 10 tag
@@ -16,7 +20,60 @@ EXAMPLE_RANKING_01 = """
 """
 
 
+class ExampleDoc(NamedTuple):
+    doc_id: str
+    text: str
+
+    def default_text(self):
+        return self.text
+
+
+class ExampleDataset:
+    def docs_iter(self):
+        for i in range(25):
+            yield ExampleDoc(f"doc-{i}", f"text {i}")
+        yield ExampleDoc("doc-3", "duplicate")
+
+
 class TestIrDatasetsLoader(unittest.TestCase):
+    def write_docs(self, file_name: str, workers: int) -> str:
+        with TemporaryDirectory() as tmp_dir, patch.object(ir_datasets_loader, "DOCS_BATCH_SIZE", 4):
+            path = Path(tmp_dir) / file_name
+            IrDatasetsLoader().write_docs(ExampleDataset(), path, True, True, None, workers)
+
+            return gzip.decompress(path.read_bytes()).decode() if file_name.endswith(".gz") else path.read_text()
+
+    def test_documents_written_in_parallel_are_identical(self):
+        expected = self.write_docs("documents.jsonl", workers=1)
+
+        self.assertEqual(25, len(expected.splitlines()))
+        self.assertNotIn("duplicate", expected)
+        self.assertEqual(expected, self.write_docs("documents.jsonl", workers=3))
+        self.assertEqual(expected, self.write_docs("documents.jsonl.gz", workers=1))
+        self.assertEqual(expected, self.write_docs("documents.jsonl.gz", workers=3))
+
+    def test_run_file_is_loaded_with_numeric_qids(self):
+        with TemporaryDirectory() as tmp_dir:
+            (Path(tmp_dir) / "run.txt").write_text("10 Q0 d1 1 1 tag\n9 Q0 d2 1 2 tag\n10 Q0 d3 2 3 tag\n")
+
+            for run_file in [Path(tmp_dir), Path(tmp_dir) / "run.txt"]:
+                actual = IrDatasetsLoader().load_run_file(run_file)
+
+                self.assertEqual([9, 10, 10], [i["qid"] for i in actual])
+                self.assertEqual(["d2", "d3", "d1"], [i["docno"] for i in actual])
+                self.assertEqual([1, 1, 2], [i["rank"] for i in actual])
+
+    def test_run_file_with_other_name_is_loaded(self):
+        with TemporaryDirectory() as tmp_dir:
+            (Path(tmp_dir) / "run.txt").write_text("1 Q0 other 1 1 tag\n")
+            (Path(tmp_dir) / "bm25-run.txt").write_text("q-1 Q0 d1 1 1 bm25\n")
+
+            actual = IrDatasetsLoader().load_run_file(Path(tmp_dir) / "bm25-run.txt")
+
+            self.assertEqual(
+                [{"qid": "q-1", "Q0": "Q0", "docno": "d1", "rank": 1, "score": 1.0, "system": "bm25"}], actual
+            )
+
     def test_loading_of_re_rank_file_depth_10(self):
         expected_path = "-inputs/83051700dcfaf0babc8fa5724dfc5c51/10"
         with TemporaryDirectory() as cache, NamedTemporaryFile() as ranking:
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ["ir_datasets", "numpy", "pandas", "pyterrier", "docker"]
+
+
+def modules_loaded_by_import(module):
+    code = f"import sys, {module}; print(','.join(i for i in {HEAVY_MODULES} if i in sys.modules))"
+    return subprocess.check_output([sys.executable, "-c", code]).decode().strip()
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_rest_api_client_does_not_load_heavy_modules(self):
+        self.assertEqual("", modules_loaded_by_import("tira.rest_api_client"))
+
+    def test_tira_cli_does_not_load_heavy_modules(self):
+        self.assertEqual("", modules_loaded_by_import("tira.tira_cli"))
+
+    def test_ir_datasets_of_third_party_integrations_are_loaded_on_access(self):
+        code = "from tira.third_party_integrations import ir_datasets; print(ir_datasets is not None)"
+        actual = subprocess.check_output([sys.executable, "-c", code]).decode().strip().split("\n")[-1]
+
+        self.assertEqual("True", actual)
@@ -47,6 +47,14 @@ class TestLocalExecutionIntegration(unittest.TestCase):
         self.assertEqual({}, integration.running_docker_images)
         self.assertEqual({"unknown-software-id": os.path.abspath(output_dir)}, actual)
 
+    def test_independent_stages_run_concurrently_without_cpu_budget(self):
+        parallel_stages = LocalExecutionIntegration()._LocalExecutionIntegration__parallel_stages
+
+        with patch("tira.local_execution_integration.os.cpu_count", return_value=8):
+            self.assertEqual(3, parallel_stages(3, None, None, None))
+            self.assertEqual(2, parallel_stages(3, None, None, 4))
+            self.assertEqual(1, parallel_stages(3, 1, None, None))
+
     def test_stop_run_kills_tracked_container(self):
         integration = LocalExecutionIntegration()
         container = Mock()
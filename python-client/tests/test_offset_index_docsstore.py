@@ -0,0 +1,75 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from tira.ir_datasets_util import OffsetIndexDocsstore
+
+DOCS = [
+    {"docno": "doc-1", "text": "first"},
+    {"docno": "doc-2", "text": "second"},
+    {"docno": "doc-1", "text": "duplicate of the first"},
+    {"docno": "doc-3", "text": "third"},
+]
+
+
+def write_docs(path: Path) -> Path:
+    lines = "".join(json.dumps(i) + "\n" for i in DOCS).encode("utf-8")
+    if path.name.endswith(".gz"):
+        with gzip.open(path, "wb") as f:
+            f.write(lines)
+    else:
+        path.write_bytes(lines)
+    return path
+
+
+class TestOffsetIndexDocsstore(unittest.TestCase):
+    def assert_docs_store_is_valid(self, docs_store):
+        self.assertEqual(3, docs_store.docs_count())
+        self.assertEqual("first", docs_store.get("doc-1")["text"])
+        self.assertEqual("third", docs_store["doc-3"]["text"])
+        self.assertIsNone(docs_store.get("does-not-exist"))
+        self.assertEqual(["second", None], [i and i["text"] for i in docs_store.get_many_iter(["doc-2", "doc-4"])])
+        self.assertEqual({"doc-1", "doc-2", "doc-3"}, set(docs_store))
+
+        with self.assertRaises(KeyError):
+            docs_store["does-not-exist"]
+
+    def test_uncompressed_documents(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            docs_file = write_docs(Path(tmp_dir) / "documents.jsonl")
+
+            self.assert_docs_store_is_valid(OffsetIndexDocsstore(docs_file, json.loads))
+
+    def test_compressed_documents(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            docs_file = write_docs(Path(tmp_dir) / "documents.jsonl.gz")
+
+            self.assert_docs_store_is_valid(OffsetIndexDocsstore(docs_file, json.loads))
+
+    def test_index_is_reused_until_the_documents_change(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            docs_file = write_docs(Path(tmp_dir) / "documents.jsonl")
+            docs_store = OffsetIndexDocsstore(docs_file, json.loads)
+            self.assertEqual(3, docs_store.docs_count())
+            index_file = docs_store.index_directory() / "offsets.idx"
+            index_file.write_bytes(b"")
+
+            self.assertIsNone(OffsetIndexDocsstore(docs_file, json.loads).get("doc-1"))
+
+            with open(docs_file, "a") as f:
+                f.write(json.dumps({"docno": "doc-4", "text": "fourth"}) + "\n")
+            docs_store = OffsetIndexDocsstore(docs_file, json.loads)
+
+            self.assertEqual(4, docs_store.docs_count())
+            self.assertEqual("fourth", docs_store.get("doc-4")["text"])
+
+    def test_empty_documents(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            docs_file = Path(tmp_dir) / "documents.jsonl"
+            docs_file.write_text("")
+            docs_store = OffsetIndexDocsstore(docs_file, json.loads)
+
+            self.assertEqual(0, len(docs_store))
+            self.assertIsNone(docs_store.get("doc-1"))
@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from tira.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_missing_entry(self):
+        self.assertIsNone(ResponseCache().get("does-not-exist"))
+
+    def test_entry_is_fresh_within_its_ttl(self):
+        cache = ResponseCache(ttl=60)
+        cache.put("key", "/api/endpoint", {"status": 0})
+
+        actual = cache.get("key")
+
+        self.assertEqual({"status": 0}, actual.value)
+        self.assertTrue(actual.is_fresh())
+
+    def test_entry_expires_after_its_ttl(self):
+        cache = ResponseCache(ttl=60)
+        with patch("tira.response_cache.time.time", return_value=1000):
+            cache.put("key", "/api/endpoint", {"status": 0}, etag='"v1"')
+
+        with patch("tira.response_cache.time.time", return_value=1061):
+            actual = cache.get("key")
+            self.assertFalse(actual.is_fresh())
+
+        self.assertEqual({"If-None-Match": '"v1"'}, actual.conditional_headers())
+
+    def test_entry_without_ttl_never_expires(self):
+        cache = ResponseCache(ttl=None)
+        cache.put("key", "/api/endpoint", {"status": 0})
+
+        with patch("tira.response_cache.time.time", return_value=10**12):
+            self.assertTrue(cache.get("key").is_fresh())
+
+    def test_longest_matching_prefix_determines_the_ttl(self):
+        cache = ResponseCache(ttl=1, ttls={"/api/": 10, "/api/task/": 100})
+
+        self.assertEqual(1, cache.ttl_of("/v1/datasets/all"))
+        self.assertEqual(10, cache.ttl_of("/api/role"))
+        self.assertEqual(100, cache.ttl_of("/api/task/ir-benchmarks"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put("key-1", "/api/endpoint", 1)
+        cache.put("key-2", "/api/endpoint", 2)
+        cache.get("key-1")
+        cache.put("key-3", "/api/endpoint", 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("key-2"))
+        self.assertEqual(1, cache.get("key-1").value)
+        self.assertEqual(3, cache.get("key-3").value)
+
+    def test_persisted_entries_are_loaded_by_a_new_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ResponseCache(persist_dir=tmp_dir).put("key", "/api/endpoint", {"status": 0}, last_modified="yesterday")
+
+            actual = ResponseCache(persist_dir=tmp_dir).get("key")
+
+        self.assertEqual({"status": 0}, actual.value)
+        self.assertEqual({"If-Modified-Since": "yesterday"}, actual.conditional_headers())
+
+    def test_keys_distinguish_parameters(self):
+        self.assertNotEqual(
+            ResponseCache.key("https://www.tira.io", "/api/endpoint", None),
+            ResponseCache.key("https://www.tira.io", "/api/endpoint", {"page": 2}),
+        )
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from tira.stage_output_cache import StageOutputCache, directory_fingerprint
+
+
+def _stage_output(cache, key, content):
+    ret = cache.staging_directory(key)
+    ret.mkdir()
+    (ret / "run.txt").write_text(content)
+    return ret
+
+
+class TestStageOutputCache(unittest.TestCase):
+    def test_fingerprint_changes_when_a_file_changes(self):
+        with tempfile.TemporaryDirectory() as d:
+            (Path(d) / "queries.jsonl").write_text("a")
+            expected = directory_fingerprint(d)
+            self.assertEqual(expected, directory_fingerprint(d))
+
+            (Path(d) / "queries.jsonl").write_text("ab")
+            self.assertNotEqual(expected, directory_fingerprint(d))
+
+    def test_key_depends_on_image_command_and_inputs(self):
+        with tempfile.TemporaryDirectory() as d:
+            expected = StageOutputCache.key("sha256:1", "echo  $outputDir", d, [])
+
+            self.assertEqual(expected, StageOutputCache.key("sha256:1", "echo $outputDir", d, []))
+            self.assertNotEqual(expected, StageOutputCache.key("sha256:2", "echo $outputDir", d, []))
+            self.assertNotEqual(expected, StageOutputCache.key("sha256:1", "ls", d, []))
+            self.assertNotEqual(expected, StageOutputCache.key("sha256:1", "echo $outputDir", d, [__file__]))
+
+    def test_cached_output_is_served(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = StageOutputCache(d)
+            self.assertIsNone(cache.get("key"))
+
+            actual = cache.put("key", _stage_output(cache, "key", "1 Q0 doc 1 1 tag"))
+
+            self.assertEqual(actual, cache.get("key"))
+            self.assertEqual("1 Q0 doc 1 1 tag", (actual / "run.txt").read_text())
+            self.assertEqual(1, len(cache))
+
+    def test_least_recently_used_outputs_are_evicted(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = StageOutputCache(d, max_size_bytes=10)
+            cache.put("a", _stage_output(cache, "a", "12345"))
+            cache.put("b", _stage_output(cache, "b", "12345"))
+            os.utime(Path(d) / "b" / ".last-used", (0, 0))
+            cache.get("a")
+
+            cache.put("c", _stage_output(cache, "c", "12345"))
+
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("c"))
+
+    def test_stale_staging_directories_are_evicted(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = StageOutputCache(d)
+            stale = _stage_output(cache, "a", "12345")
+            os.utime(stale, (0, 0))
+            os.utime(stale.parent, (0, 0))
+            running = _stage_output(cache, "b", "12345")
+
+            cache.evict()
+
+            self.assertFalse(stale.parent.exists())
+            self.assertTrue(running.exists())
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import unittest
 
 from tira.tira_redirects import STATIC_REDIRECTS, TASKS_WITH_REDIRECT_MERGING, TIRA_ZENODO_BASE_URL
@@ -58,3 +60,9 @@ class TestTiraRedirectsMerging(unittest.TestCase):
         actual = sorted(list(TASKS_WITH_REDIRECT_MERGING))
 
         self.assertEqual(expected, actual)
+
+    def test_redirect_tables_are_not_built_on_import(self):
+        code = "import tira.tira_redirects as r; print(r._redirect_index.cache_info().currsize)"
+        actual = subprocess.check_output([sys.executable, "-c", code]).decode().strip()
+
+        self.assertEqual("0", actual)
@@ -0,0 +1,51 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from ir_datasets.formats import GenericDoc
+
+from tira.ir_datasets_util import load_ir_dataset_from_local_file
+
+DOCS = [
+    {"docno": "doc-1", "text": "first", "url": "https://example.com/1", "original_document": {"title": "First"}},
+    {"docno": "doc-2", "text": "second", "url": "https://example.com/2", "original_document": {"title": "Second"}},
+    {"docno": "doc-1", "text": "duplicate of the first", "url": "https://example.com/1"},
+]
+
+
+class TestTirexDocs(unittest.TestCase):
+    def load_docs(self, tmp_dir: str):
+        with open(Path(tmp_dir) / "documents.jsonl", "w") as f:
+            for i in DOCS:
+                f.write(json.dumps(i) + "\n")
+
+        return load_ir_dataset_from_local_file(Path(tmp_dir), f"tirex-docs-{tmp_dir}").docs_handler()
+
+    def test_documents_have_the_additional_fields_as_attributes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            actual = list(self.load_docs(tmp_dir).docs_iter())
+
+        self.assertEqual(["doc-1", "doc-2"], [i.doc_id for i in actual])
+        self.assertEqual(["first", "second"], [i.default_text() for i in actual])
+        self.assertEqual(["https://example.com/1", "https://example.com/2"], [i.url for i in actual])
+        self.assertEqual(["First", "Second"], [i.title for i in actual])
+        self.assertIsInstance(actual[0], GenericDoc)
+        self.assertIs(type(actual[0]), type(actual[1]))
+        self.assertFalse(hasattr(actual[0], "__dict__"))
+
+    def test_deduplication_can_be_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            docs = self.load_docs(tmp_dir)
+            docs.deduplicate = False
+            actual = [i.doc_id for i in docs.docs_iter()]
+
+        self.assertEqual(["doc-1", "doc-2", "doc-1"], actual)
+
+    def test_deduplicated_documents_match_the_docs_count(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            docs = self.load_docs(tmp_dir)
+            actual = [i.doc_id for i in docs.docs_iter()]
+
+            self.assertEqual(["doc-1", "doc-2"], actual)
+            self.assertEqual(len(actual), docs.docs_count())
@@ -1,3 +1,4 @@
+import csv
 import gzip
 import json
 import os
@@ -8,7 +9,10 @@ from copy import deepcopy
 from enum import Enum
 from glob import glob
 from pathlib import Path
-from typing import Any, Dict, Optional, Sequence, Union
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class FormatMsgType(Enum):
@@ -116,6 +120,65 @@ class FormatBase:
     def check_format(self, run_output: Path):
         return [_fmt.ERROR, "not implemented"]
 
+    def check_format_and_load(self, run_output: Path, load: bool = True):
+        """Check if the run output is valid and load its entries.
+
+        Formats that can validate their entries incrementally override this method so that validation and loading
+        happen in a single pass over the file, all other formats check the format first and load the entries
+        afterwards.
+
+        Args:
+            run_output (Path): the output produced by some run that is to-be checked.
+            load (bool): keep the parsed entries. If False, only the validity is checked.
+
+        Returns:
+            Tuple[FormatMsgType, str, Optional[list]]: The status, the message, and the entries (None if the output
+            is invalid or load is False).
+        """
+        level, msg = self.check_format(run_output)
+        if level != _fmt.OK or not load:
+            return level, msg, None
+
+        return level, msg, self.all_lines(run_output)
+
+    def check_format_and_load_columns(self, run_output: Path):
+        """Check if the run output is valid and load its entries in bulk into a pandas DataFrame with one column per
+        field. Only formats with a fixed set of columns (e.g., run.txt and qrels.txt) support this.
+
+        Returns:
+            Tuple[FormatMsgType, str, Optional[pd.DataFrame]]: The status, the message, and the columns (None if the
+            output is invalid).
+        """
+        raise ValueError(f"The format {self.__class__.__name__} can not be loaded into columns.")
+
+
+class _DocumentsPerQuery:
+    """Incrementally tracks the documents per query of a run or qrel file.
+
+    Only the hashes of the docnos are kept per query, so the state stays bounded by the number of entries and does
+    not hold the (potentially long) docno strings.
+    """
+
+    def __init__(self):
+        self.num_lines = 0
+        self.duplicate = None
+        self.query_to_docs: "Dict[str, set]" = {}
+
+    def add(self, entry: "Dict[str, Any]"):
+        self.num_lines += 1
+        docs = self.query_to_docs.get(entry["qid"])
+        if docs is None:
+            docs = set()
+            self.query_to_docs[entry["qid"]] = docs
+
+        docno_hash = hash(entry["docno"])
+        if docno_hash in docs and self.duplicate is None:
+            self.duplicate = entry
+        docs.add(docno_hash)
+
+    def num_queries(self) -> int:
+        return len(self.query_to_docs)
+
 
 class LearnedSparseRetrievalInputs(FormatBase):
     """Checks if a given output is a valid learned sparese retrieval input."""
@@ -141,51 +204,177 @@ class LearnedSparseRetrievalInputs(FormatBase):
         return [_fmt.OK, "The dataset is in the format for the lsr-benchmark."]
 
 
+class _ColumnsPerQuery:
+    """The vectorised counterpart of _DocumentsPerQuery for runs or qrels that were parsed into columns."""
+
+    def __init__(self, columns: "pd.DataFrame"):
+        self.num_lines = len(columns)
+        duplicates = columns.duplicated(["qid", "docno"])
+        self.duplicate = columns[duplicates].iloc[0].to_dict() if duplicates.any() else None
+        self._num_queries = columns["qid"].nunique()
+
+    def num_queries(self) -> int:
+        return self._num_queries
+
+
+def _read_trec_columns(
+    checker: "Union[RunFormat, QrelFormat]",
+    file_path: Path,
+    columns: "Sequence[str]",
+    numeric_columns: "Dict[str, str]",
+) -> "pd.DataFrame":
+    """Parse a whitespace-separated run or qrel file in bulk into one column per field.
+
+    The file is parsed with the vectorised pandas parser. If the result is not clean (wrong number of fields or
+    values that do not parse as numbers), the file is scanned line by line with the parser of the checker to report
+    the first invalid line.
+    """
+    import pandas as pd
+
+    try:
+        f_size = file_path.stat().st_size
+    except OSError:
+        raise ValueError(f"File {file_path} is not readable.")
+
+    if f_size > checker.max_size():
+        raise ValueError(f"File {file_path} is too large (size {f_size} exceeds configured {checker.max_size()}).")
+
+    ret = _read_clean_trec_columns(file_path, columns, numeric_columns)
+    if ret is not None:
+        return ret
+
+    for line_number, line in enumerate(FormatBase.yield_next_entry(checker, file_path), start=1):
+        try:
+            checker.parse_single_line(line.strip())
+        except ValueError as e:
+            raise ValueError(f"{e.args[0]} (line {line_number} of {file_path.name})")
+
+    # values that pandas rejects but python accepts, e.g., "nan" as score, are loaded line by line.
+    lines = [checker.parse_single_line(i.strip()) for i in FormatBase.yield_next_entry(checker, file_path)]
+    return pd.DataFrame(lines, columns=list(columns))
+
+
+def _read_clean_trec_columns(
+    file_path: Path, columns: "Sequence[str]", numeric_columns: "Dict[str, str]"
+) -> "Optional[pd.DataFrame]":
+    """The columns parsed with the vectorised pandas parser or None if the file has invalid lines.
+
+    Blank lines are kept as rows of empty values (instead of being skipped), so that they are invalid as in the line
+    by line check.
+    """
+    import pandas as pd
+
+    try:
+        ret = pd.read_csv(
+            file_path,
+            sep="\\s+",
+            header=None,
+            names=list(columns),
+            dtype=str,
+            na_filter=False,
+            quoting=csv.QUOTE_NONE,
+            skip_blank_lines=False,
+        )
+    except ValueError:
+        return None
+
+    if ret.isna().any(axis=None) or (ret[columns[-1]] == "").any():
+        return None
+
+    for column, dtype in numeric_columns.items():
+        parsed = pd.to_numeric(ret[column], errors="coerce")
+        if parsed.isna().any() or (dtype == "int64" and parsed.dtype.kind not in ("i", "u")):
+            return None
+        ret[column] = parsed.astype(dtype)
+
+    return ret
+
+
 class RunFormat(FormatBase):
     """Checks if a given output is a valid run file."""
 
+    COLUMNS = ("qid", "q0", "docno", "rank", "score", "system")
+
     def check_format(self, run_output: Path):
+        return list(self.check_format_and_load(run_output, load=False)[:2])
+
+    def error_if_no_unique_file(self, run_output: Path):
         if (run_output / "run.txt").exists() and (run_output / "run.txt.gz").exists():
             msg = f"Found multiple run.txt or run.txt.gz files: {os.listdir(run_output)} ."
-            return [_fmt.ERROR, msg]
+            return _fmt.ERROR, msg, None
         if not (run_output / "run.txt").exists() and not (run_output / "run.txt.gz").exists():
             msg = "No file run.txt or run.txt.gz was found."
             try:
                 msg += " Only the files " + str(os.listdir(run_output)) + " were available."
             except:
                 pass
-            return [_fmt.ERROR, msg]
+            return _fmt.ERROR, msg, None
 
+        return None
+
+    def check_format_and_load(self, run_output: Path, load: bool = True):
+        error = self.error_if_no_unique_file(run_output)
+        if error:
+            return error
+
+        docs_per_query = _DocumentsPerQuery()
+        lines = [] if load else None
         try:
             # maximum size of 10MB
-            num_lines = 0
-            lines = []
             for line in self.yield_next_entry(run_output):
-                if self.spot_check and num_lines > self.spot_check:
+                if not self.spot_check or docs_per_query.num_lines <= self.spot_check:
+                    docs_per_query.add(line)
+                elif not load:
                     break
-                lines.append(line)
-                num_lines += 1
+
+                if docs_per_query.duplicate is not None and docs_per_query.num_lines >= 5:
+                    break
+
+                if load:
+                    lines.append(line)
         except Exception as e:
-            return [_fmt.ERROR, e.args[0]]
+            return _fmt.ERROR, e.args[0], None
 
-        if len(lines) < 5:
-            return [_fmt.ERROR, f"The run file contains only {len(lines)} lines, this is likely an error."]
+        return self.validate(docs_per_query, lines)
 
-        query_to_docs = {}
-        for line in lines:
-            if line["qid"] not in query_to_docs:
-                query_to_docs[line["qid"]] = set()
-            if line["docno"] in query_to_docs[line["qid"]]:
-                return [
-                    _fmt.ERROR,
-                    f'The run file has duplicate documents: the document with id "{line["docno"]}" appears multiple times for query "{line["qid"]}".',
-                ]
-            query_to_docs[line["qid"]].add(line["docno"])
+    def check_format_and_load_columns(self, run_output: Path):
+        error = self.error_if_no_unique_file(run_output)
+        if error:
+            return error
+
+        try:
+            columns = self.all_columns(run_output)
+        except Exception as e:
+            return _fmt.ERROR, e.args[0], None
 
-        if len(query_to_docs.keys()) < 3:
-            return [_fmt.ERROR, f"The run file has only {len(query_to_docs)} queries which is likely an error."]
+        spot_checked = columns.head(self.spot_check + 1) if self.spot_check else columns
+        return self.validate(_ColumnsPerQuery(spot_checked), columns)
 
-        return [_fmt.OK, "The run.txt file has the correct format."]
+    def validate(self, docs_per_query: "Union[_DocumentsPerQuery, _ColumnsPerQuery]", lines: Any):
+        if docs_per_query.num_lines < 5:
+            return (
+                _fmt.ERROR,
+                f"The run file contains only {docs_per_query.num_lines} lines, this is likely an error.",
+                None,
+            )
+
+        if docs_per_query.duplicate is not None:
+            line = docs_per_query.duplicate
+            return (
+                _fmt.ERROR,
+                f'The run file has duplicate documents: the document with id "{line["docno"]}" appears multiple times '
+                + f'for query "{line["qid"]}".',
+                None,
+            )
+
+        if docs_per_query.num_queries() < 3:
+            return (
+                _fmt.ERROR,
+                f"The run file has only {docs_per_query.num_queries()} queries which is likely an error.",
+                None,
+            )
+
+        return _fmt.OK, "The run.txt file has the correct format.", lines
 
     def parse_single_line(self, line):
         cols = re.split("\\s+", line)
@@ -206,79 +395,135 @@ class RunFormat(FormatBase):
 
         return {"qid": qid, "q0": q0, "docno": docno, "rank": rank, "score": score, "system": system}
 
-    def yield_next_entry(self, run_output):
+    def file_path(self, run_output: Path) -> Path:
         if (run_output / "run.txt").exists():
-            file_path = run_output / "run.txt"
+            return run_output / "run.txt"
         elif (run_output / "run.txt.gz").exists():
-            file_path = run_output / "run.txt.gz"
+            return run_output / "run.txt.gz"
         else:
             raise ValueError("Could not find a file run.txt or run.txt.gz")
 
-        for line in super().yield_next_entry(file_path):
+    def yield_next_entry(self, run_output):
+        for line in super().yield_next_entry(self.file_path(run_output)):
             yield self.parse_single_line(line.strip())
 
+    def all_columns(self, run_output: Path) -> "pd.DataFrame":
+        """Parse the run file in bulk into the columns qid, q0, docno, rank, score, and system."""
+        return self.file_columns(self.file_path(run_output))
+
+    def file_columns(self, file_path: Path) -> "pd.DataFrame":
+        """Parse the run file at the given path (i.e., not the run.txt within a directory) in bulk into columns."""
+        return _read_trec_columns(self, file_path, self.COLUMNS, {"rank": "int64", "score": "float64"})
+
 
 class QrelFormat(FormatBase):
     """Checks if a given output is a valid qrel file."""
 
+    COLUMNS = ("qid", "q0", "docno", "rel")
+
     def check_format(self, run_output: Path):
+        return list(self.check_format_and_load(run_output, load=False)[:2])
+
+    def error_if_no_unique_file(self, run_output: Path):
         if (run_output / "qrels.txt").exists() and (run_output / "qrels.txt.gz").exists():
             msg = f"Found multiple qrels.txt or qrels.txt.gz files: {os.listdir(run_output)} ."
-            return [_fmt.ERROR, msg]
+            return _fmt.ERROR, msg, None
         if not (run_output / "qrels.txt").exists() and not (run_output / "qrels.txt.gz").exists():
             msg = "No unique qrels.txt file was found, only the files "
             msg += str(os.listdir(run_output)) + " were available."
-            return [_fmt.ERROR, msg]
+            return _fmt.ERROR, msg, None
+
+        return None
 
+    def check_format_and_load(self, run_output: Path, load: bool = True):
+        error = self.error_if_no_unique_file(run_output)
+        if error:
+            return error
+
+        docs_per_query = _DocumentsPerQuery()
+        lines = [] if load else None
         try:
             # maximum size of 10MB
-            lines = self.all_lines(run_output)
+            for line in self.yield_next_entry(run_output):
+                docs_per_query.add(line)
+
+                if docs_per_query.duplicate is not None and docs_per_query.num_lines >= 10:
+                    break
+
+                if load:
+                    lines.append(line)
         except Exception as e:
-            return [_fmt.ERROR, e.args[0]]
+            return _fmt.ERROR, e.args[0], None
 
-        if len(lines) < 10:
-            return [_fmt.ERROR, f"The run file contains only {len(lines)} lines, this is likely an error."]
+        return self.validate(docs_per_query, lines)
 
-        query_to_docs = {}
-        for line in lines:
-            if line["qid"] not in query_to_docs:
-                query_to_docs[line["qid"]] = set()
-            if line["docno"] in query_to_docs[line["qid"]]:
-                return [
-                    _fmt.ERROR,
-                    f'The qrel file has duplicate documents: the document with id "{line["docno"]}" appears multiple times for query "{line["qid"]}".',
-                ]
-            query_to_docs[line["qid"]].add(line["docno"])
+    def check_format_and_load_columns(self, run_output: Path):
+        error = self.error_if_no_unique_file(run_output)
+        if error:
+            return error
 
-        if len(query_to_docs.keys()) < 3:
-            return [_fmt.ERROR, f"The run file has only {len(query_to_docs)} queries which is likely an error."]
+        try:
+            columns = self.all_columns(run_output)
+        except Exception as e:
+            return _fmt.ERROR, e.args[0], None
 
-        return [_fmt.OK, "The qrels are valid."]
+        return self.validate(_ColumnsPerQuery(columns), columns)
 
-    def all_lines(self, run_output):
+    def validate(self, docs_per_query: "Union[_DocumentsPerQuery, _ColumnsPerQuery]", lines: Any):
+        if docs_per_query.num_lines < 10:
+            return (
+                _fmt.ERROR,
+                f"The run file contains only {docs_per_query.num_lines} lines, this is likely an error.",
+                None,
+            )
+
+        if docs_per_query.duplicate is not None:
+            line = docs_per_query.duplicate
+            return (
+                _fmt.ERROR,
+                f'The qrel file has duplicate documents: the document with id "{line["docno"]}" appears multiple times '
+                + f'for query "{line["qid"]}".',
+                None,
+            )
+
+        if docs_per_query.num_queries() < 3:
+            return (
+                _fmt.ERROR,
+                f"The run file has only {docs_per_query.num_queries()} queries which is likely an error.",
+                None,
+            )
+
+        return _fmt.OK, "The qrels are valid.", lines
+
+    def parse_single_line(self, line):
+        cols = re.split("\\s+", line)
+        if len(cols) != 4:
+            raise ValueError(
+                "Invalid line in the qrel file, expected 4 columns, but found a line "
+                + f'"{line}" with {len(cols)} columns.'
+            )
+        qid, q0, docno, rel = cols
+        try:
+            rel = int(rel)
+        except:
+            raise ValueError(f"I expected that the relevance is an integer, got {rel} in line {line}")
+        return {"qid": qid, "q0": q0, "docno": docno, "rel": rel}
+
+    def file_path(self, run_output: Path) -> Path:
         if (run_output / "qrels.txt").exists():
-            ret = [i.strip() for i in super().all_lines(run_output / "qrels.txt")]
+            return run_output / "qrels.txt"
         elif (run_output / "qrels.txt.gz").exists():
-            ret = [i.strip() for i in super().all_lines(run_output / "qrels.txt.gz")]
+            return run_output / "qrels.txt.gz"
         else:
             raise ValueError("Could not find a file qrels.txt or qrels.txt.gz")
 
-        ret_parsed = []
-        for l in ret:
-            l = l.strip()
-            cols = re.split("\\s+", l)
-            if len(cols) != 4:
-                return [
-                    _fmt.ERROR,
-                    f'Invalid line in the qrel file, expected 4 columns, but found a line "{l}" with {len(cols)} columns.',
-                ]
-            qid, q0, docno, rel = cols
-            try:
-                rel = int(rel)
-            except:
-                raise ValueError(f"I expected that the relevance is an integer, got {rel} in line {l}")
-            ret_parsed.append({"qid": qid, "q0": q0, "docno": docno, "rel": rel})
-        return ret_parsed
+    def yield_next_entry(self, run_output):
+        for line in super().yield_next_entry(self.file_path(run_output)):
+            yield self.parse_single_line(line.strip())
+
+    def all_columns(self, run_output: Path) -> "pd.DataFrame":
+        """Parse the qrel file in bulk into the columns qid, q0, docno, and rel."""
+        return _read_trec_columns(self, self.file_path(run_output), self.COLUMNS, {"rel": "int64"})
 
 
 class KeyValueFormatBase(FormatBase):
@@ -359,15 +604,23 @@ class JsonlFormat(KeyValueFormatBase):
         super().apply_configuration_and_throw_if_invalid(configuration)
 
     def check_format(self, run_output: Path):
+        return list(self.check_format_and_load(run_output, load=False)[:2])
+
+    def check_format_and_load(self, run_output: Path, load: bool = True):
         try:
-            lines = self.all_lines(run_output)
+            num_lines = 0
+            lines = [] if load else None
+            for line in self.yield_next_entry(run_output):
+                num_lines += 1
+                if load:
+                    lines.append(line)
 
-            if len(lines) < self.minimum_lines:
-                return [_fmt.ERROR, f"The *.jsonl file contains only {len(lines)} lines, this is likely an error."]
+            if num_lines < self.minimum_lines:
+                return _fmt.ERROR, f"The *.jsonl file contains only {num_lines} lines, this is likely an error.", None
 
-            return [_fmt.OK, "The jsonl file has the correct format."]
+            return _fmt.OK, "The jsonl file has the correct format.", lines
         except Exception as e:
-            return [_fmt.ERROR, str(e)]
+            return _fmt.ERROR, str(e), None
 
     def fail_if_json_line_is_not_valid(self, line):
         for field in self.required_fields:
@@ -1698,6 +1951,27 @@ def lines_if_valid(
         run_output (Path): the output produced by some run that is to-be checked.
         configuration (Optional[dict[str, Any]]): the configuration to apply to the formatter.
     """
+    result, msg, lines = check_format_and_load(run_output, format, configuration)
+    if result != _fmt.OK:
+        raise ValueError(msg)
+
+    return lines
+
+
+def check_format_and_load(
+    run_output: Path, format: "Union[str, Sequence[str]]", configuration: "Optional[dict[str, Any]]" = None
+):
+    """Check if the provided run output is in the specified format and load its lines in the same pass.
+
+    Args:
+        format (Union[str, Sequence[str]]): The format or a list with exactly one format.
+        run_output (Path): the output produced by some run that is to-be checked.
+        configuration (Optional[dict[str, Any]]): the configuration to apply to the formatter.
+
+    Returns:
+        Tuple[FormatMsgType, str, Optional[list]]: The status, the message intended for users, and the loaded lines
+        (None if the output is not valid).
+    """
     if not isinstance(format, str) and isinstance(format, Iterable):
         if len(format) == 0 or len(format) > 1:
             raise ValueError("Configuration error, I do not know in which format to read the file, I got {format}")
@@ -1708,19 +1982,70 @@ def lines_if_valid(
         raise ValueError(f"Format {format} is not supported. Supported formats are {SUPPORTED_FORMATS}.")
 
     checker = check_format_configuration_if_valid(format, configuration)
-    result, msg = checker.check_format(run_output)
+    result, msg, lines = checker.check_format_and_load(run_output)
+
+    if result != _fmt.OK:
+        return result, msg, None
+
+    return result, msg, lines
+
+
+def columns_if_valid(
+    run_output: Path, format: "Union[str, Sequence[str]]", configuration: "Optional[dict[str, Any]]" = None
+) -> "pd.DataFrame":
+    """Load all entries from a user file in bulk into a pandas DataFrame (one column per field) if they are valid.
+    This is much faster than lines_if_valid for large run or qrel files as it avoids a python dict per line.
+
+    Args:
+        format (Union[str, Sequence[str]]): The format or a list with exactly one format, e.g., run.txt or qrels.txt.
+        run_output (Path): the output produced by some run that is to-be checked.
+        configuration (Optional[dict[str, Any]]): the configuration to apply to the formatter.
+    """
+    result, msg, columns = check_format_and_load_columns(run_output, format, configuration)
     if result != _fmt.OK:
         raise ValueError(msg)
 
-    return checker.all_lines(run_output)
+    return columns
+
+
+def check_format_and_load_columns(
+    run_output: Path, format: "Union[str, Sequence[str]]", configuration: "Optional[dict[str, Any]]" = None
+):
+    """Check if the provided run output is in the specified format and load its entries in bulk into columns.
+
+    Args:
+        format (Union[str, Sequence[str]]): The format or a list with exactly one format, e.g., run.txt or qrels.txt.
+        run_output (Path): the output produced by some run that is to-be checked.
+        configuration (Optional[dict[str, Any]]): the configuration to apply to the formatter.
+
+    Returns:
+        Tuple[FormatMsgType, str, Optional[pd.DataFrame]]: The status, the message intended for users, and the
+        loaded columns (None if the output is not valid).
+    """
+    if not isinstance(format, str) and isinstance(format, Iterable):
+        if len(format) == 0 or len(format) > 1:
+            raise ValueError("Configuration error, I do not know in which format to read the file, I got {format}")
+        else:
+            format = format[0]
+
+    if format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Format {format} is not supported. Supported formats are {SUPPORTED_FORMATS}.")
+
+    checker = check_format_configuration_if_valid(format, configuration)
+    return checker.check_format_and_load_columns(run_output)
+
+
+# The formats that report_valid_formats detects in addition to ir_metadata.
+REPORTED_FORMATS = ("run.txt", "query-processor", "document-processor", "terrier-index")
 
 
 def report_valid_formats(run_output: Path) -> Dict[str, Any]:
     valid_formats: Dict[str, Any] = {}
-    if _fmt.OK == check_format(run_output, "ir_metadata")[0]:
-        valid_formats["ir_metadata"] = sorted([i["name"] for i in lines_if_valid(run_output, "ir_metadata")])
+    result, _, ir_metadata = check_format_and_load(run_output, "ir_metadata")
+    if _fmt.OK == result:
+        valid_formats["ir_metadata"] = sorted([i["name"] for i in ir_metadata])
 
-    for f in ["run.txt", "query-processor", "document-processor", "terrier-index"]:
+    for f in REPORTED_FORMATS:
         if _fmt.OK == check_format(run_output, f)[0]:
             valid_formats[f] = True
 
@@ -1,26 +1,60 @@
+import json
+import multiprocessing
 import os
+import re
 from abc import ABC
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from statistics import mean
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 CONF_ID_FIELD = "id_field"
 from tira.check_format import (
     CONF_ID_FIELD,
     CONF_MAX_SIZE_MB,
     CONF_VALUE_FIELD,
+    FormatMsgType,
     KeyValueFormatBase,
     _fmt,
     check_format,
+    check_format_and_load,
+    check_format_and_load_columns,
     check_format_configuration_if_valid,
-    lines_if_valid,
+    columns_if_valid,
     log_message,
 )
 from tira.io_utils import to_prototext
 from tira.rest_api_client import Client
 from tira.tira_client import TiraClient
 
+IR_MEASURE_PATTERN = re.compile("^((nDCG|P|R)@[1-9][0-9]*|MAP|RR)$")
+TREC_EVAL_DEPTH = 1000
+CONF_WORKERS = "workers"
+# The evaluator that calculates the retrieval measures that TrecTools supports, either TrecTools or IrMeasures.
+CONF_MEASURE_ENGINE = "measure_engine"
+# The number of truths (e.g., the qrels of the lags of LongEval) whose parsed columns are kept in memory.
+TRUTH_CACHE_SIZE = 4
+
+
+def _fingerprint(directory: Path) -> "Tuple[Tuple[str, int, int], ...]":
+    return tuple(sorted((i.name, i.stat().st_size, i.stat().st_mtime_ns) for i in directory.iterdir() if i.is_file()))
+
+
+@lru_cache(maxsize=TRUTH_CACHE_SIZE)
+def _cached_columns_if_valid(
+    directory: str, format: "Union[str, Tuple[str, ...]]", configuration: str, fingerprint: Tuple
+) -> Any:
+    return columns_if_valid(Path(directory), format, json.loads(configuration))
+
+
+def clear_truth_cache() -> None:
+    """Release the truths that were parsed by cached_columns_if_valid, e.g., after a long-running worker finished a
+    task, so that their data frames do not stay in memory until the next evaluation.
+    """
+    _cached_columns_if_valid.cache_clear()
+
 
 class TiraBaseEvaluator(ABC):
     def __init__(
@@ -38,11 +72,8 @@ class TiraBaseEvaluator(ABC):
         self._measures = measures
 
     def evaluate(self, run: Path, truths: Path) -> "dict[str, Any]":
-        self.is_valid(run, self._run_format, self._run_format_configuration, True)
-        self.is_valid(truths, self._truth_format, self._truth_format_configuration)
-
-        run_data = lines_if_valid(run, self._run_format, self._run_format_configuration)
-        truth_data = lines_if_valid(truths, self._truth_format, self._truth_format_configuration)
+        run_data = self.lines_if_valid(run, self._run_format, self._run_format_configuration, True)
+        truth_data = self.lines_if_valid(truths, self._truth_format, self._truth_format_configuration)
 
         return self._eval(run_data, truth_data)
 
@@ -60,6 +91,70 @@ class TiraBaseEvaluator(ABC):
 
             raise ValueError(ret[1])
 
+    def lines_if_valid(
+        self,
+        directory: Path,
+        format: "Union[str, List[str]]",
+        configuration: "Optional[Dict[str, Any]]" = None,
+        log: bool = False,
+    ) -> List[Any]:
+        level, msg, lines = check_format_and_load(directory, format, configuration)
+        if log:
+            log_message(msg, level)
+        if level != _fmt.OK:
+            raise ValueError(msg)
+
+        return lines
+
+    def columns_if_valid(
+        self,
+        directory: Path,
+        format: "Union[str, List[str]]",
+        configuration: "Optional[Dict[str, Any]]" = None,
+        log: bool = False,
+    ) -> Any:
+        level, msg, columns = check_format_and_load_columns(directory, format, configuration)
+        if log:
+            log_message(msg, level)
+        if level != _fmt.OK:
+            raise ValueError(msg)
+
+        return columns
+
+    def cached_columns_if_valid(
+        self, directory: Path, format: "Union[str, List[str]]", configuration: "Optional[Dict[str, Any]]" = None
+    ) -> Any:
+        """Like columns_if_valid but the parsed columns are cached per directory so that truths (e.g., qrels) that
+        are used for many runs or lags are parsed only once. The cache is invalidated when files in the directory
+        change. The returned columns are shared, so they must not be modified.
+        """
+        directory = Path(directory).resolve()
+        if not directory.is_dir():
+            return self.columns_if_valid(directory, format, configuration)
+
+        if not isinstance(format, str):
+            format = tuple(format)
+
+        return _cached_columns_if_valid(
+            str(directory), format, json.dumps(configuration, sort_keys=True), _fingerprint(directory)
+        )
+
+    def map_groups(self, function: Callable, *arguments: List[Any]) -> List[Any]:
+        """Apply the function to all groups (e.g., all lags of LongEval) in a pool with self.workers processes.
+
+        The groups are evaluated sequentially if only one worker is configured. Daemonic processes (e.g., celery
+        workers) are not allowed to have children, so they evaluate the groups in a pool of threads instead.
+        """
+        num_groups = len(arguments[0]) if arguments else 0
+        workers = min(getattr(self, "workers", None) or os.cpu_count() or 1, num_groups)
+
+        if workers <= 1:
+            return [function(*i) for i in zip(*arguments)]
+
+        executor = ThreadPoolExecutor if multiprocessing.current_process().daemon else ProcessPoolExecutor
+        with executor(max_workers=workers) as pool:
+            return list(pool.map(function, *arguments))
+
     def throw_if_conf_invalid(self, config: dict) -> None:
         raise ValueError("This is not implemented")
 
@@ -101,14 +196,11 @@ class TextGenerationEvaluator(TiraBaseEvaluator):
                 self.truth_id_column = truth_format_checker.id_field
 
     def evaluate(self, run: Path, truths: Path) -> "dict[str, Any]":
-        self.is_valid(run, self._run_format, self._run_format_configuration, True)
-
-        run_data = lines_if_valid(run, self._run_format, self._run_format_configuration)
+        run_data = self.lines_if_valid(run, self._run_format, self._run_format_configuration, True)
         truth_data = None
 
         if self.truth_id_column:
-            self.is_valid(truths, self._truth_format, self._truth_format_configuration)
-            truth_data = lines_if_valid(truths, self._truth_format, self._truth_format_configuration)
+            truth_data = self.lines_if_valid(truths, self._truth_format, self._truth_format_configuration)
 
         return self._eval(run_data, truth_data)
 
@@ -161,46 +253,55 @@ class RunFileEvaluator(TiraBaseEvaluator):
         if self._truth_format and "qrels.txt" != self._truth_format and "qrels.txt" not in self._truth_format:
             self._truth_format = "qrels.txt"
 
+        self.workers = config.get(CONF_WORKERS) if config else None
+
     def evaluate(self, run_orig: Path, truths: Path) -> "dict[str, Any]":
         ret = {}
 
-        for lag in self.lags:
-            run = run_orig
-            if lag:
-                run = Path(run_orig) / lag
-            run_format_config = {CONF_MAX_SIZE_MB: self.max_size_mb}
-            self.is_valid(Path(run), self._run_format, run_format_config)
-
-            expected_queries = None
-            if self._truth_format is not None:
-
-                self.is_valid(truths, self._truth_format)
-                expected_queries = lines_if_valid(truths, self._truth_format)
-                expected_queries = set([i["qid"] for i in expected_queries])
-
-            run_data = lines_if_valid(run, self._run_format, run_format_config)
-            counts = defaultdict(set)
-
-            for i in run_data:
-                if expected_queries and i["qid"] not in expected_queries:
-                    continue
-                counts[i["qid"]].add(i["docno"])
-
-            lengths = [len(i) for i in counts.values()]
-            num_queries = len(counts.keys())
-            prefix = "" if not lag else f"{lag} "
-
-            ret.update(
-                {
-                    f"{prefix}Docs Per Query (Avg)": sum(lengths) / num_queries,
-                    f"{prefix}Docs Per Query (Min)": min(lengths),
-                    f"{prefix}Docs Per Query (Max)": max(lengths),
-                    f"{prefix}NumQueries": num_queries,
-                }
-            )
+        expected_queries = None
+        if self._truth_format is not None:
+            expected_queries = set(self.cached_columns_if_valid(truths, self._truth_format)["qid"])
+
+        runs = [Path(run_orig) / lag if lag else run_orig for lag in self.lags]
+        expected_queries_per_lag = [expected_queries] * len(self.lags)
+
+        for level, msg, evaluation in self.map_groups(self.evaluate_lag, runs, self.lags, expected_queries_per_lag):
+            if level != _fmt.OK:
+                raise ValueError(msg)
+            ret.update(evaluation)
 
         return {k: ret[k] for k in ret if any([i in k for i in self._measures])}
 
+    def evaluate_lag(
+        self, run: Path, lag: str, expected_queries: "Optional[set]"
+    ) -> "Tuple[FormatMsgType, str, Optional[dict]]":
+        run_format_config = {CONF_MAX_SIZE_MB: self.max_size_mb}
+        level, msg, run_data = check_format_and_load(Path(run), self._run_format, run_format_config)
+        if level != _fmt.OK:
+            return level, msg, None
+
+        counts = defaultdict(set)
+
+        for i in run_data:
+            if expected_queries and i["qid"] not in expected_queries:
+                continue
+            counts[i["qid"]].add(i["docno"])
+
+        lengths = [len(i) for i in counts.values()]
+        num_queries = len(counts.keys())
+        prefix = "" if not lag else f"{lag} "
+
+        return (
+            level,
+            msg,
+            {
+                f"{prefix}Docs Per Query (Avg)": sum(lengths) / num_queries,
+                f"{prefix}Docs Per Query (Min)": min(lengths),
+                f"{prefix}Docs Per Query (Max)": max(lengths),
+                f"{prefix}NumQueries": num_queries,
+            },
+        )
+
 
 class WowsEvalEvaluator(TiraBaseEvaluator):
     def throw_if_conf_invalid(self, config: dict) -> None:
@@ -412,30 +513,57 @@ class TrecToolsEvaluator(TiraBaseEvaluator):
             self._truth_format = "qrels.txt"
             self.groups_to_evaluate = None
 
-        # check that dependencies are available
+        self.workers = config.get(CONF_WORKERS) if config else None
+        self.check_dependencies()
+
+    def check_dependencies(self) -> None:
         import pandas as pd
         from trectools import TrecEval, TrecQrel, TrecRun
 
     def evaluate(self, run: Path, truths: Path) -> "dict[str, Any]":
         if not self.groups_to_evaluate:
-            return super().evaluate(run, truths)
+            return self.evaluate_columns(run, truths)
         else:
+            truth_data = [
+                self.cached_columns_if_valid(truths / group, self._truth_format, self._truth_format_configuration)
+                for group in self.groups_to_evaluate
+            ]
+            runs = [run / group for group in self.groups_to_evaluate]
+
             ret = {}
-            for group in self.groups_to_evaluate:
-                ret[group] = super().evaluate(run / group, truths / group)
+            for group, (level, msg, evaluation) in zip(
+                self.groups_to_evaluate, self.map_groups(self.evaluate_group, runs, truth_data)
+            ):
+                log_message(msg, level)
+                if level != _fmt.OK:
+                    raise ValueError(msg)
+                ret[group] = evaluation
             return ret
 
-    def _eval(self, run_data: List[Any], truth_data: List[Any]) -> dict:
+    def evaluate_columns(self, run: Path, truths: Path) -> "dict[str, Any]":
+        run_data = self.columns_if_valid(run, self._run_format, self._run_format_configuration, True)
+        truth_data = self.cached_columns_if_valid(truths, self._truth_format, self._truth_format_configuration)
+
+        return self._eval(run_data, truth_data)
+
+    def evaluate_group(self, run: Path, truth_data: Any) -> "Tuple[FormatMsgType, str, Optional[dict]]":
+        level, msg, run_data = check_format_and_load_columns(run, self._run_format, self._run_format_configuration)
+        if level != _fmt.OK:
+            return level, msg, None
+
+        return level, msg, self._eval(run_data, truth_data)
+
+    def _eval(self, run_data: Any, truth_data: Any) -> dict:
         import pandas as pd
         from trectools import TrecEval, TrecQrel, TrecRun
 
         run = TrecRun()
-        run.run_data = pd.DataFrame(run_data)
+        run.run_data = run_data if isinstance(run_data, pd.DataFrame) else pd.DataFrame(run_data)
         run.run_data["query"] = run.run_data["qid"]
         run.run_data["docid"] = run.run_data["docno"]
 
         qrels = TrecQrel()
-        qrels.qrels_data = pd.DataFrame(truth_data)
+        qrels.qrels_data = truth_data.copy() if isinstance(truth_data, pd.DataFrame) else pd.DataFrame(truth_data)
         qrels.qrels_data["query"] = qrels.qrels_data["qid"]
         qrels.qrels_data["docid"] = qrels.qrels_data["docno"]
 
@@ -454,8 +582,136 @@ class TrecToolsEvaluator(TiraBaseEvaluator):
         return {k: ret[k] for k in self._measures}
 
 
+class _Ranking:
+    """The documents of a run in a fixed order joined with their relevance, used to calculate measures per query."""
+
+    def __init__(self, run: Any, qrels: Any, queries: Any) -> None:
+        import numpy as np
+
+        run = run.merge(qrels, on=["qid", "docno"], how="left")
+        self.qrels = qrels
+        self.queries = queries
+        self.qids = run["qid"].to_numpy()
+        self.rank = run.groupby("qid", sort=False).cumcount().to_numpy() + 1
+        self.gain = run["rel"].fillna(0).to_numpy(dtype=float)
+        self.relevant = self.gain > 0
+        self.num_relevant = qrels.groupby("qid").size().reindex(queries, fill_value=0).to_numpy()
+        self.in_trec_eval_depth = self.relevant & (self.rank <= TREC_EVAL_DEPTH)
+        self.np = np
+
+    def per_query_sum(self, values: Any, qids: Any = None) -> Any:
+        import pandas as pd
+
+        qids = self.qids if qids is None else qids
+        return pd.Series(values).groupby(qids, sort=False).sum().reindex(self.queries, fill_value=0).to_numpy()
+
+    def safe_div(self, numerator: Any, denominator: Any) -> Any:
+        out = self.np.zeros(len(self.queries), dtype=float)
+        return self.np.divide(numerator, denominator, out=out, where=denominator > 0)
+
+    def precision(self, depth: int) -> Any:
+        return self.per_query_sum(self.relevant & (self.rank <= depth)) / depth
+
+    def recall(self, depth: int) -> Any:
+        return self.safe_div(self.per_query_sum(self.relevant & (self.rank <= depth)), self.num_relevant)
+
+    def reciprocal_rank(self) -> Any:
+        import pandas as pd
+
+        reciprocal_ranks = self.np.where(self.in_trec_eval_depth, 1.0 / self.rank, 0.0)
+        ret = pd.Series(reciprocal_ranks).groupby(self.qids, sort=False).max()
+        return ret.reindex(self.queries, fill_value=0).to_numpy()
+
+    def average_precision(self) -> Any:
+        import pandas as pd
+
+        hits = pd.Series(self.in_trec_eval_depth.astype(int)).groupby(self.qids, sort=False).cumsum().to_numpy()
+        precisions = self.np.where(self.in_trec_eval_depth, hits / self.rank, 0.0)
+        return self.safe_div(self.per_query_sum(precisions), self.num_relevant)
+
+    def ndcg(self, depth: int) -> Any:
+        """nDCG with linear gains like trec_eval."""
+        ideal = self.qrels.sort_values(["qid", "rel"], ascending=[True, False])
+        ideal_rank = ideal.groupby("qid", sort=False).cumcount().to_numpy() + 1
+        ideal_gain = ideal["rel"].to_numpy(dtype=float) / self.np.log2(ideal_rank + 1)
+        idcg = self.per_query_sum(self.np.where(ideal_rank <= depth, ideal_gain, 0.0), ideal["qid"].to_numpy())
+
+        dcg = self.per_query_sum(self.np.where(self.rank <= depth, self.gain / self.np.log2(self.rank + 1), 0.0))
+        return self.safe_div(dcg, idcg)
+
+
+class IrMeasuresEvaluator(TrecToolsEvaluator):
+    """Evaluates runs against qrels with a vectorised metric engine.
+
+    All configured measures are computed from one ranking per ordering. The results are identical to trectools: nDCG
+    ranks the documents in the order of the run file (as trectools.TrecEval.get_ndcg does), all other measures rank
+    them like trec_eval by descending score with ties broken by descending docno. nDCG uses linear gains and all
+    measures are averaged over all queries of the run.
+    Supported measures are nDCG@k, P@k, R@k, MAP, and RR with arbitrary cutoffs k.
+    """
+
+    def throw_if_conf_invalid(self, config: dict) -> None:
+        for measure in self._measures:
+            if not IR_MEASURE_PATTERN.match(measure):
+                raise ValueError(f"The measure {measure} is not supported. Supported are nDCG@k, P@k, R@k, MAP, RR.")
+
+        super().throw_if_conf_invalid(config)
+
+    def check_dependencies(self) -> None:
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+
+    def _eval(self, run_data: Any, truth_data: Any) -> dict:
+        per_query = self.per_query(run_data, truth_data)
+
+        return {k: float(per_query[k].mean()) if len(per_query) > 0 else 0.0 for k in self._measures}
+
+    def per_query(self, run_data: Any, truth_data: Any) -> Any:
+        """Calculate all configured measures per query.
+
+        Args:
+            run_data (Union[pd.DataFrame, List[dict]]): The run with the fields qid, docno, and score in file order.
+            truth_data (Union[pd.DataFrame, List[dict]]): The qrels with the fields qid, docno, and rel.
+
+        Returns:
+            pd.DataFrame: One row per query of the run (index qid) with one column per measure.
+        """
+        import pandas as pd
+
+        run = run_data if isinstance(run_data, pd.DataFrame) else pd.DataFrame(run_data)
+        qrels = truth_data if isinstance(truth_data, pd.DataFrame) else pd.DataFrame(truth_data)
+        qrels = qrels[qrels["rel"] > 0][["qid", "docno", "rel"]]
+        run = run[["qid", "docno", "score"]]
+        queries = pd.Index(run["qid"].unique(), name="qid")
+
+        in_file_order, by_score = None, None
+        ret = {}
+        for measure in self._measures:
+            name, _, depth = measure.partition("@")
+            if name == "nDCG":
+                in_file_order = in_file_order or _Ranking(run, qrels, queries)
+                ret[measure] = in_file_order.ndcg(int(depth))
+                continue
+
+            if by_score is None:
+                by_score = _Ranking(
+                    run.sort_values(["qid", "score", "docno"], ascending=[True, False, False]), qrels, queries
+                )
+            if name == "P":
+                ret[measure] = by_score.precision(int(depth))
+            elif name == "R":
+                ret[measure] = by_score.recall(int(depth))
+            elif name == "MAP":
+                ret[measure] = by_score.average_precision()
+            else:
+                ret[measure] = by_score.reciprocal_rank()
+
+        return pd.DataFrame(ret, index=queries)
+
+
 EVALUATORS: dict[str, TiraBaseEvaluator] = {
     "TrecTools": TrecToolsEvaluator,
+    "IrMeasures": IrMeasuresEvaluator,
     "RunFileEvaluator": RunFileEvaluator,
     "HuggingFaceEvaluator": HuggingFaceEvaluator,
     "WowsEvalEvaluator": WowsEvalEvaluator,
@@ -466,6 +722,14 @@ MEASURE_TO_EVALUATORS: dict[str, str] = {
     "nDCG@10": "TrecTools",
     "RR": "TrecTools",
     "P@10": "TrecTools",
+    "nDCG@5": "IrMeasures",
+    "nDCG@20": "IrMeasures",
+    "nDCG@100": "IrMeasures",
+    "P@5": "IrMeasures",
+    "P@20": "IrMeasures",
+    "R@100": "IrMeasures",
+    "R@1000": "IrMeasures",
+    "MAP": "IrMeasures",
     "Docs Per Query (Avg)": "RunFileEvaluator",
     "Docs Per Query (Min)": "RunFileEvaluator",
     "Docs Per Query (Max)": "RunFileEvaluator",
@@ -484,6 +748,25 @@ MEASURE_TO_EVALUATORS: dict[str, str] = {
 }
 
 
+def evaluator_of_measure(measure: str, engine: Optional[str] = None) -> str:
+    """Returns the name of the evaluator in EVALUATORS that calculates the measure.
+
+    The measures that TrecTools supports are calculated by TrecTools unless the engine is IrMeasures. Retrieval
+    measures that TrecTools does not support (e.g., nDCG@15) are calculated by the IrMeasures evaluator.
+    """
+    if engine not in (None, "TrecTools", "IrMeasures"):
+        raise ValueError(f"The {CONF_MEASURE_ENGINE} {engine} is not supported. Supported are TrecTools, IrMeasures.")
+
+    if measure in MEASURE_TO_EVALUATORS:
+        ret = MEASURE_TO_EVALUATORS[measure]
+        return "IrMeasures" if ret == "TrecTools" and engine == "IrMeasures" else ret
+
+    if IR_MEASURE_PATTERN.match(measure):
+        return "IrMeasures"
+
+    raise ValueError(f"No evaluator is available for the measure {measure}.")
+
+
 def load_evaluator_config(config: "Union[dict, str]", client: "Optional[TiraClient]" = None) -> dict:
     if isinstance(config, str):
         if client is None:
@@ -531,7 +814,7 @@ def get_evaluators_if_valid(
 
     evaluator_to_measures = defaultdict(list)
     for measure in config["measures"]:
-        evaluator = MEASURE_TO_EVALUATORS[measure]
+        evaluator = evaluator_of_measure(measure, config.get(CONF_MEASURE_ENGINE))
         evaluator_to_measures[evaluator].append(measure)
 
     ret = []
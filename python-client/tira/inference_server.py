@@ -2,12 +2,16 @@ import importlib.util
 import json
 import logging
 import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
 from datetime import datetime
 from http import HTTPStatus
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Callable, Dict, List, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple, Union
 from urllib.parse import parse_qs, urlparse
 
 ######################################
@@ -19,6 +23,8 @@ _STATUS_INTERNAL_ERROR = {"Status": "Internal error"}
 _STATUS_BAD_REQUEST = {"Status": "Bad request"}
 
 _predict = None
+_batcher = None
+_stats = None
 
 
 def _set_predict_function(predict: Callable):
@@ -26,27 +32,152 @@ def _set_predict_function(predict: Callable):
     _predict = predict
 
 
+class _Stats:
+    """Latency and throughput counters of the inference server, exposed on the /stats endpoint."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.inputs = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_inputs = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def add_request(self, inputs: int, latency: float, error: bool) -> None:
+        with self.__lock:
+            self.requests += 1
+            self.inputs += inputs
+            self.errors += int(error)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def add_batch(self, inputs: int) -> None:
+        with self.__lock:
+            self.batches += 1
+            self.batched_inputs += inputs
+
+    def to_dict(self) -> Dict:
+        with self.__lock:
+            uptime = time.monotonic() - self.started
+            return {
+                "uptime_seconds": uptime,
+                "requests": self.requests,
+                "inputs": self.inputs,
+                "errors": self.errors,
+                "batches": self.batches,
+                "mean_batch_size": self.batched_inputs / self.batches if self.batches else 0.0,
+                "mean_latency_ms": 1000 * self.total_latency / self.requests if self.requests else 0.0,
+                "max_latency_ms": 1000 * self.max_latency,
+                "inputs_per_second": self.inputs / uptime if uptime > 0 else 0.0,
+            }
+
+
+class _MicroBatcher:
+    """Coalesces the inputs of concurrent requests into one call of the predict function.
+
+    A single worker thread collects pending requests until max_batch_size inputs are available or max_wait seconds
+    passed since the first pending request, calls predict once for all inputs, and hands each request its slice of the
+    results. If predict fails for the batch, the requests are predicted one by one so that a failing input only fails
+    its own request. As predict is only called from the worker thread, it does not need to be thread-safe.
+    """
+
+    def __init__(self, predict: Callable, max_batch_size: int = 32, max_wait: float = 0.005, stats: "_Stats" = None):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = stats
+        self.__queue: "queue.Queue[Tuple[List, Future]]" = queue.Queue()
+        self.__worker = threading.Thread(target=self.__run, name="inference-server-batcher", daemon=True)
+        self.__worker.start()
+
+    def submit(self, input_list: List) -> "Future":
+        ret = Future()
+        self.__queue.put((input_list, ret))
+        return ret
+
+    def __next_batch(self) -> "List[Tuple[List, Future]]":
+        ret = [self.__queue.get()]
+        size = len(ret[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                ret.append(self.__queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            size += len(ret[-1][0])
+
+        return ret
+
+    def __predict(self, inputs: List) -> "Union[List, None]":
+        try:
+            return self.predict(inputs)
+        except Exception as e:
+            logging.error(f"Exception during handling of a batch of {len(inputs)} inputs:\n" + str(e))
+            return None
+
+    def __run(self) -> None:
+        while True:
+            batch = self.__next_batch()
+            inputs = [i for input_list, _ in batch for i in input_list]
+            result = self.__predict(inputs)
+
+            if self.stats is not None:
+                self.stats.add_batch(len(inputs))
+
+            if len(batch) == 1:
+                batch[0][1].set_result(result)
+            elif result is None or not isinstance(result, list) or len(result) != len(inputs):
+                # The batch failed or its results can not be split among the requests (one result per input is needed),
+                # so each request is predicted on its own so that only the requests with failing inputs fail.
+                for input_list, future in batch:
+                    future.set_result(self.__predict(input_list))
+            else:
+                offset = 0
+                for input_list, future in batch:
+                    future.set_result(result[offset : offset + len(input_list)])
+                    offset += len(input_list)
+
+
 def _handle_input(input_list: List) -> Dict:
     if _predict is None or not callable(_predict):
-        return _STATUS_INTERNAL_ERROR
+        return dict(_STATUS_INTERNAL_ERROR)
 
     if len(input_list) > 0:
-        try:
-            result = _predict(input_list)
-        except RuntimeError as e:
-            logging.error(f"Exception during handling of input '{input_list}':\n" + str(e))
-            result = None
+        if _batcher is not None:
+            result = _batcher.submit(input_list).result()
+        else:
+            try:
+                result = _predict(input_list)
+            except RuntimeError as e:
+                logging.error(f"Exception during handling of input '{input_list}':\n" + str(e))
+                result = None
         if result is None or not isinstance(result, list):
-            response = _STATUS_INTERNAL_ERROR
+            response = dict(_STATUS_INTERNAL_ERROR)
         else:
-            response = _STATUS_OK
+            response = dict(_STATUS_OK)
             response["output"] = result
     else:
-        response = _STATUS_BAD_REQUEST
+        response = dict(_STATUS_BAD_REQUEST)
 
     return response
 
 
+def _timed_handle_input(input_list: List) -> Dict:
+    start = time.monotonic()
+    ret = _handle_input(input_list)
+    if _stats is not None:
+        _stats.add_request(len(input_list), time.monotonic() - start, ret["Status"] != _STATUS_OK["Status"])
+
+    return ret
+
+
 class InferenceServer(BaseHTTPRequestHandler):
 
     def _set_headers(self):
@@ -58,6 +189,12 @@ class InferenceServer(BaseHTTPRequestHandler):
     def do_GET(self):
         logging.info(self.command)
 
+        if urlparse(self.path).path.rstrip("/") == "/stats":
+            self._set_headers()
+            stats = _stats.to_dict() if _stats is not None else {}
+            self.wfile.write((json.dumps(stats) + "\n").encode("utf-8"))
+            return
+
         query = parse_qs(urlparse(self.path).query)
         payload_list = query.get("payload", None)
 
@@ -68,10 +205,10 @@ class InferenceServer(BaseHTTPRequestHandler):
             try:
                 input_list = [json.loads(element) for element in payload_list]
             except json.JSONDecodeError:
-                response = _STATUS_BAD_REQUEST
+                response = dict(_STATUS_BAD_REQUEST)
 
         if response is None and input_list is not None:
-            response = _handle_input(input_list)
+            response = _timed_handle_input(input_list)
 
         self._set_headers()
         response_string = (json.dumps(response) + "\n").encode("utf-8")
@@ -93,10 +230,10 @@ class InferenceServer(BaseHTTPRequestHandler):
         try:
             input_list = json.loads(payload_string)
         except json.JSONDecodeError:
-            response = _STATUS_BAD_REQUEST
+            response = dict(_STATUS_BAD_REQUEST)
 
         if response is None and input_list is not None:
-            response = _handle_input(input_list)
+            response = _timed_handle_input(input_list)
 
         self._set_headers()
         response_string = (json.dumps(response) + "\n").encode("utf-8")
@@ -120,7 +257,22 @@ class InferenceServer(BaseHTTPRequestHandler):
 ####################################
 
 
-def run_inference_server(base_module: str, absolute_path: str, internal_port: int = 8001, loglevel: int = logging.INFO):
+def run_inference_server(
+    base_module: str,
+    absolute_path: str,
+    internal_port: int = 8001,
+    loglevel: int = logging.INFO,
+    max_batch_size: int = 32,
+    max_batch_wait_ms: float = 5,
+):
+    """Serve the predict function of the module on the port.
+
+    Requests are handled concurrently. Their inputs are coalesced into batches of up to max_batch_size inputs, waiting
+    at most max_batch_wait_ms for further requests, so that predict is called once per batch from a single thread. A
+    max_batch_size of 1 disables batching while predict is still called from one thread at a time.
+    """
+    global _batcher, _stats
+
     # logging
     log_filename = "inference_server_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + ".log"
     _setup_logging(log_filename=log_filename, loglevel=loglevel)
@@ -131,10 +283,12 @@ def run_inference_server(base_module: str, absolute_path: str, internal_port: in
     if predict is None:
         sys.exit("unable to import predict predict function. See log file for details.")
     _set_predict_function(predict=predict)
+    _stats = _Stats()
+    _batcher = _MicroBatcher(predict, max_batch_size, max_batch_wait_ms / 1000, _stats)
 
     # start HTTP server
     server_address = ("", internal_port)
-    httpd = HTTPServer(server_address, InferenceServer)
+    httpd = ThreadingHTTPServer(server_address, InferenceServer)
     logging.info(
         "serving at %s:%d" % (len(server_address[0]) > 0 and server_address[0] or "localhost", server_address[1])
     )
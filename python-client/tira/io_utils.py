@@ -7,17 +7,21 @@ import json
 import logging
 import os
 import platform
+import shutil
 import sys
-import tempfile
 import unicodedata
 import uuid
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stderr, redirect_stdout
 from datetime import datetime as dt
 from glob import glob
 from pathlib import Path
 from subprocess import CalledProcessError, check_output
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Dict,
@@ -29,7 +33,6 @@ from typing import (
     Union,
 )
 
-import pandas as pd
 import requests
 from tqdm import tqdm
 
@@ -37,6 +40,9 @@ from tira.check_format import FormatMsgType, _fmt, clean_logger, log_message
 from tira.tira_client import TiraClient
 from tira.tirex_tracker import find_tirex_tracker_executable_or_none
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def dataset_as_dataframe(
     dataset_id_or_path: "Union[str, Path]",
@@ -289,34 +295,122 @@ def _md5_of_file(file_path: Path) -> str:
     return digest.hexdigest()
 
 
-def _download_file_with_md5(url: str, target_file: Path, expected_md5: str) -> None:
-    response = requests.get(url, stream=True)
-    status_code = response.status_code
+def _link_or_copy(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """Hard-link src to dst, falling back to a copy if src and dst are on different file systems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
-    if status_code < 200 or status_code >= 300:
-        raise ValueError(f"Got non 200 status code {status_code} for {url}.")
 
-    target_file.parent.mkdir(parents=True, exist_ok=True)
-    actual_md5 = hashlib.md5()
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _partial_file(target_file: Path) -> Path:
+    return target_file.parent / (target_file.name + ".part")
+
+
+def _range_headers(partial_file: Path, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Return the headers for a (resumed) download, requesting only the bytes missing from partial_file."""
+    ret = dict(headers) if headers else {}
+    if partial_file.exists() and partial_file.stat().st_size > 0:
+        ret["Range"] = f"bytes={partial_file.stat().st_size}-"
+
+    return ret
 
-    with tempfile.NamedTemporaryFile(delete=False, dir=target_file.parent) as tmp_file:
-        tmp_path = Path(tmp_file.name)
 
-        for chunk in response.iter_content(chunk_size=1024 * 1024):
+def _partial_file_is_complete(response: requests.Response, partial_file: Path) -> bool:
+    """Whether the server rejected the range request from _range_headers with 416 Range Not Satisfiable because
+    partial_file already contains the complete file, e.g., because a previous attempt failed after the download.
+
+    A partial file that does not match the size of the file on the server is removed so that the next attempt starts
+    over.
+    """
+    if response.status_code != 416 or not partial_file.exists():
+        return False
+
+    if response.headers.get("content-range", "") == f"bytes */{partial_file.stat().st_size}":
+        return True
+
+    partial_file.unlink()
+    return False
+
+
+def _stream_to_partial_file(response: requests.Response, partial_file: Path, progress: bool = True) -> str:
+    """Stream the body of the response to partial_file and return the md5 of the complete file.
+
+    Appends to partial_file when the server answered the range request from _range_headers with 206 Partial Content,
+    otherwise the download starts over.
+    """
+    digest = hashlib.md5()
+    offset = 0
+
+    if response.status_code == 206 and partial_file.exists():
+        offset = partial_file.stat().st_size
+        content_range = response.headers.get("content-range", "")
+        if not content_range.startswith(f"bytes {offset}-"):
+            partial_file.unlink()
+            raise ValueError(f'Unexpected content range "{content_range}" to resume the download at byte {offset}.')
+
+        with open(partial_file, "rb") as file_handle:
+            for chunk in iter(lambda: file_handle.read(DOWNLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+    partial_file.parent.mkdir(parents=True, exist_ok=True)
+    total = int(response.headers.get("content-length", 0)) + offset
+
+    bar = tqdm(
+        desc="Download",
+        total=total,
+        initial=offset,
+        unit="iB",
+        unit_scale=True,
+        unit_divisor=1024,
+        disable=not progress,
+    )
+
+    with bar, open(partial_file, "ab" if offset else "wb") as file_handle:
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             if not chunk:
                 continue
 
-            tmp_file.write(chunk)
-            actual_md5.update(chunk)
+            file_handle.write(chunk)
+            digest.update(chunk)
+            bar.update(len(chunk))
+
+    return digest.hexdigest()
+
+
+def _download_file_with_md5(
+    url: str,
+    target_file: Path,
+    expected_md5: str,
+    headers: Optional[Dict[str, str]] = None,
+    verify: bool = True,
+    progress: bool = False,
+) -> None:
+    """Download url to target_file without buffering it in memory.
 
-    actual_md5 = actual_md5.hexdigest()
+    The download goes to a ".part" file next to target_file first, so that an interrupted download is resumed via an
+    HTTP range request on the next call. The md5 is computed on the fly and target_file is only written if it matches.
+    """
+    partial_file = _partial_file(target_file)
+    response = requests.get(url, headers=_range_headers(partial_file, headers), stream=True, verify=verify)
+    status_code = response.status_code
+
+    if _partial_file_is_complete(response, partial_file):
+        actual_md5 = _md5_of_file(partial_file)
+    elif status_code < 200 or status_code >= 300:
+        raise ValueError(f"Got non 200 status code {status_code} for {url}.")
+    else:
+        actual_md5 = _stream_to_partial_file(response, partial_file, progress)
 
     if actual_md5 != expected_md5:
-        if tmp_path.exists():
-            tmp_path.unlink()
+        if partial_file.exists():
+            partial_file.unlink()
         raise ValueError(f'MD5 is unexpected: I expected "{expected_md5}" but got "{actual_md5}" for URL "{url}".')
 
-    tmp_path.replace(target_file)
+    partial_file.replace(target_file)
 
 
 def resolve_mirrored_resources(directory: Union[str, Path]) -> Path:
@@ -387,26 +481,93 @@ def flush_stdout_and_stderr(closable=None):
         print("\n")
 
 
-def zip_dir(file_path: Path, allow_list: "Optional[set]" = None) -> Path:
+# Files are split into blocks of this size that are deflated concurrently when zip_dir uses multiple workers.
+ZIP_BLOCK_SIZE = 1024 * 1024
+# The size of the window of deflate, the compression of a block is primed with this many bytes of its predecessor.
+_DEFLATE_WINDOW = 32 * 1024
+
+
+def zip_dir(file_path: Path, allow_list: "Optional[set]" = None, compresslevel: int = 9, workers: int = 1) -> Path:
+    """Zip the directory (or the file) into a temporary zip file.
+
+    :param compresslevel: The deflate level from 0 (fast, no compression) to 9 (slow, best compression).
+    :param workers: The number of threads that deflate blocks of large files concurrently.
+    """
     if os.path.isfile(file_path):
-        return zip_dir(Path(file_path).parent, set([Path(file_path).name]))
+        return zip_dir(Path(file_path).parent, set([Path(file_path).name]), compresslevel, workers)
     from tira.third_party_integrations import temporary_directory
 
     zip_file = temporary_directory()
     zip_file = zip_file / "tira-upload.zip"
 
-    zf = zipfile.ZipFile(zip_file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9)
-    for root, _, files in os.walk(file_path):
-        for name in files:
-            if allow_list is not None and name not in allow_list:
-                continue
-            filePath = os.path.join(root, name)
-            zf.write(filePath, arcname=Path(filePath).relative_to(file_path))
+    zf = zipfile.ZipFile(zip_file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for root, _, files in os.walk(file_path):
+            for name in files:
+                if allow_list is not None and name not in allow_list:
+                    continue
+                filePath = os.path.join(root, name)
+                arcname = str(Path(filePath).relative_to(file_path))
+                if executor and os.path.getsize(filePath) > ZIP_BLOCK_SIZE:
+                    _write_deflated_concurrently(zf, Path(filePath), arcname, compresslevel, executor, workers)
+                else:
+                    zf.write(filePath, arcname=arcname)
+    finally:
+        if executor:
+            executor.shutdown()
 
     zf.close()
     return zip_file
 
 
+def _deflate_block(block: bytes, previous: bytes, compresslevel: int, last: bool) -> bytes:
+    # Raw deflate streams that end with a sync flush can be concatenated, and priming the compressor with the end of
+    # the previous block keeps the compression ratio close to the one of a single stream (as pigz does).
+    kwargs = {"zdict": previous} if previous else {}
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS, **kwargs)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _write_deflated_concurrently(
+    zf: zipfile.ZipFile, path: Path, arcname: str, compresslevel: int, executor: ThreadPoolExecutor, workers: int
+) -> None:
+    """Add the file to the zip file with its blocks deflated by the executor, the blocks are written in order."""
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC, zinfo.compress_size = 0, 0
+    zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    blocks = max(1, -(-zinfo.file_size // ZIP_BLOCK_SIZE))
+
+    zinfo.header_offset = zf.fp.tell()
+    # The header is rewritten with the final sizes and checksum once all blocks are written.
+    zf.fp.write(zinfo.FileHeader(zip64))
+
+    crc, compress_size, previous = 0, 0, b""
+    pending: "deque" = deque()
+    with open(path, "rb") as f:
+        for i in range(blocks):
+            block = f.read(ZIP_BLOCK_SIZE)
+            crc = zlib.crc32(block, crc)
+            pending.append(executor.submit(_deflate_block, block, previous, compresslevel, i == blocks - 1))
+            previous = block[-_DEFLATE_WINDOW:]
+
+            while pending and (len(pending) >= 2 * workers or i == blocks - 1):
+                compressed = pending.popleft().result()
+                compress_size += len(compressed)
+                zf.fp.write(compressed)
+
+    zinfo.CRC, zinfo.compress_size = crc, compress_size
+    end = zf.fp.tell()
+    zf.fp.seek(zinfo.header_offset)
+    zf.fp.write(zinfo.FileHeader(zip64))
+    zf.fp.seek(end)
+
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = end
+
+
 def stream_all_lines(
     input_file: Union[str, Iterable[bytes], Path], load_default_text: bool
 ) -> Generator[Dict, Any, Any]:
@@ -888,6 +1049,8 @@ def load_output_of_directory(directory: Path, evaluation: bool = False) -> "Unio
 
         return ret
     else:
+        import pandas as pd
+
         return pd.read_json(files, lines=True, orient="records")
 
 
@@ -1,19 +1,36 @@
 import copy
 import gzip
 import json
+import multiprocessing
 import os
+import sys
 from base64 import b64encode
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from hashlib import md5
+from itertools import islice
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Iterable, Iterator, List, Optional
 
 import pandas as pd
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 from trectools import TrecRun
 
+from tira.check_format import CONF_MAX_SIZE_MB, RunFormat
+from tira.ir_datasets_util import SeenIds
 from tira.third_party_integrations import default_tira_cache_dir, persist_and_normalize_run, temporary_directory
 
+# The number of documents that are serialized (and compressed) together by a worker.
+DOCS_BATCH_SIZE = 10_000
+
+
+def _numeric_if_possible(column: "pd.Series") -> "pd.Series":
+    try:
+        return pd.to_numeric(column)
+    except (TypeError, ValueError):
+        return column
+
 
 class IrDatasetsLoader(object):
     """Base class for loading datasets in a standardized format"""
@@ -26,8 +43,11 @@ class IrDatasetsLoader(object):
         except Exception:
             raise ValueError(f"Could not load the dataset {ir_datasets_id}. Does it exist?")
 
-    def yield_docs(self, dataset, include_original, skip_duplicate_ids, allowlist_path_ids):
-        already_covered_ids = set()
+    def filter_docs(self, dataset, skip_duplicate_ids, allowlist_path_ids) -> "Iterator[Any]":
+        """The documents of the dataset that are in the allow list (if any). Duplicated ids are detected over all
+        documents via compact hashes of their ids (see SeenIds), so that no duplicate is written.
+        """
+        seen_ids = SeenIds() if skip_duplicate_ids else None
         allowed_ids = set()
         if allowlist_path_ids:
             with open(allowlist_path_ids, "r") as inp_file:
@@ -35,15 +55,67 @@ class IrDatasetsLoader(object):
                     allowed_ids.add(i.strip())
             print("I use a allow list of size ", len(allowed_ids))
 
-        for doc in tqdm(dataset.docs_iter(), "Load Documents"):
-            if skip_duplicate_ids and doc.doc_id in already_covered_ids:
-                continue
+        for doc in dataset.docs_iter():
             if allowlist_path_ids and str(doc.doc_id) not in allowed_ids:
                 continue
+            if seen_ids and seen_ids.seen(doc.doc_id):
+                continue
+
+            yield doc
 
+    def yield_docs(self, dataset, include_original, skip_duplicate_ids, allowlist_path_ids):
+        for doc in tqdm(self.filter_docs(dataset, skip_duplicate_ids, allowlist_path_ids), "Load Documents"):
             yield self.map_doc(doc, include_original)
-            if skip_duplicate_ids:
-                already_covered_ids.add(doc.doc_id)
+
+    def serialize_docs(self, docs: "List[Any]", include_original: bool, compress: bool) -> bytes:
+        """The mapped documents as jsonl, optionally as a gzip member so that batches can be concatenated."""
+        ret = "".join(self.map_doc(doc, include_original) + "\n" for doc in docs).encode("utf-8")
+        return gzip.compress(ret) if compress else ret
+
+    def write_docs(
+        self,
+        dataset,
+        path: Path,
+        include_original: bool,
+        skip_duplicate_ids: bool,
+        allowlist_path_ids: "Optional[Path]",
+        workers: int = 1,
+    ) -> None:
+        """Write the documents to the path (gzip compressed if it ends with .gz).
+
+        With multiple workers, batches of documents are serialized and compressed in a pool of processes and written
+        in the order of the dataset. The documents are written sequentially if this is a daemonic process (e.g., a
+        celery worker) that is not allowed to have children.
+        """
+        if workers <= 1 or multiprocessing.current_process().daemon:
+            self.write_lines_to_file(
+                self.yield_docs(dataset, include_original, skip_duplicate_ids, allowlist_path_ids), path
+            )
+            return
+
+        if path.exists():
+            raise RuntimeError(f"File already exists: {path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compress = os.path.abspath(path).endswith(".gz")
+        docs = self.filter_docs(dataset, skip_duplicate_ids, allowlist_path_ids)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool, path.open("wb") as file:
+            with tqdm(desc="Load Documents", unit="docs") as progress:
+
+                def write_batch():
+                    num_docs, serialized_docs = pending.popleft()
+                    file.write(serialized_docs.result())
+                    progress.update(num_docs)
+
+                # Serialize a bounded number of batches ahead of the writer while keeping their order.
+                pending: "deque" = deque()
+                for batch in iter(lambda: list(islice(docs, DOCS_BATCH_SIZE)), []):
+                    pending.append((len(batch), pool.submit(self.serialize_docs, batch, include_original, compress)))
+                    if len(pending) > 2 * workers:
+                        write_batch()
+
+                while pending:
+                    write_batch()
 
     def load_dataset_for_fullrank(
         self,
@@ -55,6 +127,8 @@ class IrDatasetsLoader(object):
         skip_qrels=False,
         skip_duplicate_ids=True,
         allowlist_path_ids: "Optional[Path]" = None,
+        workers: int = 1,
+        compress_documents: bool = False,
     ) -> None:
         """Loads a dataset through the ir_datasets package by the given ir_datasets ID.
         Maps documents, queries, qrels to a standardized format in preparation for full-rank operations with PyTerrier.
@@ -65,17 +139,24 @@ class IrDatasetsLoader(object):
         @param include_original {False}: flag which signals if the original data of documents and queries should be included
         @param skip_duplicate_ids: Should this pipeline skip duplicate ids?
         @param allowlist_path_ids: skip ids not in the allowlist (e.g., for filtering the subcategories of the ClueWebs)
+        @param workers: the number of processes that serialize and compress the documents
+        @param compress_documents: write documents.jsonl.gz instead of documents.jsonl
         """
         dataset = self.load_irds(ir_datasets_id)
 
         if not skip_documents and output_dataset_path:
-            self.write_lines_to_file(
-                self.yield_docs(dataset, include_original, skip_duplicate_ids, allowlist_path_ids),
-                output_dataset_path / "documents.jsonl",
+            self.write_docs(
+                dataset,
+                output_dataset_path / ("documents.jsonl.gz" if compress_documents else "documents.jsonl"),
+                include_original,
+                skip_duplicate_ids,
+                allowlist_path_ids,
+                workers,
             )
 
-        queries_mapped_jsonl = [self.map_query_as_jsonl(query, include_original) for query in dataset.queries_iter()]
-        queries_mapped_xml = [self.map_query_as_xml(query, include_original) for query in dataset.queries_iter()]
+        queries = list(dataset.queries_iter())
+        queries_mapped_jsonl = [self.map_query_as_jsonl(query, include_original) for query in queries]
+        queries_mapped_xml = [self.map_query_as_xml(query, include_original) for query in queries]
 
         if not skip_qrels:
             try:
@@ -230,20 +311,24 @@ class IrDatasetsLoader(object):
         return f"{qrel.query_id} {qrel.iteration} {qrel.doc_id} {qrel.relevance}"
 
     def load_run_file(self, run_file: Path) -> list:
-        if not os.path.abspath(run_file).endswith("run.txt"):
-            run_file = run_file / "run.txt"
-
-        run = pd.read_csv(
-            os.path.abspath(run_file), sep="\\s+", names=["qid", "Q0", "docno", "rank", "score", "system"]
-        )
-        run = run.copy().sort_values(["qid", "score", "docno"], ascending=[True, False, False]).reset_index()
+        run_file = Path(run_file)
+        run_format = RunFormat()
+        run_format.apply_configuration_and_throw_if_invalid({CONF_MAX_SIZE_MB: sys.maxsize})
+        if run_file.is_dir():
+            run_file = run_format.file_path(run_file)
+
+        run = run_format.file_columns(run_file).rename(columns={"q0": "Q0"})
+        # ids are typed as pandas.read_csv infers them (e.g., numeric qids as int) so that the order stays the same.
+        for column in ["qid", "Q0", "docno", "system"]:
+            run[column] = _numeric_if_possible(run[column])
+        run = run.sort_values(["qid", "score", "docno"], ascending=[True, False, False]).reset_index()
         run = run.groupby("qid")[["qid", "Q0", "docno", "rank", "score", "system"]].head(1000)
 
         # Make sure that rank position starts by 1
         run["rank"] = 1
         run["rank"] = run.groupby("qid")["rank"].cumsum()
 
-        return [i.to_dict() for _, i in run[["qid", "Q0", "docno", "rank", "score", "system"]].iterrows()]
+        return run[["qid", "Q0", "docno", "rank", "score", "system"]].to_dict("records")
 
     def get_docs_by_ids(self, dataset, doc_ids: set[str]) -> dict[Any, Any]:
         docstore = dataset.docs_store()
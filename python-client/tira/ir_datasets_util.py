@@ -1,10 +1,18 @@
+import gzip
+import json
+import keyword
 import logging
+import mmap
 import os
+import struct
+from collections import namedtuple
 from copy import deepcopy
+from functools import lru_cache
+from hashlib import md5
 from pathlib import Path
 from typing import TYPE_CHECKING, List, NamedTuple
 
-from tira.io_utils import stream_all_lines
+from tira.io_utils import parse_jsonl_line, stream_all_lines
 from tira.tirex import IRDS_TO_TIREX_DATASET
 
 original_ir_datasets_load = None
@@ -16,6 +24,8 @@ except ImportError:
     pass
 
 if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+
     from .tira_client import TiraClient
 
 
@@ -55,6 +65,199 @@ class DictDocsstore:
             yield self.get(docid)
 
 
+def _doc_id_hash(doc_id: "Any") -> bytes:
+    return md5(str(doc_id).encode("utf-8")).digest()[:8]
+
+
+def _doc_id_of_line(line: bytes) -> str:
+    doc = json.loads(line)
+    return str(doc["docno"] if "docno" in doc else doc["doc_id"])
+
+
+class OffsetIndexDocsstore:
+    """A docs store for jsonl(.gz) files that keeps only an index of byte offsets on disk instead of all documents in
+    memory. The index is built once per input file and cached next to it (or in the TIRA cache directory if the
+    directory of the file is not writable). Documents are parsed on demand from the memory-mapped (uncompressed) file.
+
+    The index consists of records (hash of the doc_id, offset, length) that are sorted by the hash so that a document
+    is found via binary search. If a doc_id occurs multiple times, its first occurrence is used (as in docs_iter).
+    """
+
+    INDEX_VERSION = 1
+    _RECORD = struct.Struct(">8sQI")
+
+    def __init__(self, input_file: "Union[str, Path]", parse: "Callable[[bytes], Any]") -> None:
+        """
+        :param input_file: The documents.jsonl or documents.jsonl.gz file.
+        :param parse: Parses a line of the file into a document.
+        """
+        self.input_file = Path(input_file).absolute()
+        self.parse = parse
+        self.__metadata: "Optional[dict]" = None
+        self.__index: "Optional[mmap.mmap]" = None
+        self.__data: "Optional[mmap.mmap]" = None
+
+    def __getitem__(self, item):
+        ret = self.get(item)
+        if ret is None:
+            raise KeyError(item)
+        return ret
+
+    def get(self, item):
+        line = self.__line(item)
+        return None if line is None else self.parse(line)
+
+    def __iter__(self) -> "Iterator[str]":
+        index, data = self.__mmaps()
+        for i in range(len(index) // self._RECORD.size):
+            _, offset, length = self._RECORD.unpack_from(index, i * self._RECORD.size)
+            yield _doc_id_of_line(data[offset : offset + length])
+
+    def __len__(self) -> int:
+        return self.docs_count()
+
+    def docs_count(self) -> int:
+        return self.__load_metadata()["docs_count"]
+
+    def get_many_iter(self, docids):
+        for docid in docids:
+            yield self.get(docid)
+
+    def index_directory(self) -> Path:
+        ret = self.input_file.parent / f".{self.input_file.name}.offsets"
+        if os.access(self.input_file.parent, os.W_OK) or ret.is_dir():
+            return ret
+
+        from tira.third_party_integrations import default_tira_cache_dir
+
+        key = md5(str(self.input_file).encode("utf-8")).hexdigest()
+        return Path(default_tira_cache_dir()) / "docs-offsets" / key
+
+    def __line(self, doc_id: "Any") -> "Optional[bytes]":
+        index, data = self.__mmaps()
+        expected_hash, doc_id = _doc_id_hash(doc_id), str(doc_id)
+        size = self._RECORD.size
+
+        low, high = 0, len(index) // size
+        while low < high:
+            mid = (low + high) // 2
+            if index[mid * size : mid * size + 8] < expected_hash:
+                low = mid + 1
+            else:
+                high = mid
+
+        # Different doc_ids with the same hash are adjacent in the index.
+        while low < len(index) // size:
+            actual_hash, offset, length = self._RECORD.unpack_from(index, low * size)
+            if actual_hash != expected_hash:
+                break
+            line = data[offset : offset + length]
+            if _doc_id_of_line(line) == doc_id:
+                return line
+            low += 1
+
+        return None
+
+    def __mmaps(self) -> "Tuple[Any, Any]":
+        if self.__index is None:
+            metadata = self.__load_metadata()
+            self.__index = self.__mmap(self.index_directory() / "offsets.idx")
+            self.__data = self.__mmap(Path(metadata["data_file"]))
+
+        return self.__index, self.__data
+
+    @staticmethod
+    def __mmap(path: Path) -> "Any":
+        if path.stat().st_size == 0:
+            return b""
+
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __fingerprint(self) -> dict:
+        stat = self.input_file.stat()
+        return {"version": self.INDEX_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def __load_metadata(self) -> dict:
+        if self.__metadata is None:
+            metadata_file = self.index_directory() / "metadata.json"
+            try:
+                metadata = json.loads(metadata_file.read_text())
+                if metadata["fingerprint"] != self.__fingerprint() or not Path(metadata["data_file"]).is_file():
+                    metadata = None
+            except (OSError, ValueError, KeyError):
+                metadata = None
+
+            self.__metadata = metadata if metadata else self.__build_index()
+
+        return self.__metadata
+
+    def __build_index(self) -> dict:
+        index_directory = self.index_directory()
+        index_directory.mkdir(parents=True, exist_ok=True)
+        fingerprint = self.__fingerprint()
+        logging.info(f"Build the offset index of {self.input_file} in {index_directory}.")
+
+        if self.input_file.name.endswith(".gz"):
+            data_file = index_directory / "documents.jsonl"
+            tmp_file = index_directory / f"documents.jsonl.{os.getpid()}.tmp"
+            with gzip.open(self.input_file, "rb") as src, open(tmp_file, "wb") as target:
+                records = self.__records(src, target)
+            tmp_file.replace(data_file)
+        else:
+            data_file = self.input_file
+            with open(self.input_file, "rb") as src:
+                records = self.__records(src, None)
+
+        records.sort()
+        unique_records = []
+        with open(data_file, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if records else b""
+            doc_ids_with_hash: "set[str]" = set()
+            for i, record in enumerate(records):
+                if i == 0 or record[:8] != records[i - 1][:8]:
+                    unique_records.append(record)
+                    doc_ids_with_hash = set()
+                    continue
+
+                # Hash collisions and duplicated doc_ids are rare, so only their lines are parsed again.
+                if not doc_ids_with_hash:
+                    doc_ids_with_hash.add(self.__doc_id_of_record(data, unique_records[-1]))
+                doc_id = self.__doc_id_of_record(data, record)
+                if doc_id not in doc_ids_with_hash:
+                    doc_ids_with_hash.add(doc_id)
+                    unique_records.append(record)
+
+        tmp_file = index_directory / f"offsets.idx.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            for record in unique_records:
+                f.write(record)
+        tmp_file.replace(index_directory / "offsets.idx")
+
+        metadata = {"fingerprint": fingerprint, "data_file": str(data_file), "docs_count": len(unique_records)}
+        tmp_file = index_directory / f"metadata.json.{os.getpid()}.tmp"
+        tmp_file.write_text(json.dumps(metadata))
+        tmp_file.replace(index_directory / "metadata.json")
+
+        return metadata
+
+    def __records(self, src: "Iterable[bytes]", target: "Optional[Any]") -> "List[bytes]":
+        ret = []
+        offset = 0
+        for line in src:
+            if target is not None:
+                target.write(line)
+            if line.strip():
+                ret.append(self._RECORD.pack(_doc_id_hash(_doc_id_of_line(line)), offset, len(line)))
+            offset += len(line)
+
+        return ret
+
+    def __doc_id_of_record(self, data: "Any", record: bytes) -> str:
+        _, offset, length = self._RECORD.unpack(record)
+        return _doc_id_of_line(data[offset : offset + length])
+
+
 def register_dataset_from_re_rank_file(ir_dataset_id, df_re_rank, original_ir_datasets_id=None):
     """
     Load a dynamic ir_datasets integration from a given re_rank_file.
@@ -88,75 +291,107 @@ def translate_irds_id_to_tirex(dataset: str) -> str:
     return IRDS_TO_TIREX_DATASET.get(dataset, dataset)
 
 
-def __docs(input_file, original_dataset, load_default_text):
-    from ir_datasets.formats import BaseDocs, GenericDoc
+FIELDS_TO_SKIP_FROM_ADDITIONAL = frozenset(
+    ["text", "default_text", "original_document", "docno", "doc_id", "docid", "id", "qid", "query", "rank", "score"]
+)
+
+
+class SeenIds:
+    """Detects duplicated ids over all ids seen so far. Only 8-byte hashes of the ids are kept (as in the offset index
+    of the docs store), so that the memory is a fraction of the memory of the ids themselves. Two different ids have
+    the same hash with a probability of about n^2 / 2^65 for n ids, e.g., below 0.1% for 100 million ids.
+    """
+
+    def __init__(self) -> None:
+        self.__hashes: "set[int]" = set()
+
+    def seen(self, id: "Any") -> bool:
+        """Whether the id was seen before, otherwise the id is added to the seen ids."""
+        hash = int.from_bytes(_doc_id_hash(id), "big")
+        if hash in self.__hashes:
+            return True
+
+        self.__hashes.add(hash)
+        return False
+
+
+@lru_cache(maxsize=1024)
+def _tirex_doc_schema(keys: "Tuple[str, ...]") -> "Tuple[type, Tuple[str, ...]]":
+    """The document class and the additional fields for documents with the given keys.
 
-    fields_to_skip_from_additional = set(
-        ["text", "default_text", "original_document", "docno", "doc_id", "docid", "id", "qid", "query", "rank", "score"]
+    All documents with the same keys (usually all documents of a file) share one tuple-backed class, so that documents
+    need no per-instance dict and their fields are accessed like the fields of a GenericDoc. Keys that are no valid
+    attribute names are skipped.
+    """
+    from ir_datasets.formats import GenericDoc
+
+    fields = tuple(
+        k
+        for k in keys
+        if k not in FIELDS_TO_SKIP_FROM_ADDITIONAL and k.isidentifier() and not keyword.iskeyword(k) and k[0] != "_"
     )
 
-    class TirexDoc(GenericDoc):
-        def __init__(self, doc_id, text):
-            super().__init__()
-            self._dict = {}
+    class TirexDoc(namedtuple("TirexDoc", ("doc_id", "text") + fields), GenericDoc):
+        __slots__ = ()
 
-        def __getattr__(self, key):
-            if key in self._dict:
-                return self._dict[key]
-            else:
-                return super().__getattribute__(key)
+    return TirexDoc, fields
 
-        def _set(self, key, value):
-            self._dict[key] = value
+
+def __docs(input_file, original_dataset, load_default_text):
+    from ir_datasets.formats import BaseDocs
 
     class DynamicDocs(BaseDocs):
-        def __init__(self, input_file, load_default_text):
+        def __init__(self, input_file, load_default_text, deduplicate=True):
+            """
+            :param deduplicate: Skip documents whose doc_id occurred before, so that docs_iter yields as many documents
+                as docs_count.
+            """
             self.docs = None
             self.input_file = input_file
             self.load_default_text = load_default_text
+            self.deduplicate = deduplicate
 
         def docs_iter(self):
             return self.stream_docs()
 
         def docs_count(self):
-            return sum(1 for _ in self.stream_docs())
+            return self.docs_store().docs_count()
 
         def docs_store(self):
-            return DictDocsstore(self.__parsed_docs())
-
-        def __parsed_docs(self):
-            if self.docs is None:
-                d = {}
-                for i in self.stream_docs():
-                    d[i.doc_id] = i
+            input_file = self.get_input_file()
+            if not os.path.isfile(input_file):
+                return DictDocsstore(self.__parsed_docs())
 
-                self.docs = d
+            if self.docs is None or self.docs.input_file != Path(input_file).absolute():
+                self.docs = OffsetIndexDocsstore(
+                    input_file, lambda line: self.to_doc(parse_jsonl_line(line, self.load_default_text))
+                )
 
             return self.docs
 
+        def __parsed_docs(self):
+            ret = {}
+            for i in self.stream_docs():
+                ret.setdefault(i.doc_id, i)
+            return ret
+
         def stream_docs(self):
-            already_covered = set()
+            seen_docnos = SeenIds() if self.deduplicate else None
             for i in stream_all_lines(self.get_input_file(), self.load_default_text):
-                docno = i["docno"] if "docno" in i else i["doc_id"]
-                if docno not in already_covered:
-                    already_covered.add(docno)
-                    text = i["text"] if "text" in i else i["default_text"]
-                    ret = TirexDoc(doc_id=docno, text=text)
-                    additional_fields = {}
-
-                    for k, v in i.items():
-                        if k not in fields_to_skip_from_additional:
-                            additional_fields[k] = v
-
-                    if "original_document" in i:
-                        for k, v in i["original_document"].items():
-                            if k not in fields_to_skip_from_additional:
-                                additional_fields[k] = v
-
-                    for k, v in additional_fields.items():
-                        ret._set(k, v)
-
-                    yield ret
+                if seen_docnos and seen_docnos.seen(i["docno"] if "docno" in i else i["doc_id"]):
+                    continue
+
+                yield self.to_doc(i)
+
+        def to_doc(self, i):
+            docno = i["docno"] if "docno" in i else i["doc_id"]
+            text = i["text"] if "text" in i else i["default_text"]
+
+            if "original_document" in i:
+                i = {**i, **i["original_document"]}
+
+            doc_cls, fields = _tirex_doc_schema(tuple(i))
+            return doc_cls(docno, text, *[i[k] for k in fields])
 
         def get_input_file(self):
             if type(self.input_file) is str:
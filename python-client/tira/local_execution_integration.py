@@ -7,17 +7,17 @@ import sys
 import tarfile
 import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
-import docker
-import pandas as pd
-
 from tira.io_utils import environment_variables_to_forward
 from tira.tirex_tracker import tirex_tracker_mounts_or_none
 
 if TYPE_CHECKING:
+    import docker
+
     from .tira_client import TiraClient
 
 
@@ -25,6 +25,7 @@ class LocalExecutionIntegration:
     def __init__(self, tira_client=None):
         self.tira_client = tira_client
         self.running_docker_images = {}
+        self.__return_codes = {}
 
     def __docker_run_cpu_limits(self, cpu_count, platform):
         if cpu_count is None:
@@ -227,7 +228,9 @@ class LocalExecutionIntegration:
     def docker_is_installed_failsave(self) -> bool:
         return self.__docker_client() is not None
 
-    def __docker_client(self) -> docker.DockerClient:
+    def __docker_client(self) -> "docker.DockerClient":
+        import docker
+
         try:
             environ = os.environ.copy()
             if sys.platform == "linux" and "DOCKER_HOST" not in environ:
@@ -380,6 +383,8 @@ class LocalExecutionIntegration:
         return ret
 
     def tirex_tracker_available_in_docker_image(self, image: str, client: "Optional[DockerClient]" = None) -> bool:
+        import docker
+
         if client is None:
             client = self.__docker_client()
 
@@ -442,6 +447,8 @@ class LocalExecutionIntegration:
             f" {output_dir}/:/tira-data/output --entrypoint sh {image} -c '{command}'"
         )
 
+        import docker
+
         device_requests = []
         environment = {}
         if "NVIDIA_VISIBLE_DEVICES" in os.environ:
@@ -567,6 +574,93 @@ class LocalExecutionIntegration:
 
         run_tmp(output_dir)
 
+    def __independent_stages(self, stages):
+        """Group the previous stages into batches that only depend on stages of earlier batches."""
+        dependencies = {}
+        for stage in stages:
+            ds = self.tira_client.docker_software(approach=None, software_id=stage)
+            dependencies[stage] = set(ds.get("ids_of_previous_stages") or []).intersection(stages)
+
+        ret = []
+        done = set()
+        while len(done) < len(stages):
+            batch = [i for i in stages if i not in done and dependencies[i].issubset(done)]
+            if not batch:
+                raise ValueError(f"The previous stages {stages} have cyclic dependencies.")
+            ret += [batch]
+            done.update(batch)
+
+        return ret
+
+    def __parallel_stages(self, stages, gpu_count, gpu_device_ids, cpu_count):
+        """Independent stages run concurrently as long as they do not compete for the GPU or exceed the cpu budget."""
+        if stages <= 1 or gpu_count or gpu_device_ids:
+            return 1
+
+        # Without a cpu budget, the containers share all cpus, so up to one stage per cpu runs concurrently.
+        cpus_per_stage = float(cpu_count) if cpu_count else 1.0
+        return max(1, min(stages, int((os.cpu_count() or 1) // cpus_per_stage)))
+
+    def __stage_output_cache(self):
+        from tira.stage_output_cache import StageOutputCache
+        from tira.third_party_integrations import default_tira_cache_dir
+
+        cache_dir = getattr(self.tira_client, "tira_cache_dir", None)
+        return StageOutputCache(Path(default_tira_cache_dir(cache_dir)) / "stage-outputs")
+
+    def __run_previous_stage(self, previous_stage, input_dir, dry_run, docker_software_id_to_output, stage_cache):
+        args = {
+            "software_id": previous_stage,
+            "identifier": None,
+            "image": None,
+            "command": None,
+            "input_dir": input_dir,
+            "evaluate": False,
+            "dry_run": dry_run,
+            "docker_software_id_to_output": docker_software_id_to_output,
+            "stage_cache": stage_cache,
+        }
+
+        if not stage_cache:
+            output_dir = tempfile.TemporaryDirectory("-staged-execution-" + previous_stage).name + "/output"
+            return self.run(output_dir=output_dir, **args)
+
+        ds = self.tira_client.docker_software(approach=None, software_id=previous_stage)
+        previous_outputs = dict(docker_software_id_to_output)
+        if any(i not in previous_outputs for i in ds.get("ids_of_previous_stages") or []):
+            # The stage depends on stages that are not executed yet, they are cached individually on their execution.
+            output_dir = tempfile.TemporaryDirectory("-staged-execution-" + previous_stage).name + "/output"
+            return self.run(output_dir=output_dir, **args)
+
+        client = self.__docker_client()
+        self.ensure_image_available_locally(ds["tira_image_name"], client)
+        cache = self.__stage_output_cache()
+        key = cache.key(
+            client.api.inspect_image(ds["tira_image_name"])["Id"],
+            self.__normalize_command(ds["command"], False),
+            input_dir,
+            previous_outputs.values(),
+        )
+
+        cached_output = cache.get(key)
+        if cached_output is not None:
+            print(f"Use the cached output of the previous stage {previous_stage} from {cached_output}.")
+            previous_outputs[ds["id"]] = str(cached_output)
+            return previous_outputs
+
+        output_dir = str(cache.staging_directory(key))
+        ret = self.run(output_dir=output_dir, **args)
+
+        output_is_empty = not Path(output_dir).is_dir() or not any(Path(output_dir).iterdir())
+        if self.__return_codes.pop(output_dir, None) != 0 or output_is_empty:
+            # Do not cache failed executions. The tirex tracker does not forward return codes, so failures that exit
+            # with status 0 are recognized by their empty output. The staging directory is kept for inspection until
+            # it is evicted as stale.
+            return ret
+
+        cached_output = str(cache.put(key, output_dir))
+        return {k: cached_output if v == output_dir else v for k, v in ret.items()}
+
     def run(
         self,
         identifier=None,
@@ -592,6 +686,7 @@ class LocalExecutionIntegration:
         task_workflow_configuration=None,
         software_workflow_configuration=None,
         dynamic_mounts=None,
+        stage_cache=True,
     ):
         if task_workflow_configuration is not None or software_workflow_configuration is not None:
             self.run_workflow(
@@ -657,23 +752,21 @@ class LocalExecutionIntegration:
             {} if not docker_software_id_to_output else deepcopy(docker_software_id_to_output)
         )
 
-        for previous_stage in previous_stages:
-            if previous_stage in docker_software_id_to_output.keys():
-                continue
-
-            tmp_prev_stages = self.run(
-                software_id=previous_stage,
-                identifier=None,
-                image=None,
-                command=None,
-                input_dir=input_dir,
-                evaluate=False,
-                dry_run=dry_run,
-                output_dir=tempfile.TemporaryDirectory("-staged-execution-" + previous_stage).name + "/output",
-                docker_software_id_to_output=docker_software_id_to_output,
-            )
-            for k, v in tmp_prev_stages.items():
-                docker_software_id_to_output[k] = v
+        stages_to_run = [i for i in previous_stages if i not in docker_software_id_to_output]
+        for stages in self.__independent_stages(stages_to_run):
+            max_workers = self.__parallel_stages(len(stages), gpu_count, gpu_device_ids, cpu_count)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                outputs = list(
+                    executor.map(
+                        lambda i: self.__run_previous_stage(
+                            i, input_dir, dry_run, docker_software_id_to_output, stage_cache and not dry_run
+                        ),
+                        stages,
+                    )
+                )
+            for tmp_prev_stages in outputs:
+                for k, v in tmp_prev_stages.items():
+                    docker_software_id_to_output[k] = v
 
         verbose_data = self.construct_verbosity_output(input_dir, output_dir, image, command, original_args)
         logging.debug(
@@ -728,6 +821,8 @@ class LocalExecutionIntegration:
         if input_run:
             environment["inputRun"] = "/tira-data/input-run"
 
+        import docker
+
         device_requests = []
         if gpu_count != 0:
             device_requests = [docker.types.DeviceRequest(count=gpu_count, capabilities=[["gpu"]])]
@@ -774,6 +869,7 @@ class LocalExecutionIntegration:
                 print(line.decode("utf-8"))
 
             return_code = container.wait()
+            self.__return_codes[output_dir] = return_code.get("StatusCode") if isinstance(return_code, dict) else None
             # TODO: add flag to fail if the return_code["StatusCode"]) is not 0, to have this, we first need to fix the bug in the tirex tracker to properly forward return codes
         finally:
             self.running_docker_images.pop(container.id, None)
@@ -785,6 +881,8 @@ class LocalExecutionIntegration:
             approach_name = identifier if identifier else f'"{command}"@{image}'
             eval_results = {"approach": approach_name, "evaluate": evaluate}
             eval_results.update(self.load_output_of_directory(Path(eval_dir), evaluation=True))
+            import pandas as pd
+
             return self.load_output_of_directory(Path(eval_dir)), pd.DataFrame([eval_results])
         else:
             docker_software_id_to_output[s_id] = output_dir
@@ -918,6 +1016,8 @@ class LocalExecutionIntegration:
         return new_image
 
     def push_image_third_party_registry(self, image, remote_tag):
+        import docker
+
         client = docker.from_env()
         client.images.get(image).tag(remote_tag)
 
@@ -0,0 +1,164 @@
+"""A bounded cache for the json responses of the TIRA REST API.
+
+Entries are evicted in least-recently-used order once the cache is full and expire after a time-to-live that can be
+configured per endpoint. Expired entries are kept so that they can be revalidated with a conditional request (ETag or
+If-Modified-Since) instead of transferring the response again.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# The time-to-live in seconds of responses per endpoint prefix, None never expires. The longest matching prefix wins.
+DEFAULT_TTLS: "Dict[str, Optional[float]]" = {
+    # Metadata of tasks, datasets, and systems changes rarely.
+    "/v1/datasets/": 3600,
+    "/v1/systems/": 3600,
+    "/api/datasets_by_task/": 3600,
+    "/tira-backend/api/task-list": 3600,
+    # The state of jobs and evaluations changes while clients wait for them.
+    "/v1/admin/active-jobs/": 10,
+    "/api/evaluations/": 60,
+    "/api/submissions/": 60,
+    "/api/list-runs/": 60,
+}
+
+
+class CachedResponse:
+    def __init__(
+        self,
+        value: Any,
+        expires: "Optional[float]",
+        etag: "Optional[str]" = None,
+        last_modified: "Optional[str]" = None,
+    ):
+        self.value = value
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return self.expires is None or time.time() < self.expires
+
+    def conditional_headers(self) -> "Dict[str, str]":
+        """The headers to revalidate this response with the server."""
+        ret = {}
+        if self.etag:
+            ret["If-None-Match"] = self.etag
+        if self.last_modified:
+            ret["If-Modified-Since"] = self.last_modified
+
+        return ret
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: "Optional[float]" = 600,
+        ttls: "Optional[Dict[str, Optional[float]]]" = None,
+        persist_dir: "Optional[Union[str, Path]]" = None,
+    ):
+        """
+        :param maxsize: The maximum number of responses kept in memory.
+        :param ttl: The time-to-live in seconds of responses for endpoints without a more specific entry in ttls.
+        :param ttls: The time-to-live per endpoint prefix, defaults to DEFAULT_TTLS.
+        :param persist_dir: If given, responses are additionally persisted to this directory so that they survive
+            restarts of the process.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self.__entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(*args: Any) -> str:
+        return json.dumps(args, sort_keys=True, default=str)
+
+    def ttl_of(self, endpoint: str) -> "Optional[float]":
+        prefixes = [i for i in self.ttls if endpoint.startswith(i)]
+        return self.ttls[max(prefixes, key=len)] if prefixes else self.ttl
+
+    def get(self, key: str) -> "Optional[CachedResponse]":
+        """Return the cached response for the key (that might be expired) or None if nothing is cached."""
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                return self.__entries[key]
+
+        ret = self.__load(key)
+        if ret is not None:
+            self.__add(key, ret)
+
+        return ret
+
+    def put(
+        self,
+        key: str,
+        endpoint: str,
+        value: Any,
+        etag: "Optional[str]" = None,
+        last_modified: "Optional[str]" = None,
+    ) -> CachedResponse:
+        ttl = self.ttl_of(endpoint)
+        ret = CachedResponse(value, None if ttl is None else time.time() + ttl, etag, last_modified)
+        self.__add(key, ret)
+        self.__persist(key, ret)
+
+        return ret
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __add(self, key: str, value: CachedResponse) -> None:
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def __file(self, key: str) -> Path:
+        return self.persist_dir / (hashlib.md5(key.encode("utf-8")).hexdigest() + ".json")
+
+    def __load(self, key: str) -> "Optional[CachedResponse]":
+        if not self.persist_dir or not self.__file(key).exists():
+            return None
+
+        try:
+            ret = json.loads(self.__file(key).read_text())
+            if ret["key"] != key:
+                return None
+            return CachedResponse(ret["value"], ret["expires"], ret["etag"], ret["last_modified"])
+        except Exception as e:
+            logging.debug(f"Could not load the cached response from {self.__file(key)}.", exc_info=e)
+            return None
+
+    def __persist(self, key: str, value: CachedResponse) -> None:
+        if not self.persist_dir:
+            return
+
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.__file(key).with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_file.write_text(
+            json.dumps(
+                {
+                    "key": key,
+                    "value": value.value,
+                    "expires": value.expires,
+                    "etag": value.etag,
+                    "last_modified": value.last_modified,
+                }
+            )
+        )
+        tmp_file.replace(self.__file(key))
@@ -1,40 +1,63 @@
 import hashlib
-import io
 import json
 import logging
 import os
 import shutil
 import tempfile
+import threading
 import time
 import zipfile
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
+from http.cookiejar import DefaultCookiePolicy
 from pathlib import Path
-from random import randint
+from random import uniform
 from typing import Any, Dict, List, Optional, Union
 
-import pandas as pd
 import requests
 from tqdm import tqdm
 
 from tira.check_format import _fmt, check_format, fmt_message
-from tira.io_utils import _md5_of_file
+from tira.io_utils import (
+    _download_file_with_md5,
+    _link_or_copy,
+    _md5_of_file,
+    _partial_file,
+    _partial_file_is_complete,
+    _range_headers,
+    _stream_to_partial_file,
+)
 from tira.local_execution_integration import LocalExecutionIntegration
 from tira.pandas_integration import PandasIntegration
 from tira.profiling_integration import ProfilingIntegration
 from tira.pyterrier_integration import PyTerrierAnceIntegration, PyTerrierIntegration, PyTerrierSpladeIntegration
+from tira.response_cache import ResponseCache
 from tira.third_party_integrations import default_tira_cache_dir, temporary_directory
-from tira.tira_redirects import (
-    RESOURCE_REDIRECTS,
-    TASKS_WITH_REDIRECT_MERGING,
-    dataset_ir_redirects,
-    mirror_url,
-    redirects,
-)
+from tira.tira_redirects import RESOURCE_REDIRECTS, dataset_ir_redirects, mirror_url, redirects
 from tira.trectools_integration import TrecToolsIntegration
 
 from .tira_client import TiraClient
 
+# Uploads larger than this are sent in parts of this size, so that an interrupted upload resumes with the missing parts.
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+
+class _RateLimit:
+    """Space out the requests of concurrent threads so that at most requests_per_second requests start per second."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self.next_request = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request)
+            self.next_request = start + self.interval
+
+        time.sleep(start - now)
+
 
 class Client(TiraClient):
     base_url: str
@@ -51,6 +74,11 @@ class Client(TiraClient):
         allow_local_execution: bool = False,
         archive_base_url: "Optional[str]" = None,
         base_url_api: str = None,
+        pool_maxsize: int = 16,
+        json_cache_maxsize: int = 1024,
+        json_cache_ttl: "Optional[float]" = 600,
+        json_cache_ttls: "Optional[Dict[str, Optional[float]]]" = None,
+        persist_json_cache: bool = False,
     ):
         self._settings = None
         self.api_key_already_checked = False
@@ -62,8 +90,14 @@ class Client(TiraClient):
 
         self.verify = verify if verify is not None else self.load_settings()["verify"]
         self.failsave_max_delay = failsave_max_delay
+        self.session = self.__pooled_session(pool_maxsize)
 
-        self.json_cache = {}
+        self.json_cache = ResponseCache(
+            maxsize=json_cache_maxsize,
+            ttl=json_cache_ttl,
+            ttls=json_cache_ttls,
+            persist_dir=Path(self.tira_cache_dir) / ".json-cache" if persist_json_cache else None,
+        )
 
         if api_key is None:
             self.api_key = self.load_settings()["api_key"]
@@ -84,6 +118,26 @@ class Client(TiraClient):
         self.local_execution: LocalExecutionIntegration = LocalExecutionIntegration(self)
         self.allow_local_execution = allow_local_execution
 
+    @staticmethod
+    def __pooled_session(pool_maxsize: int) -> requests.Session:
+        """A session that keeps up to pool_maxsize connections per host alive, so that subsequent (and concurrent)
+        requests do not pay for a new TCP and TLS handshake.
+        """
+        session = requests.Session()
+        # Requests stay stateless as with requests.get, i.e., cookies sent by the server are not persisted
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
+    def backoff_delay(self, attempt: int) -> float:
+        """The seconds to wait before the next retry: exponential in the attempt with jitter, capped by
+        failsave_max_delay.
+        """
+        return uniform(0.5, 1.0) * min(self.failsave_max_delay, 2**attempt)
+
     def load_settings(self):
         if self._settings is None:
             try:
@@ -182,7 +236,7 @@ class Client(TiraClient):
                 "paper_link": "",
             }
 
-        response = requests.post(url, headers=headers, json=content, verify=self.verify)
+        response = self.session.post(url, headers=headers, json=content, verify=self.verify)
         ret = response.content.decode("utf8")
         return json.loads(ret)
 
@@ -323,7 +377,7 @@ class Client(TiraClient):
         except:
             pass
 
-        ret = requests.post(url, headers=headers, json=content, verify=self.verify)
+        ret = self.session.post(url, headers=headers, json=content, verify=self.verify)
         response_code = ret.status_code
         ret = ret.content.decode("utf8")
         try:
@@ -361,6 +415,8 @@ class Client(TiraClient):
                     {**{"task": response["task_id"], "dataset": response["dataset_id"], "team": vm["vm_id"]}, **run}
                 ]
 
+        import pandas as pd
+
         return pd.DataFrame(ret)
 
     def upload_submissions(self, task_id, vm_id, upload_id, dataset=None):
@@ -419,7 +475,21 @@ class Client(TiraClient):
 
         return ret
 
-    def download_all_submissions(self, dataset_id: str, output: "Optional[str]", repackage: bool):
+    def download_all_submissions(
+        self,
+        dataset_id: str,
+        output: "Optional[str]",
+        repackage: bool,
+        workers: int = 8,
+        requests_per_second: float = 1.0,
+    ):
+        """Download the outputs of all submissions to the dataset into the output directory.
+
+        Runs are downloaded concurrently with up to workers threads, but at most requests_per_second requests to the
+        server are started per second. Runs that are already listed in the metadata.jsonl of a previous export with
+        unchanged output files are not downloaded again. Files are hard-linked (if possible) from the cache into
+        raw-outputs and outputs-flat instead of being copied.
+        """
         if not output:
             from tira.third_party_integrations import temporary_directory
 
@@ -443,38 +513,32 @@ class Client(TiraClient):
         dataset = self.get_dataset(dataset_id)
         task = dataset["default_task"]
         evals = self.evaluations(task, dataset_id)
+        rate_limit = _RateLimit(requests_per_second)
 
-        for _, i in tqdm(list(evals.iterrows())):
+        runs_to_download = []
+        for _, i in evals.iterrows():
             i = i.to_dict()
             i["tira_run_id"] = i["run_id"]
+            i["raw-outputs-from-tira"] = f"raw-outputs/{dataset_id}/{i['run_id']}"
+            if not self.__run_was_exported(output, existing_runs.get(i["tira_run_id"])):
+                runs_to_download.append(i)
+            existing_runs[i["tira_run_id"]] = i
 
+        def download_run(i: "Dict[str, Any]") -> None:
+            rate_limit.wait()
             run_output = self.download_zip_to_cache_directory(task, dataset_id, i["team"], i["run_id"])
             if (raw_output_dir / i["run_id"]).exists():
                 shutil.rmtree(raw_output_dir / i["run_id"], ignore_errors=True)
-            shutil.copytree(Path(run_output).parent, raw_output_dir / i["run_id"])
-            i["raw-outputs-from-tira"] = f"raw-outputs/{dataset_id}/{i['run_id']}"
-            existing_runs[i["tira_run_id"]] = i
+            shutil.copytree(Path(run_output).parent, raw_output_dir / i["run_id"], copy_function=_link_or_copy)
 
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in tqdm(executor.map(download_run, runs_to_download), total=len(runs_to_download), desc="Download"):
+                pass
+
+        run_id_to_metadata = {}
         if repackage:
-            run_id_to_metadata = {}
-            for team in tqdm(set(i["team"] for i in existing_runs.values()), "Load metadata"):
-                url = f"/api/submissions-for-task/{task}/{team}/upload"
-                ret = self.json_response(url)
-                for upload_group in ret["context"]["all_uploadgroups"]:
-                    url = f"/api/upload-group-details/{task}/{team}/{upload_group['id']}"
-                    time.sleep(1)
-                    upload_group_details = self.json_response(url)["context"]["upload_group_details"]
-                    assert upload_group["id"] == upload_group_details["id"]
-                    for run in upload_group_details["runs"]:
-                        if run["input_run_id"] == "" and run["run_id"]:
-                            assert run["run_id"] not in run_id_to_metadata
-                            run_id_to_metadata[run["run_id"]] = {
-                                "description": upload_group_details["description"],
-                                "run_display_name": upload_group_details["display_name"],
-                                "internal_data": run,
-                            }
-        else:
-            run_id_to_metadata = {}
+            teams = sorted(set(i["team"] for i in existing_runs.values()))
+            run_id_to_metadata = self.__upload_metadata(task, teams, workers, rate_limit)
 
         with open(output / "metadata.jsonl", "w") as f:
             for i in existing_runs.values():
@@ -490,28 +554,81 @@ class Client(TiraClient):
                 f.write(json.dumps(i) + "\n")
 
         for i in tqdm(existing_runs.values()):
-            inp = output / i["raw-outputs-from-tira"] / "output"
-            assert len(glob(f"{inp}/*")) > 0
-            base_name = i["run_display_name"].replace("_", "-").replace("/", "-").replace(".", "-")
-            target_file = outputs_flat / base_name
-            suffix = 2
-            while target_file.exists():
-                target_file = outputs_flat / f"{base_name}-{suffix}"
-                suffix += 1
-            if len(glob(f"{inp}/*")) == 1:
-                inp = glob(f"{inp}/*")
-                inp = inp[0]
-                expected_md5 = _md5_of_file(Path(inp))
-                shutil.copy(inp, target_file)
-                i["md5sum"] = expected_md5
-            else:
-                shutil.copytree(inp, target_file)
-            i["flat-outputs"] = "outputs-flat/" + target_file.name
+            self.__export_flat_output(output, outputs_flat, i)
 
         with open(output / "metadata.jsonl", "w") as f:
             for i in existing_runs.values():
                 f.write(json.dumps(i) + "\n")
 
+    def __upload_metadata(
+        self, task: str, teams: "List[str]", workers: int, rate_limit: "_RateLimit"
+    ) -> "Dict[str, Dict[str, Any]]":
+        """Load the descriptions and display names of the uploaded runs of the teams by their run id."""
+        ret = {}
+        submissions = self.json_responses(
+            [f"/api/submissions-for-task/{task}/{t}/upload" for t in teams], workers, rate_limit
+        )
+        upload_groups = [
+            (team, upload_group)
+            for team, submission in zip(teams, submissions)
+            for upload_group in submission["context"]["all_uploadgroups"]
+        ]
+        details = self.json_responses(
+            [f"/api/upload-group-details/{task}/{team}/{group['id']}" for team, group in upload_groups],
+            workers,
+            rate_limit,
+        )
+
+        for (_, upload_group), detail in tqdm(zip(upload_groups, details), total=len(details), desc="Load metadata"):
+            upload_group_details = detail["context"]["upload_group_details"]
+            assert upload_group["id"] == upload_group_details["id"]
+            for run in upload_group_details["runs"]:
+                if run["input_run_id"] == "" and run["run_id"]:
+                    assert run["run_id"] not in ret
+                    ret[run["run_id"]] = {
+                        "description": upload_group_details["description"],
+                        "run_display_name": upload_group_details["display_name"],
+                        "internal_data": run,
+                    }
+
+        return ret
+
+    @staticmethod
+    def __export_flat_output(output: Path, outputs_flat: Path, run: "Dict[str, Any]") -> None:
+        """Link the raw output of the run into outputs_flat and record the md5 sums of its files in the run."""
+        inp = output / run["raw-outputs-from-tira"] / "output"
+        files = sorted(i for i in inp.rglob("*") if i.is_file())
+        assert len(files) > 0
+        base_name = run["run_display_name"].replace("_", "-").replace("/", "-").replace(".", "-")
+        target_file = outputs_flat / base_name
+        suffix = 2
+        while target_file.exists():
+            target_file = outputs_flat / f"{base_name}-{suffix}"
+            suffix += 1
+
+        run["md5sums"] = {str(i.relative_to(inp)): _md5_of_file(i) for i in files}
+        if len(files) == 1 and files[0].parent == inp:
+            _link_or_copy(files[0], target_file)
+            run["md5sum"] = run["md5sums"][files[0].name]
+        else:
+            shutil.copytree(inp, target_file, copy_function=_link_or_copy)
+        run["flat-outputs"] = "outputs-flat/" + target_file.name
+
+    @staticmethod
+    def __run_was_exported(output: Path, existing_run: "Optional[Dict[str, Any]]") -> bool:
+        """Check if all files of the run from the metadata.jsonl of a previous export are still unchanged in the
+        output directory. Exports without the md5 sums of all files (e.g., interrupted ones) are not trusted.
+        """
+        if not existing_run or "raw-outputs-from-tira" not in existing_run or "md5sums" not in existing_run:
+            return False
+
+        run_output = output / existing_run["raw-outputs-from-tira"] / "output"
+        files = {str(i.relative_to(run_output)): i for i in run_output.rglob("*") if i.is_file()}
+        if not files or files.keys() != existing_run["md5sums"].keys():
+            return False
+
+        return all(_md5_of_file(files[k]) == v for k, v in existing_run["md5sums"].items())
+
     def evaluations(self, task, dataset, join_submissions=True):
         print(task)
         response = self.json_response(f"/api/evaluations/{task}/{dataset}")["context"]
@@ -550,6 +667,8 @@ class Client(TiraClient):
 
             ret += [run]
 
+        import pandas as pd
+
         return pd.DataFrame(ret)
 
     def run_was_already_executed_on_dataset(self, approach, dataset):
@@ -563,7 +682,7 @@ class Client(TiraClient):
         headers = self.authentication_headers(url)
         headers["Accept"] = "application/csv"
 
-        resp = requests.get(url=f"https://www.tira.io/{url}", headers=headers, verify=self.verify)
+        resp = self.session.get(url=f"https://www.tira.io/{url}", headers=headers, verify=self.verify)
         resp = resp.content.decode("utf-8")
 
         headers["Accept"] = "application/json"
@@ -579,7 +698,7 @@ class Client(TiraClient):
                 + row["initial_owner"]
                 + "%2Fsummary"
             )
-            tmp = requests.get(url=url, headers=headers, verify=self.verify)
+            tmp = self.session.get(url=url, headers=headers, verify=self.verify)
             time.sleep(0.5)
             tmp = json.loads(tmp.content.decode("utf-8"))
             if not "email" in tmp:
@@ -750,6 +869,8 @@ class Client(TiraClient):
         return ret[["task", "dataset", "team", "run_id"]].iloc[0].to_dict()
 
     def download_run(self, task, dataset, software, team=None, previous_stage=None, return_metadata=False):
+        import pandas as pd
+
         mounted_output_in_sandbox = self.input_run_in_sandbox(f"{task}/{team}/{software}")
         if mounted_output_in_sandbox:
             ret = pd.read_csv(
@@ -882,6 +1003,8 @@ class Client(TiraClient):
             return Path(target_dir + f"/{run_id}/output")
 
         potential_local_matches = glob(f"{self.tira_cache_dir}/extracted_runs/{task}/{dataset}/*/{run_id}/output")
+        from tira.tira_redirects import TASKS_WITH_REDIRECT_MERGING
+
         if task in TASKS_WITH_REDIRECT_MERGING and len(potential_local_matches) == 1:
             return Path(potential_local_matches[0])
 
@@ -944,33 +1067,11 @@ class Client(TiraClient):
         if expected_md5 is None or not expected_md5:
             raise ValueError("foo")
 
-        if not (Path(self.tira_cache_dir) / ".archived" / expected_md5).exists():
-            r = requests.get(url, stream=True)
-            total = int(r.headers.get("content-length", 0))
-            status_code = r.status_code
-            if status_code < 200 or status_code >= 300:
-                raise ValueError(f"Got non 200 status code {status_code} for {url}.")
-            response_content = io.BytesIO()
-            with tqdm(
-                desc="Download",
-                total=total,
-                unit="iB",
-                unit_scale=True,
-                unit_divisor=1024,
-            ) as bar:
-                for data in r.iter_content(chunk_size=1024):
-                    size = response_content.write(data)
-                    bar.update(size)
-
-            actual_md5 = hashlib.md5(response_content.getbuffer()).hexdigest()
-            if actual_md5 != expected_md5:
-                raise ValueError(
-                    f'MD5 is unexpected: I expected "{expected_md5}" but got "{actual_md5}" for URL "{url}".'
-                )
-
-            print("Download finished. Persist...")
-            with open(Path(self.tira_cache_dir) / ".archived" / expected_md5, "wb") as file_out:
-                file_out.write(response_content.getbuffer())
+        archived_file = Path(self.tira_cache_dir) / ".archived" / expected_md5
+        if not archived_file.exists():
+            archived_file.parent.mkdir(parents=True, exist_ok=True)
+            _download_file_with_md5(url, archived_file, expected_md5, progress=True)
+            print("Download finished.")
 
         if rename_to and not subdirectory:
             Path(target_dir).mkdir(exist_ok=True, parents=True)
@@ -1008,14 +1109,15 @@ class Client(TiraClient):
             print(f"Download from Zenodo: {url}")
 
         run_id = None if ("/download/" not in url or ".zip" not in url) else url.split("/download/")[1].split(".zip")[0]
+        # The partial download is keyed by the original url, so that it is resumed from a mirror after an outage.
+        partial_file = self.__partial_download_file(url, target_dir, extract)
 
-        for _ in range(self.failsave_retries):
+        for attempt in range(self.failsave_retries):
             status_code = None
             try:
 
-                headers = self.authentication_headers()
-                r = requests.get(url, headers=headers, stream=True, verify=self.verify)
-                total = int(r.headers.get("content-length", 0))
+                headers = _range_headers(partial_file, self.authentication_headers())
+                r = self.session.get(url, headers=headers, stream=True, verify=self.verify)
                 status_code = r.status_code
                 if (
                     status_code == 302
@@ -1031,39 +1133,47 @@ class Client(TiraClient):
                     src_dir = Path(target_dir) / run_id
                     shutil.move(src_dir / uuid, src_dir / "output")
                     return
-                if status_code < 200 or status_code >= 300:
-                    raise ValueError(f"Got non 200 status code {status_code} for {url}.")
-
-                response_content = io.BytesIO()
-                with tqdm(
-                    desc="Download",
-                    total=total,
-                    unit="iB",
-                    unit_scale=True,
-                    unit_divisor=1024,
-                ) as bar:
-                    for data in r.iter_content(chunk_size=1024):
-                        size = response_content.write(data)
-                        bar.update(size)
-                if extract:
-                    print("Download finished. Extract...")
-                    z = zipfile.ZipFile(response_content)
-                    z.extractall(target_dir)
-                    print("Extraction finished: ", target_dir)
-                else:
-                    print("Download finished. Persist...")
-                    with open(target_dir, "wb") as file_out:
-                        file_out.write(response_content.getbuffer())
-                    print("Download finished: ", target_dir)
 
+                if not _partial_file_is_complete(r, partial_file):
+                    if status_code < 200 or status_code >= 300:
+                        raise ValueError(f"Got non 200 status code {status_code} for {url}.")
+
+                    _stream_to_partial_file(r, partial_file)
+
+                self.__finish_download(partial_file, target_dir, extract)
                 return
             except Exception as e:
-                sleep_time = randint(1, self.failsave_max_delay)
+                sleep_time = self.backoff_delay(attempt)
                 print(f"Code: {status_code}")
-                print(f"Error occured while fetching {url}: {e}. I will sleep {sleep_time} seconds and continue.")
+                print(f"Error occured while fetching {url}: {e}. I will sleep {sleep_time:.1f} seconds and continue.")
                 url = mirror_url(url)
                 time.sleep(sleep_time)
 
+    def __finish_download(self, partial_file: Path, target_dir: str, extract: bool) -> None:
+        """Extract the complete download in partial_file to target_dir or move it to target_dir."""
+        if not extract:
+            partial_file.replace(target_dir)
+            print("Download finished: ", target_dir)
+            return
+
+        print("Download finished. Extract...")
+        try:
+            with zipfile.ZipFile(partial_file) as z:
+                z.extractall(target_dir)
+        except zipfile.BadZipFile:
+            # A corrupted download can not be resumed, so the next attempt starts from scratch.
+            partial_file.unlink()
+            raise
+        partial_file.unlink()
+        print("Extraction finished: ", target_dir)
+
+    def __partial_download_file(self, url: str, target_dir: str, extract: bool) -> Path:
+        """The file that holds the (possibly interrupted) download of url until it is complete."""
+        if not extract:
+            return _partial_file(Path(target_dir))
+
+        return Path(self.tira_cache_dir) / ".partial" / (hashlib.md5(url.encode("utf-8")).hexdigest() + ".zip.part")
+
     def login(self, token: str) -> None:
         self.api_key = token
 
@@ -1206,27 +1316,30 @@ class Client(TiraClient):
     def running_jobs(self, task: str):
         return self.json_response(f"/v1/admin/active-jobs/admin/{task}")["context"]["jobs"]
 
-    def upload_run_anonymous(self, file_path: Path, dataset_id: str, dry_run: bool = False, verbose: bool = False):
+    def upload_run_anonymous(
+        self,
+        file_path: Path,
+        dataset_id: str,
+        dry_run: bool = False,
+        verbose: bool = False,
+        compresslevel: int = 9,
+        compression_workers: "Optional[int]" = None,
+    ):
+        """Upload the run in the directory anonymously, it can be claimed afterwards via the returned uuid.
+
+        :param compresslevel: The deflate level of the uploaded zip from 0 (fast) to 9 (small).
+        :param compression_workers: The number of threads that compress the run, defaults to the number of CPUs.
+        """
         print(f"I check that the submission in directory '{file_path}' is valid...")
         upload_to_tira = self.get_dataset(dataset_id)
 
         if isinstance(file_path, str):
             file_path = Path(file_path)
 
-        accepted_formats = []
         error_msg = ""
-
-        if isinstance(upload_to_tira.get("format"), list):
-            accepted_formats = upload_to_tira.get("format")
-        if len(accepted_formats) == 0:
-            accepted_formats = ["run.txt"]  # default format
-
-        if "run-with-metadata" in accepted_formats:
-            accepted_formats = [i for i in accepted_formats if i != "run.txt"]
-
         format_configuration = upload_to_tira.get("format_configuration")
 
-        for format in accepted_formats:
+        for format in self.__accepted_formats(upload_to_tira):
             status_code, msg = check_format(file_path, format, format_configuration)
 
             if status_code != _fmt.OK:
@@ -1255,19 +1368,11 @@ class Client(TiraClient):
             )
             return True
 
-        zip_file = zip_dir(file_path)
+        zip_file = zip_dir(file_path, compresslevel=compresslevel, workers=compression_workers or os.cpu_count() or 1)
         print("\n", flush=True)
         tqdm_zip_file = TqdmUploadFile(zip_file, f"Upload {file_path} to TIRA")
 
-        headers = {"Accept": "application/json"}
-        files = {"file": (os.path.basename(zip_file), tqdm_zip_file)}
-
-        resp = requests.post(
-            url=f"{self.base_url_api}/api/v1/anonymous-uploads/{upload_to_tira['dataset_id']}",
-            files=files,
-            headers=headers,
-            verify=self.verify,
-        )
+        resp = self.__post_anonymous_upload(zip_file, upload_to_tira["dataset_id"], tqdm_zip_file)
 
         if resp.status_code not in {200, 202}:
             message = resp.content.decode()
@@ -1295,6 +1400,29 @@ class Client(TiraClient):
             print("\t" + fmt_message(f"The data is uploaded.", _fmt.OK))
         return resp
 
+    @staticmethod
+    def __accepted_formats(dataset: "Dict[str, Any]") -> "List[str]":
+        accepted_formats = []
+        if isinstance(dataset.get("format"), list):
+            accepted_formats = dataset.get("format")
+        if len(accepted_formats) == 0:
+            accepted_formats = ["run.txt"]  # default format
+
+        if "run-with-metadata" in accepted_formats:
+            accepted_formats = [i for i in accepted_formats if i != "run.txt"]
+
+        return accepted_formats
+
+    def __post_anonymous_upload(self, zip_file: str, dataset_id: str, file: "Any") -> "requests.Response":
+        headers = {"Accept": "application/json"}
+        url = f"{self.base_url_api}/api/v1/anonymous-uploads/{dataset_id}"
+
+        if os.path.getsize(zip_file) > UPLOAD_PART_SIZE:
+            return self.upload_in_parts(zip_file, f"{url}/parts", headers, file=file)
+
+        files = {"file": (os.path.basename(zip_file), file)}
+        return self.session.post(url=url, files=files, headers=headers, verify=self.verify)
+
     def create_group(self, vm_id):
         if not vm_id or vm_id != vm_id.lower() or len(vm_id.split()) > 1:
             raise ValueError("The name of the group must be slugified: " + str(vm_id))
@@ -1412,9 +1540,16 @@ class Client(TiraClient):
             raise ValueError(f"The passed file {file_path} does not exist.")
 
         # TODO: check that task_id and vm_id don't contain illegal characters (e.g., '/')
-        url = f"/task/{task_id}/vm/{vm_id}/upload/{dataset_id}/{upload_id}"
-        logging.info(f"Submitting the runfile at {url}")
-        response = self.execute_post_return_json(url, file_path=file_path)
+        if file_path.stat().st_size > UPLOAD_PART_SIZE:
+            url = f"/task/{task_id}/vm/{vm_id}/upload-parts/{dataset_id}/{upload_id}"
+            logging.info(f"Submitting the runfile in parts at {url}")
+            response = self.upload_in_parts(
+                file_path, f"{self.base_url}{url}", self.__csrf_headers(), {"name": file_path.name}
+            ).json()
+        else:
+            url = f"/task/{task_id}/vm/{vm_id}/upload/{dataset_id}/{upload_id}"
+            logging.info(f"Submitting the runfile at {url}")
+            response = self.execute_post_return_json(url, file_path=file_path)
 
         return (
             "status" in response
@@ -1429,6 +1564,76 @@ class Client(TiraClient):
         ret = self.json_response("/api/role")
         return ret["csrf"]
 
+    def __csrf_headers(self) -> "Dict[str, str]":
+        csrf = self.get_csrf_token()
+
+        headers = self.authentication_headers()
+        headers["Accept"] = "application/json"
+        headers["x-csrftoken"] = csrf
+        headers["Cookie"] = ("" if "Cookie" not in headers else headers["Cookie"] + "; ") + f"csrftoken={csrf}"
+
+        return headers
+
+    def upload_in_parts(
+        self,
+        file_path: Path,
+        url: str,
+        headers: "Dict[str, str]",
+        payload: "Optional[Dict[str, Any]]" = None,
+        part_size: int = UPLOAD_PART_SIZE,
+        file: "Optional[Any]" = None,
+    ) -> "requests.Response":
+        """Upload the file in parts of part_size bytes to url and let the server assemble the parts afterwards.
+
+        The upload is identified by the checksum of the file, so that a failed upload of the same file resumes with the
+        parts that the server did not receive yet. Each part is retried with backoff.
+
+        :param url: The url that receives the parts (url/<upload>/<part>) and assembles them (url/<upload>).
+        :param payload: Additional fields passed to the server when the parts are assembled.
+        :param file: Read the parts from this opened file (e.g., to report the progress), defaults to file_path. The
+            file is closed once the parts are uploaded.
+        """
+        from tira.io_utils import _md5_of_file
+
+        md5 = _md5_of_file(file_path)
+        url = f"{url}/{md5}"
+        parts = max(1, -(-os.path.getsize(file_path) // part_size))
+        received = self.__request_with_retries("get", url, headers=headers).json().get("parts", {})
+
+        f = file if file is not None else open(file_path, "rb")
+        try:
+            for part in range(parts):
+                data = f.read(part_size)
+                part_md5 = hashlib.md5(data).hexdigest()
+                if received.get(str(part)) == part_md5:
+                    continue
+                self.__request_with_retries(
+                    "post", f"{url}/{part}", headers=headers, files={"file": ("part", data)}, data={"md5": part_md5}
+                )
+        finally:
+            f.close()
+
+        return self.__request_with_retries(
+            "post", url, headers=headers, json={**(payload or {}), "parts": parts, "md5": md5}
+        )
+
+    def __request_with_retries(self, method: str, url: str, **kwargs: Any) -> "requests.Response":
+        for attempt in range(self.failsave_retries):
+            try:
+                resp = self.session.request(method, url, verify=self.verify, **kwargs)
+                if resp.status_code in {200, 202}:
+                    return resp
+                message = f"Got statuscode {resp.status_code} for {url}. Got {resp.content}"
+            except requests.exceptions.RequestException as e:
+                message = f"Error occured while fetching {url}: {e}"
+
+            if attempt + 1 < self.failsave_retries:
+                sleep_time = self.backoff_delay(attempt)
+                logging.warning(f"{message}. I will sleep {sleep_time:.1f} seconds and continue.")
+                time.sleep(sleep_time)
+
+        raise ValueError(message)
+
     def execute_post_return_json(
         self,
         endpoint: str,
@@ -1437,18 +1642,13 @@ class Client(TiraClient):
         json_payload: "Any" = None,
     ) -> Dict:
         assert endpoint.startswith("/")
-        csrf = self.get_csrf_token()
+        headers = self.__csrf_headers()
 
-        headers = self.authentication_headers()
-        headers["Accept"] = "application/json"
-        headers["x-csrftoken"] = csrf
-        headers["Cookie"] = ("" if "Cookie" not in headers else headers["Cookie"] + "; ") + f"csrftoken={csrf}"
-
-        for _ in range(self.failsave_retries):
+        for attempt in range(self.failsave_retries):
             try:
                 files = None if not file_path else {"file": open(file_path, "rb")}
 
-                resp = requests.post(
+                resp = self.session.post(
                     url=f"{self.base_url}{endpoint}",
                     files=files,
                     headers=headers,
@@ -1461,25 +1661,31 @@ class Client(TiraClient):
                 else:
                     break
             except Exception as e:
-                sleep_time = randint(1, self.failsave_max_delay)
+                sleep_time = self.backoff_delay(attempt)
                 resp_code = resp.status_code if "resp" in locals() else "unknown-response-code"
                 logging.warning(
                     f"Error occured while fetching {endpoint}. Code: {resp_code}. I will sleep"
-                    f" {sleep_time} seconds and continue.",
+                    f" {sleep_time:.1f} seconds and continue.",
                     exc_info=e,
                 )
                 time.sleep(sleep_time)
 
         return resp.json()
 
-    @lru_cache(maxsize=None)
     def archived_json_response(self, endpoint: str, force_reload: bool = False):
         out = Path(self.tira_cache_dir) / ".archived" / Path(endpoint[1:])
         if endpoint.endswith("/"):
             out = out / "index.json"
 
+        cache_key = ResponseCache.key("archived", endpoint)
+        cached = self.json_cache.get(cache_key)
+        if cached is not None and cached.is_fresh() and not force_reload:
+            return cached.value
+
         if out.exists() and not force_reload:
-            return json.load(open(out, "r"))
+            ret = json.load(open(out, "r"))
+            self.json_cache.put(cache_key, endpoint, ret)
+            return ret
 
         out.parent.mkdir(exist_ok=True, parents=True)
         base_url = self.archive_base_url if not force_reload else self.base_url
@@ -1488,9 +1694,10 @@ class Client(TiraClient):
         with open(out, "w") as f:
             f.write(json.dumps(response))
 
-        return json.load(open(out, "r"))
+        ret = json.load(open(out, "r"))
+        self.json_cache.put(cache_key, endpoint, ret)
+        return ret
 
-    @lru_cache(maxsize=None)
     def json_response(
         self,
         endpoint: str,
@@ -1504,12 +1711,44 @@ class Client(TiraClient):
 
         base_url = base_url if base_url else self.base_url
 
+        cache_key = ResponseCache.key(base_url, endpoint, params, self.__credentials_digest())
+        cached = self.json_cache.get(cache_key)
+        if cached is not None and cached.is_fresh():
+            return cached.value
+
         headers = self.authentication_headers(f"{base_url}{endpoint}")
         headers["Accept"] = "application/json"
+        if cached is not None:
+            headers.update(cached.conditional_headers())
 
-        for _ in range(failsave_retries):
+        resp = self.__get_json(base_url, endpoint, headers, params, failsave_retries, revalidates=cached is not None)
+
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if resp.status_code == 304 and cached is not None:
+            # The cached response is still valid, so it is served for another time-to-live.
+            ret = cached.value
+            etag, last_modified = etag or cached.etag, last_modified or cached.last_modified
+        else:
+            ret = resp.json()
+
+        self.json_cache.put(cache_key, endpoint, ret, etag, last_modified)
+        return ret
+
+    def __get_json(
+        self,
+        base_url: str,
+        endpoint: str,
+        headers: "Dict[str, str]",
+        params: "Optional[Union[Dict, List[tuple], bytes]]",
+        failsave_retries: int,
+        revalidates: bool,
+    ) -> requests.Response:
+        """GET the endpoint with up to failsave_retries attempts. A 304 Not Modified is accepted if revalidates."""
+        for attempt in range(failsave_retries):
             try:
-                resp = requests.get(url=f"{base_url}{endpoint}", headers=headers, verify=self.verify, params=params)
+                resp = self.session.get(url=f"{base_url}{endpoint}", headers=headers, verify=self.verify, params=params)
+                if resp.status_code == 304 and revalidates:
+                    break
                 if resp.status_code not in {200, 202}:
                     raise ValueError(f"Got statuscode {resp.status_code} for {endpoint}. Got {resp}")
                 else:
@@ -1518,22 +1757,46 @@ class Client(TiraClient):
                 if "resp" not in vars() or resp.status_code in {403, 404}:
                     raise e
 
-                sleep_time = randint(1, self.failsave_max_delay)
+                sleep_time = self.backoff_delay(attempt)
                 response_code = "'unknown response code, maybe there was a timeout?'"
                 try:
                     response_code = resp.status_code
                 except Exception:
                     pass
                 logging.warn(
-                    f"Error occured while fetching {endpoint}. Code: {response_code}. I will sleep {sleep_time} seconds"
-                    " and continue.",
+                    f"Error occured while fetching {endpoint}. Code: {response_code}. I will sleep {sleep_time:.1f}"
+                    " seconds and continue.",
                     exc_info=e,
                 )
 
                 if failsave_retries > 1:
                     time.sleep(sleep_time)
 
-        return resp.json()
+        return resp
+
+    def __credentials_digest(self) -> str:
+        """A digest of the credentials sent with requests, so that cached responses are only served to them."""
+        credentials = [self.api_key, self.api_user_name, self.load_settings().get("Header", {})]
+        return hashlib.sha256(json.dumps(credentials, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def json_responses(
+        self, endpoints: "List[str]", max_workers: int = 8, rate_limit: "Optional[_RateLimit]" = None
+    ) -> "List[Dict]":
+        """Fetch the json responses of all endpoints concurrently over the pooled session.
+
+        :param endpoints: The endpoints to fetch, as passed to json_response.
+        :param max_workers: The maximum number of concurrent requests.
+        :param rate_limit: An optional limit on the number of requests that are started per second.
+        :return: The json responses in the order of the endpoints.
+        """
+
+        def json_response(endpoint: str) -> "Dict":
+            if rate_limit is not None:
+                rate_limit.wait()
+            return self.json_response(endpoint)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(json_response, endpoints))
 
     def __listdir_failsave(self, path: str):
         try:
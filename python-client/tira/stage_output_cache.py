@@ -0,0 +1,147 @@
+"""A persistent cache for the outputs of the previous stages of multi-stage pipelines.
+
+Entries are addressed by the image digest, the command, and fingerprints of the inputs of a stage, so that a stage that
+already ran on the same input is not executed again. The least recently used entries are evicted once the cache
+exceeds its maximum size.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+DEFAULT_MAX_SIZE_BYTES = 20 * 1024**3
+# The staging directories of failed executions are kept this long for inspection before they are evicted.
+STALE_STAGING_SECONDS = 7 * 24 * 3600
+
+_LAST_USED = ".last-used"
+_SIZE = ".size"
+
+
+def directory_fingerprint(directory: Union[str, Path]) -> str:
+    """A fingerprint of the directory from the relative paths, sizes, and modification times of all files.
+
+    This avoids reading (potentially huge) input datasets while it still changes whenever a file is modified.
+    """
+    directory = Path(directory)
+    ret = hashlib.md5()
+
+    if directory.is_file():
+        stat = directory.stat()
+        ret.update(f"{directory.name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        return ret.hexdigest()
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for f in sorted(files):
+            path = Path(root) / f
+            stat = path.stat()
+            ret.update(f"{path.relative_to(directory)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+
+    return ret.hexdigest()
+
+
+def _size_of(directory: Path) -> int:
+    return sum((Path(root) / f).stat().st_size for root, _, files in os.walk(directory) for f in files)
+
+
+class StageOutputCache:
+    def __init__(self, directory: Union[str, Path], max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        self.directory = Path(directory)
+        self.max_size_bytes = max_size_bytes
+
+    @staticmethod
+    def key(
+        image_digest: str, command: str, input_dir: "Union[str, Path]", input_runs: "Iterable[Union[str, Path]]"
+    ) -> str:
+        """The address of the output of a stage.
+
+        :param image_digest: The id of the docker image, so that a rebuilt image under the same tag is not served.
+        :param command: The normalized command executed in the image.
+        :param input_dir: The input dataset of the stage.
+        :param input_runs: The outputs of previous stages that are mounted into the stage.
+        """
+        ret = {
+            "image": image_digest,
+            "command": " ".join(command.split()),
+            "input": directory_fingerprint(input_dir),
+            "input_runs": sorted(directory_fingerprint(i) for i in input_runs),
+        }
+        return hashlib.sha256(json.dumps(ret, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> "Optional[Path]":
+        """Return the cached output directory of the stage or None if the stage was not executed before."""
+        entry = self.directory / key
+        if not (entry / "output").is_dir() or not (entry / _SIZE).is_file():
+            return None
+
+        (entry / _LAST_USED).touch()
+        return entry / "output"
+
+    def staging_directory(self, key: str) -> Path:
+        """A fresh output directory for the execution of the stage, to be passed to put afterwards."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory)) / "output"
+
+    def put(self, key: str, output_dir: Union[str, Path]) -> Path:
+        """Move the output of the executed stage from its staging directory into the cache."""
+        staged = Path(output_dir).parent
+        entry = self.directory / key
+        (staged / _SIZE).write_text(str(_size_of(staged / "output")))
+        (staged / _LAST_USED).touch()
+
+        try:
+            staged.rename(entry)
+        except OSError:
+            # A concurrent execution of the same stage was faster, both outputs are interchangeable.
+            shutil.rmtree(staged, ignore_errors=True)
+
+        self.evict()
+        return entry / "output"
+
+    def evict(self) -> None:
+        """Remove stale staging directories and the least recently used entries until the cache fits into
+        max_size_bytes.
+        """
+        entries = []
+        for entry in self.directory.iterdir():
+            if entry.name.startswith("."):
+                self.__evict_if_stale(entry)
+                continue
+            try:
+                entries += [(os.path.getmtime(entry / _LAST_USED), int((entry / _SIZE).read_text()), entry)]
+            except (OSError, ValueError):
+                continue
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda i: i[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            logging.info(f"Evict the stage output {entry.name} from the cache.")
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+
+    @staticmethod
+    def __evict_if_stale(staged: Path) -> None:
+        try:
+            last_modified = max(os.path.getmtime(i) for i in [staged, staged / "output"] if i.exists())
+        except (OSError, ValueError):
+            return
+
+        if time.time() - last_modified > STALE_STAGING_SECONDS:
+            logging.info(f"Evict the stale staging directory {staged.name} from the cache.")
+            shutil.rmtree(staged, ignore_errors=True)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __len__(self) -> int:
+        if not self.directory.is_dir():
+            return 0
+
+        return len([i for i in self.directory.iterdir() if (i / _SIZE).is_file()])
@@ -448,4 +448,10 @@ def load_ir_datasets():
             return None
 
 
-ir_datasets = load_ir_datasets()
+def __getattr__(name):
+    # Importing ir_datasets is slow, so the ir_datasets of this module are only loaded when they are used.
+    if name == "ir_datasets":
+        globals()["ir_datasets"] = load_ir_datasets()
+        return globals()["ir_datasets"]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
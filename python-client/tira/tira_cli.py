@@ -58,6 +58,18 @@ def setup_download_command(parser: argparse.ArgumentParser) -> None:
         help="Download all submissions to a task.",
     )
     parser.add_argument("--repackage", action="store_true", help="Repackage everything.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="The number of concurrent downloads when downloading all submissions.",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=1.0,
+        help="The maximum number of requests per second to the server when downloading all submissions.",
+    )
     parser.set_defaults(executable=download_command)
 
 
@@ -731,13 +743,15 @@ def download_command(
     output: "Optional[str]" = None,
     all_submissions: bool = False,
     repackage: bool = False,
+    workers: int = 8,
+    requests_per_second: float = 1.0,
     **kwargs,
 ) -> int:
     client: "RestClient" = RestClient()
     if approach is not None:
         ret = client.get_run_output(approach, dataset)
     elif all_submissions:
-        ret = client.download_all_submissions(dataset, output, repackage)
+        ret = client.download_all_submissions(dataset, output, repackage, workers, requests_per_second)
     else:
         ret = client.download_dataset(None, dataset, truths)
 
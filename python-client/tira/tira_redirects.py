@@ -1,11 +1,15 @@
 import json
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 
 from tira.license_agreements import print_license_agreement
 
 TIRA_ZENODO_BASE_URL = "https://files.webis.de/data-in-production/data-research/tira-zenodo-dump-preparation"
 
-STATIC_REDIRECTS = {
+# The redirects maintained in this file, they are joined with the static_redirects/*.json files and the query
+# processors on the first lookup, see _redirect_index.
+_BUILTIN_STATIC_REDIRECTS = {
     "ir-benchmarks": {
         "tira-ir-starter": {
             "Index (tira-ir-starter-pyterrier)": {
@@ -400,7 +404,8 @@ STATIC_REDIRECTS = {
 }
 
 
-def join_to_static_redirects(name, http_base_url):
+def join_to_static_redirects(name, http_base_url, static_redirects=None):
+    static_redirects = _redirect_index()["STATIC_REDIRECTS"] if static_redirects is None else static_redirects
     json_file = Path(__file__).parent.resolve() / "static_redirects" / f"{name}.json"
     json_file = json.load(open(json_file, "r"))
     for redirected_approach in json_file:
@@ -412,37 +417,23 @@ def join_to_static_redirects(name, http_base_url):
         )
         cache_file_name += ".zip"
 
-        if task_id not in STATIC_REDIRECTS:
-            STATIC_REDIRECTS[task_id] = {}
-        if team_name not in STATIC_REDIRECTS[task_id]:
-            STATIC_REDIRECTS[task_id][team_name] = {}
-        if approach_name not in STATIC_REDIRECTS[task_id][team_name]:
-            STATIC_REDIRECTS[task_id][team_name][approach_name] = {}
+        if task_id not in static_redirects:
+            static_redirects[task_id] = {}
+        if team_name not in static_redirects[task_id]:
+            static_redirects[task_id][team_name] = {}
+        if approach_name not in static_redirects[task_id][team_name]:
+            static_redirects[task_id][team_name][approach_name] = {}
 
         for dataset_id, run_id in json_file[redirected_approach]["runs"].items():
-            if dataset_id in STATIC_REDIRECTS[task_id][team_name][approach_name]:
+            if dataset_id in static_redirects[task_id][team_name][approach_name]:
                 raise ValueError("Duplicated execution in the cache.")
 
-            STATIC_REDIRECTS[task_id][team_name][approach_name][dataset_id] = {
+            static_redirects[task_id][team_name][approach_name][dataset_id] = {
                 "urls": [http_base_url + cache_file_name + "?download=1"],
                 "run_id": run_id,
             }
 
 
-join_to_static_redirects(
-    "reneuir-2024",
-    f"{TIRA_ZENODO_BASE_URL}/reneuir-2024/runs/",
-)
-TASKS_WITH_REDIRECT_MERGING = set()
-RUN_ID_TO_SYSTEM = {}
-for task in STATIC_REDIRECTS.keys():
-    TASKS_WITH_REDIRECT_MERGING.add(task)
-    for team in STATIC_REDIRECTS[task].keys():
-        for system_name in STATIC_REDIRECTS[task][team].keys():
-            system = STATIC_REDIRECTS[task][team][system_name]
-            for config in system.values():
-                RUN_ID_TO_SYSTEM[config["run_id"]] = system_name
-
 QUERY_PROCESSORS = {
     "ir-benchmarks": {
         "qpptk": {
@@ -1664,38 +1655,79 @@ def dataset_ir_redirects(dataset_id):
     return DATASET_ID_REDIRECTS.get(dataset_id, dataset_id)
 
 
-for task in QUERY_PROCESSORS.keys():
-    for team in QUERY_PROCESSORS[task].keys():
-        if team not in STATIC_REDIRECTS[task]:
-            STATIC_REDIRECTS[task][team] = {}
+def _systems(static_redirects):
+    for task in static_redirects.keys():
+        for team in static_redirects[task].keys():
+            for system_name, system in static_redirects[task][team].items():
+                yield system_name, system
+
+
+def _add_query_processors(static_redirects, run_id_to_system):
+    for task in QUERY_PROCESSORS.keys():
+        for team in QUERY_PROCESSORS[task].keys():
+            if team not in static_redirects[task]:
+                static_redirects[task][team] = {}
+
+            for system_name in QUERY_PROCESSORS[task][team].keys():
+                system = QUERY_PROCESSORS[task][team][system_name]
+                if system_name not in static_redirects[task][team]:
+                    static_redirects[task][team][system_name] = {}
+                for dataset_group in system.keys():
+                    for dataset_id, run_id in sorted(list(system[dataset_group]["run_ids"].items())):
+                        run_id_to_system[run_id] = system_name
+                        static_redirects[task][team][system_name][dataset_id] = {
+                            "run_id": run_id,
+                            "urls": [QUERY_PROCESSORS_PREFIX[task][team][system_name] + f"-{dataset_group}.zip"],
+                        }
+
+
+def _mirror_urls(static_redirects):
+    mirror_urls = {}
+
+    for _, system in _systems(static_redirects):
+        for dataset_id in system.keys():
+            urls = system[dataset_id].get("urls")
+            if urls and len(urls) > 0:
+                for url in urls:
+                    mirror_urls[url] = [i for i in urls if i != url]
+
+    return mirror_urls
+
+
+@lru_cache(maxsize=None)
+def _redirect_index():
+    """Build the redirect tables on the first lookup instead of on import, most imports never resolve a redirect."""
+    static_redirects = deepcopy(_BUILTIN_STATIC_REDIRECTS)
+    join_to_static_redirects(
+        "reneuir-2024",
+        f"{TIRA_ZENODO_BASE_URL}/reneuir-2024/runs/",
+        static_redirects,
+    )
+    tasks_with_redirect_merging = set(static_redirects.keys())
+    run_id_to_system = {}
+    for system_name, system in _systems(static_redirects):
+        for config in system.values():
+            run_id_to_system[config["run_id"]] = system_name
+
+    _add_query_processors(static_redirects, run_id_to_system)
+
+    return {
+        "STATIC_REDIRECTS": static_redirects,
+        "TASKS_WITH_REDIRECT_MERGING": tasks_with_redirect_merging,
+        "RUN_ID_TO_SYSTEM": run_id_to_system,
+        "MIRROR_URLS": _mirror_urls(static_redirects),
+    }
 
-        for system_name in QUERY_PROCESSORS[task][team].keys():
-            system = QUERY_PROCESSORS[task][team][system_name]
-            if system_name not in STATIC_REDIRECTS[task][team]:
-                STATIC_REDIRECTS[task][team][system_name] = {}
-            for dataset_group in system.keys():
-                for dataset_id, run_id in sorted(list(system[dataset_group]["run_ids"].items())):
-                    RUN_ID_TO_SYSTEM[run_id] = system_name
-                    STATIC_REDIRECTS[task][team][system_name][dataset_id] = {
-                        "run_id": run_id,
-                        "urls": [QUERY_PROCESSORS_PREFIX[task][team][system_name] + f"-{dataset_group}.zip"],
-                    }
 
-MIRROR_URLS = {}
+def __getattr__(name):
+    if name in ("STATIC_REDIRECTS", "TASKS_WITH_REDIRECT_MERGING", "RUN_ID_TO_SYSTEM", "MIRROR_URLS"):
+        return _redirect_index()[name]
 
-for task in STATIC_REDIRECTS.keys():
-    for team in STATIC_REDIRECTS[task].keys():
-        for system_name in STATIC_REDIRECTS[task][team].keys():
-            system = STATIC_REDIRECTS[task][team][system_name]
-            for dataset_id in system.keys():
-                urls = system[dataset_id].get("urls")
-                if urls and len(urls) > 0:
-                    for url in urls:
-                        MIRROR_URLS[url] = [i for i in urls if i != url]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def mirror_url(url):
-    mirror_urls = MIRROR_URLS.get(url)
+    mirror_urls = _redirect_index()["MIRROR_URLS"].get(url)
     if mirror_urls and len(mirror_urls) > 0:
         print(f"Switch to mirror {mirror_urls[0]} as due to outage of {url}")
         return mirror_urls[0]
@@ -1703,8 +1735,8 @@ def mirror_url(url):
 
 
 def mirror_urls_for_run_output(task, team, dataset, run_id):
-    system = RUN_ID_TO_SYSTEM.get(run_id, None)
-    ret = STATIC_REDIRECTS.get(task, {}).get(team, {}).get(system, {}).get(dataset)
+    system = _redirect_index()["RUN_ID_TO_SYSTEM"].get(run_id, None)
+    ret = _redirect_index()["STATIC_REDIRECTS"].get(task, {}).get(team, {}).get(system, {}).get(dataset)
     if ret is None:
         return []
     else:
@@ -1721,7 +1753,7 @@ def redirects(approach=None, dataset=None, url=None):
             ret = url.split("/task/")[1]
             ret = ret.split("/")
             task, team, dataset, run_id = ret[0], ret[2], ret[4], ret[6].replace(".zip", "")
-            system = RUN_ID_TO_SYSTEM.get(run_id, None)
+            system = _redirect_index()["RUN_ID_TO_SYSTEM"].get(run_id, None)
         elif "/data-download/training/" in url or "/data-download/test/" in url:
             dataset_id = url.split("/")[-1].replace(".zip", "")
             dataset_id = DATASET_ID_REDIRECTS.get(dataset_id, dataset_id)
@@ -1741,4 +1773,4 @@ def redirects(approach=None, dataset=None, url=None):
     else:
         task, team, system = approach.split("/")
 
-    return STATIC_REDIRECTS.get(task, {}).get(team, {}).get(system, {}).get(dataset, default_ret)
+    return _redirect_index()["STATIC_REDIRECTS"].get(task, {}).get(team, {}).get(system, {}).get(dataset, default_ret)
@@ -9,7 +9,6 @@ from typing import TYPE_CHECKING, Dict, Optional
 
 from tira.check_format import _fmt, log_message
 from tira.io_utils import huggingface_model_mounts
-from tira.local_client import Client
 from tira.local_execution_integration import LocalExecutionIntegration
 from tira.rest_api_client import Client as RestClient
 from tira.third_party_integrations import extract_previous_stages_from_docker_image
@@ -228,6 +227,16 @@ def parse_args():
         action="store_true",
         help="After the execution of the software, fail if the output directory is empty.",
     )
+    parser.add_argument(
+        "--no-stage-cache",
+        required=False,
+        default=False,
+        action="store_true",
+        help=(
+            "Always execute the previous stages of multi-stage software instead of re-using their cached outputs from"
+            " earlier executions on the same input."
+        ),
+    )
     parser.add_argument(
         "--mount-hf-model",
         nargs="+",
@@ -373,6 +382,8 @@ def push_image(client, image, tira_task_id, tira_vm_id):
 
 
 def main(args=None):
+    from tira.local_client import Client
+
     args = args if args else parse_args()
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
 
@@ -492,14 +503,12 @@ def main(args=None):
             args.v = []
         args.v += hf_models
 
-    print(
-        f"""
+    print(f"""
 ########################################## TIRA RUN CONFIGURATION ######################################################
 # image={args.image}
 # command={args.command}
 ########################################################################################################################
-"""
-    )
+""")
     gpus = 0
     if args.gpus:
         gpus = -1 if args.gpus == "all" else int(args.gpus)
@@ -518,6 +527,7 @@ def main(args=None):
             evaluate=evaluate,
             eval_dir=args.evaluation_directory,
             gpu_count=gpus,
+            stage_cache=not args.no_stage_cache,
         )
     else:
         print("Skip the local test execution of the software.")
@@ -528,14 +538,12 @@ def main(args=None):
         raise ValueError("The software produced an empty output directory, it likely failed?")
 
     if args.push.lower() == "true":
-        print(
-            f"""
+        print(f"""
 ######################################### Review the Outputs of your Software ##########################################
 # Your software produced the following outputs in {args.output_directory}.
 # Please shortly review them before we push your software.
 ########################################################################################################################
-"""
-        )
+""")
         if not os.path.exists(args.output_directory) or not os.listdir(args.output_directory):
             print("Your software did not produce any output, please review the logs above.")
         else:
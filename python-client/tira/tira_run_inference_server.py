@@ -30,6 +30,18 @@ def parse_args():
     )
 
     parser.add_argument("--port", type=limited_int_arg(5000, 65536), help="Port number of local server.", required=True)
+    parser.add_argument(
+        "--max-batch-size",
+        type=limited_int_arg(1, 65536),
+        default=32,
+        help="The maximum number of inputs of concurrent requests that are passed to one call of predict.",
+    )
+    parser.add_argument(
+        "--max-batch-wait-ms",
+        type=float,
+        default=5,
+        help="The maximum time in milliseconds to wait for further requests before a batch is predicted.",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -70,5 +82,10 @@ def main():
     loglevels = [logging.INFO, logging.DEBUG]
     loglevel = loglevels[min(args.verbose, len(loglevels) - 1)]
     run_inference_server(
-        base_module=module_name, absolute_path=absolute_path, internal_port=args.port, loglevel=loglevel
+        base_module=module_name,
+        absolute_path=absolute_path,
+        internal_port=args.port,
+        loglevel=loglevel,
+        max_batch_size=args.max_batch_size,
+        max_batch_wait_ms=args.max_batch_wait_ms,
     )
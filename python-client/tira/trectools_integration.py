@@ -1,7 +1,5 @@
 from pathlib import Path
 
-from tira.ir_datasets_util import translate_irds_id_to_tirex
-
 
 class TrecToolsIntegration:
     def __init__(self, tira_client):
@@ -11,6 +9,8 @@ class TrecToolsIntegration:
     def from_submission(self, approach, dataset):
         from trectools import TrecRun
 
+        from tira.ir_datasets_util import translate_irds_id_to_tirex
+
         ret = self.tira_client.get_run_output(approach, translate_irds_id_to_tirex(dataset))
 
         return TrecRun(Path(ret) / "run.txt")
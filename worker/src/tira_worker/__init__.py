@@ -1,6 +1,6 @@
 __version__ = "0.0.1"
 
-from ._tasks import app, evaluate, gpu_executor, run
+from ._tasks import app, evaluate, evaluate_batch, gpu_executor, run
 from .utils import all_workers
 
-__all__ = ["evaluate", "run", "all_workers"]
+__all__ = ["evaluate", "evaluate_batch", "run", "all_workers"]
@@ -7,9 +7,10 @@ from os import environ
 from pathlib import Path
 from shutil import copytree
 from subprocess import check_output
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 from celery import Celery
+from celery.signals import task_postrun
 from tira.io_utils import (
     get_tira_id,
     hf_cache_dir,
@@ -36,6 +37,14 @@ gpu_executor = Celery("tira-gpu-executor", backend=QUEUE_RESULTS_BACKEND_URL, br
 gpu_executor.conf.control_queue_exclusive = True  # Not required after celery 5.7 is released
 gpu_executor.conf.control_queue_durable = False  # Not required after celery 5.7 is released
 
+
+@task_postrun.connect
+def release_cached_truths(**kwargs) -> None:
+    """The evaluators cache parsed truths, release them after each task so that they do not stay in memory."""
+    if "tira.evaluators" in sys.modules:
+        sys.modules["tira.evaluators"].clear_truth_cache()
+
+
 # Poll every 90 seconds (TODO: make me configurable?)
 MONITORED_EXECUTION_POLL_INTERVAL_SECONDS = 90
 
@@ -259,6 +268,12 @@ def evaluate(run_id: str, dataset: str, evaluator_id: str, task: str, team: str,
     print("Run is available locally:", run_dir)
 
     eval_results = execute_monitored(lambda i: client.evaluate(run_dir, dataset, i), client=client, job_id=job_id)
+    _upload_evaluation(client, eval_results, run_id, evaluator_id, dataset, task, job_id)
+
+
+def _upload_evaluation(
+    client: TiraClient, eval_results: Path, run_id: str, evaluator_id: str, dataset: str, task: str, job_id: str
+) -> None:
     persist_tira_metadata_for_job(
         eval_results,
         f"{get_tira_id()}-evaluates-{run_id}",
@@ -271,5 +286,57 @@ def evaluate(run_id: str, dataset: str, evaluator_id: str, task: str, team: str,
     client.upload_run_admin(eval_results, job_id)
 
 
+@app.task()
+def evaluate_batch(runs: list[dict], dataset: str, evaluator_id: str, task: str) -> None:
+    """Evaluate many runs on the same dataset, e.g., to re-evaluate a leaderboard after its evaluator changed.
+
+    The truths are downloaded once and the runs concurrently. Datasets with a trusted evaluator are evaluated in this
+    process, so that the truths are parsed only once as the evaluators cache them. Each run is evaluated as monitored
+    execution of its job and uploaded as soon as it is finished, also if it could not be downloaded or evaluated, so
+    that the job reports the failure and a failing run does not block the evaluations of the other runs.
+
+    :param runs: The runs to evaluate as dicts with the keys run_id, team, and job_id.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from tira.evaluators import evaluate, unsandboxed_evaluation_is_allowed
+
+    client: TiraClient = get_admin_client()
+
+    truths = client.download_dataset(task, dataset, truth_dataset=True)
+    print("Truths are available locally:", truths)
+
+    def download(run: dict) -> Union[Path, Exception]:
+        try:
+            return client.download_zip_to_cache_directory(
+                run_id=run["run_id"], dataset=dataset, task=task, team=run["team"]
+            )
+        except Exception as e:
+            print(f"Could not download the run {run['run_id']}:", e)
+            return e
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        run_dirs = list(executor.map(download, runs))
+    print(f"{len([i for i in run_dirs if not isinstance(i, Exception)])} of {len(runs)} runs are available locally.")
+
+    dataset_configuration = client.get_dataset(dataset)
+    unsandboxed = unsandboxed_evaluation_is_allowed(dataset_configuration, client)
+
+    def evaluate_run(run_dir: Union[Path, Exception], output_dir: Path) -> None:
+        if isinstance(run_dir, Exception):
+            raise run_dir
+        elif unsandboxed:
+            evaluate(Path(run_dir), Path(truths), dataset_configuration, output_dir=output_dir, client=client)
+        else:
+            client.evaluate(run_dir, dataset, output_dir)
+
+    for run, run_dir in zip(runs, run_dirs):
+        eval_results = execute_monitored(lambda i: evaluate_run(run_dir, i), client=client, job_id=run["job_id"])
+        try:
+            _upload_evaluation(client, eval_results, run["run_id"], evaluator_id, dataset, task, run["job_id"])
+        except Exception as e:
+            print(f"Could not upload the evaluation of the run {run['run_id']}:", e)
+
+
 if "celery" in sys.argv[0]:
     get_admin_client()
@@ -107,3 +107,43 @@ class TestExecuteMonitored(unittest.TestCase):
 
             self.assertIn(str(src_dir), str(context.exception))
             check_output.assert_not_called()
+
+
+class TestEvaluateBatch(unittest.TestCase):
+    @patch.object(_tasks, "persist_tira_metadata_for_job")
+    @patch.object(_tasks, "get_admin_client")
+    def test_each_job_is_reported_also_if_its_run_fails(self, get_admin_client, persist_tira_metadata_for_job):
+        client = Mock()
+        client.download_dataset.return_value = "/truths"
+        client.get_dataset.return_value = {"run_format": "run.txt", "truth_format": "qrels.txt", "measures": ["RR"]}
+        client.update_running_process_output_admin.return_value = {"status": 0, "killing": False}
+        get_admin_client.return_value = client
+        runs = [{"run_id": f"run-{i}", "team": "team", "job_id": f"job-{i}"} for i in range(3)]
+
+        def download_zip_to_cache_directory(run_id, **kwargs):
+            if run_id == "run-0":
+                raise ValueError("The run does not exist.")
+            return f"/runs/{run_id}"
+
+        def evaluate(run, truths, config, output_dir, client):
+            self.assertEqual(Path("/truths"), truths)
+            if run == Path("/runs/run-1"):
+                raise ValueError("The run is invalid.")
+            (output_dir / "evaluation.prototext").write_text(str(run))
+
+        client.download_zip_to_cache_directory.side_effect = download_zip_to_cache_directory
+        with patch("tira.evaluators.evaluate", evaluate):
+            _tasks.evaluate_batch(runs, "dataset", "evaluator", "task")
+
+        client.download_dataset.assert_called_once_with("task", "dataset", truth_dataset=True)
+        uploads = {
+            job_id: eval_results for eval_results, job_id in (i.args for i in client.upload_run_admin.call_args_list)
+        }
+        self.assertEqual(["job-0", "job-1", "job-2"], list(uploads.keys()))
+        self.assertIn("The run does not exist.", (uploads["job-0"] / "exception.txt").read_text())
+        self.assertIn("The run is invalid.", (uploads["job-1"] / "exception.txt").read_text())
+        self.assertEqual("/runs/run-2", (uploads["job-2"] / "output" / "evaluation.prototext").read_text())
+        self.assertEqual(3, persist_tira_metadata_for_job.call_count)
+        self.assertEqual(
+            ["job-0", "job-1", "job-2"], [i.args[0] for i in client.update_running_process_output_admin.call_args_list]
+        )